@@ -12,6 +12,11 @@ Options:
     --focus TOPIC       Focus analysis on specific topic or document
     --areas AREAS       Comma-separated list of focus areas (e.g., "GDPR,SOX")
     --report TYPE       Report type: executive, detailed, or full (default: full)
+    --full-report       Regenerate the whole report instead of only changed sections
+    --cascade           Ingest each document on the fast model first, escalating when needed
+    --time-budget SECS  Finish the run, report included, within this many seconds
+    --token-budget N    Use at most this many LLM tokens
+    --plan              Print a JSON estimate of tokens, cost and runtime without running
     --pdf               Export report to PDF
     --telegram          Send report to Telegram
     --email             Send report via email
@@ -19,6 +24,7 @@ Options:
 """
 
 import argparse
+import json
 import sys
 from pathlib import Path
 from rich.console import Console
@@ -29,7 +35,14 @@ from rich.markdown import Markdown
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.crew import run_policy_analysis
-from src.config.settings import POLICY_DOCS_DIR, OUTPUT_DIR
+from src.utils.catalog import build_catalog
+from src.config.settings import (
+    POLICY_DOCS_DIR,
+    OUTPUT_DIR,
+    MODEL_CASCADE,
+    RUN_TIME_BUDGET,
+    RUN_TOKEN_BUDGET,
+)
 
 
 console = Console()
@@ -53,10 +66,10 @@ def check_prerequisites():
     issues = []
     
     # Check for policy documents
-    docs = list(POLICY_DOCS_DIR.glob("*.*"))
+    docs = build_catalog()
     if not docs:
         issues.append(f"No policy documents found in {POLICY_DOCS_DIR}")
-        issues.append("  → Add PDF, DOCX, TXT, or MD files to analyze")
+        issues.append("  → Add PDF, DOCX, DOC, HTML, TXT, or MD files to analyze")
     
     # Check for API keys
     from src.config.settings import OPENAI_API_KEY, ANTHROPIC_API_KEY
@@ -74,6 +87,16 @@ def check_prerequisites():
     return True
 
 
+def _format_budget(time_budget, token_budget) -> str:
+    """Describe the run's time and token budget for the configuration panel."""
+    limits = []
+    if time_budget is not None:
+        limits.append(f"{time_budget:g} seconds")
+    if token_budget is not None:
+        limits.append(f"{token_budget:,} tokens")
+    return " and ".join(limits) or "Unlimited"
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -96,6 +119,39 @@ def main():
         default="full",
         help="Type of report to generate (default: full)",
     )
+    parser.add_argument(
+        "--full-report",
+        action="store_true",
+        help="Regenerate the whole report instead of only sections affected by changed documents",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Ingest each document with the fast model first and escalate to the main model "
+             "on validation failure or low confidence (default: MODEL_CASCADE setting)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=RUN_TIME_BUDGET,
+        metavar="SECONDS",
+        help="Finish the run, report included, within this many seconds; high-risk documents "
+             "are analyzed first and the rest at reduced depth or skipped (default: RUN_TIME_BUDGET)",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=RUN_TOKEN_BUDGET,
+        metavar="TOKENS",
+        help="Use at most this many LLM tokens, degrading coverage the same way "
+             "(default: RUN_TOKEN_BUDGET)",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Dry run: print a JSON estimate of LLM calls, tokens, cost and runtime "
+             "(also saved to output/plan.json) and exit",
+    )
     parser.add_argument(
         "--pdf",
         action="store_true",
@@ -114,6 +170,25 @@ def main():
     
     args = parser.parse_args()
     
+    # Parse focus areas if provided
+    focus_areas = None
+    if args.areas:
+        focus_areas = [area.strip() for area in args.areas.split(",")]
+    
+    if args.plan:
+        from src.planner import plan_run
+        
+        plan = plan_run(
+            document_focus=args.focus,
+            focus_areas=focus_areas,
+            report_type=args.report,
+            cascade=args.cascade or MODEL_CASCADE,
+        )
+        plan_json = json.dumps(plan, indent=2)
+        (OUTPUT_DIR / "plan.json").write_text(plan_json, encoding="utf-8")
+        print(plan_json)
+        return
+    
     print_banner()
     
     # Check prerequisites
@@ -121,11 +196,6 @@ def main():
         console.print("[red]Please resolve the above issues before running.[/red]")
         sys.exit(1)
     
-    # Parse focus areas if provided
-    focus_areas = None
-    if args.areas:
-        focus_areas = [area.strip() for area in args.areas.split(",")]
-    
     # Display configuration
     console.print(Panel(
         f"""
@@ -135,6 +205,7 @@ def main():
 • Document Focus: {args.focus or 'All documents'}
 • Focus Areas: {', '.join(focus_areas) if focus_areas else 'All areas'}
 • Report Type: {args.report}
+• Budget: {_format_budget(args.time_budget, args.token_budget)}
         """,
         title="🚀 Starting Analysis",
         border_style="green",
@@ -147,6 +218,10 @@ def main():
             document_focus=args.focus,
             focus_areas=focus_areas,
             report_type=args.report,
+            incremental=not args.full_report,
+            cascade=args.cascade or MODEL_CASCADE,
+            time_budget=args.time_budget,
+            token_budget=args.token_budget,
         )
         
         # Display results
@@ -158,6 +233,7 @@ def main():
         ))
         
         console.print(f"\n[green]✅ Report saved to {OUTPUT_DIR}/compliance_report.md[/green]")
+        console.print(f"[green]✅ Changes since last run in {OUTPUT_DIR}/report_diff.json[/green]")
         
         # Handle PDF export
         if args.pdf or args.telegram or args.email:
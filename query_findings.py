@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Query the findings warehouse built up by previous analysis runs.
+
+Usage:
+    python query_findings.py COMMAND [options]
+
+Commands:
+    trend         Finding counts per regulation per run date
+    severity      Finding counts per severity for a run (default: latest)
+    documents     Finding counts per document in the latest run
+    remediation   Days from first detection to resolution per finding
+    backfill      Import runs stored in output/reports/ into the warehouse
+    sql QUERY     Run an arbitrary read-only SQL query
+
+Only runs with the same scope are compared: by default that of the latest
+complete run, or the one given with --report / --focus / --areas.
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+from rich.console import Console
+from rich.table import Table
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.config.settings import FINDINGS_DB
+from src.utils.warehouse import FindingsWarehouse
+
+
+console = Console()
+
+
+def print_rows(rows: list, title: str):
+    """Print query results as a table."""
+    if not rows:
+        console.print(f"[yellow]No results for {title.lower()}.[/yellow]")
+        return
+    table = Table(title=title)
+    for column in rows[0]:
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*[str(value) for value in row.values()])
+    console.print(table)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Query the compliance findings warehouse")
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=FINDINGS_DB,
+        help=f"Warehouse database (default: {FINDINGS_DB})",
+    )
+    parser.add_argument(
+        "--report",
+        choices=["executive", "detailed", "full"],
+        help="Scope: report type of the runs to compare (default: scope of the latest complete run)",
+    )
+    parser.add_argument("--focus", help="Scope: document focus of the runs to compare")
+    parser.add_argument("--areas", help="Scope: comma-separated focus areas of the runs to compare")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    trend = commands.add_parser("trend", help="Finding counts per regulation per run date")
+    trend.add_argument("--regulation", help="Only this regulation (e.g. GDPR)")
+    trend.add_argument("--type", default="gap", help="Finding type to count (default: gap)")
+
+    severity = commands.add_parser("severity", help="Finding counts per severity")
+    severity.add_argument("--run", help="Run ID (default: latest run)")
+
+    documents = commands.add_parser("documents", help="Finding counts per document")
+    documents.add_argument("--severity", help="Only this severity")
+
+    remediation = commands.add_parser("remediation", help="Time to remediation per finding")
+    remediation.add_argument("--regulation", help="Only this regulation")
+
+    commands.add_parser("backfill", help="Import stored report versions")
+
+    sql = commands.add_parser("sql", help="Run a read-only SQL query")
+    sql.add_argument("query", help="SQL query against the runs and findings tables")
+
+    args = parser.parse_args()
+
+    scope = None
+    if args.report or args.focus or args.areas:
+        scope = {
+            "report_type": args.report or "full",
+            "document_focus": args.focus,
+            "focus_areas": [area.strip() for area in args.areas.split(",")] if args.areas else None,
+        }
+
+    # Ad-hoc SQL runs on a read-only connection
+    with FindingsWarehouse(args.db, read_only=args.command == "sql") as warehouse:
+        if args.command == "trend":
+            print_rows(warehouse.gap_trend(args.regulation, args.type, scope), f"{args.type} trend")
+        elif args.command == "severity":
+            print_rows(warehouse.severity_counts(args.run, scope), "Findings by severity")
+        elif args.command == "documents":
+            print_rows(warehouse.document_counts(args.severity, scope), "Findings by document")
+        elif args.command == "remediation":
+            print_rows(warehouse.remediation_times(args.regulation, scope), "Time to remediation")
+        elif args.command == "backfill":
+            imported = warehouse.backfill()
+            console.print(f"[green]✅ Imported {imported} run(s) into {args.db}[/green]")
+        elif args.command == "sql":
+            try:
+                rows = warehouse.query(args.query)
+            except sqlite3.Error as e:
+                console.print(f"[red]Query failed: {e}[/red]")
+                sys.exit(1)
+            print_rows(rows, "Query results")
+
+
+if __name__ == "__main__":
+    main()
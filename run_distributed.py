@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Sharded policy analysis across several worker processes or nodes.
+
+A coordinator splits the document catalog (POLICY_DOCS_DIR plus any
+POLICY_DOCS_DIRS) into shards in a shared SQLite work queue. Workers on any
+machine that can reach the queue file claim shards, extract and analyze
+them, and a merge step produces the final report.
+
+Usage:
+    python run_distributed.py submit [--areas AREAS] [--report TYPE] [--shard-size N]
+    python run_distributed.py worker [--job JOB]
+    python run_distributed.py local [--job JOB] [--workers N]
+    python run_distributed.py status [--job JOB]
+    python run_distributed.py merge [--job JOB]
+    python run_distributed.py plan [--areas AREAS] [--report TYPE] [--shard-size N] [--workers N]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from rich.console import Console
+from rich.markdown import Markdown
+from rich.panel import Panel
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.config.settings import (
+    DISTRIBUTED_NEAR_DUPLICATE_DETECTION,
+    OUTPUT_DIR,
+    SHARD_SIZE,
+    WORK_QUEUE_DB,
+)
+from src.distributed import merge_job, run_local, run_worker, submit_job
+from src.utils.work_queue import WorkQueue
+
+
+console = Console()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Distributed policy analysis")
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        default=WORK_QUEUE_DB,
+        help=f"Shared work queue database (default: {WORK_QUEUE_DB})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Catalog documents and enqueue shards")
+    submit.add_argument("--areas", type=str, help="Comma-separated list of focus areas")
+    submit.add_argument(
+        "--report",
+        type=str,
+        choices=["executive", "detailed", "full"],
+        default="full",
+        help="Type of report to generate (default: full)",
+    )
+    submit.add_argument(
+        "--shard-size",
+        type=int,
+        default=SHARD_SIZE,
+        help=f"Documents per shard (default: {SHARD_SIZE})",
+    )
+    submit.add_argument(
+        "--deduplicate",
+        action="store_true",
+        help="Analyze only the newest copy of near-duplicate documents; extracts the whole "
+             "catalog on this machine first (default: DISTRIBUTED_NEAR_DUPLICATE_DETECTION setting)",
+    )
+
+    for name, help_text in [
+        ("worker", "Claim and process shards until the job is finished"),
+        ("status", "Show shard counts for a job"),
+        ("merge", "Merge shard results and generate the report"),
+    ]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--job", help="Job ID (default: latest job)")
+
+    local = commands.add_parser("local", help="Run several workers on this machine, then merge")
+    local.add_argument("--job", help="Job ID (default: latest job)")
+    local.add_argument("--workers", type=int, default=2, help="Number of worker processes")
+
+    plan = commands.add_parser("plan", help="Print a JSON token/cost/runtime estimate for a job")
+    plan.add_argument("--areas", type=str, help="Comma-separated list of focus areas")
+    plan.add_argument(
+        "--report",
+        type=str,
+        choices=["executive", "detailed", "full"],
+        default="full",
+        help="Type of report to generate (default: full)",
+    )
+    plan.add_argument(
+        "--shard-size",
+        type=int,
+        default=SHARD_SIZE,
+        help=f"Documents per shard (default: {SHARD_SIZE})",
+    )
+    plan.add_argument(
+        "--deduplicate",
+        action="store_true",
+        help="Estimate for a job submitted with --deduplicate",
+    )
+    plan.add_argument("--workers", type=int, default=2, help="Number of worker processes")
+
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        focus_areas = [a.strip() for a in args.areas.split(",")] if args.areas else None
+        job_id = submit_job(
+            shard_size=args.shard_size,
+            focus_areas=focus_areas,
+            report_type=args.report,
+            queue_path=args.queue,
+            deduplicate=args.deduplicate or DISTRIBUTED_NEAR_DUPLICATE_DETECTION,
+        )
+        with WorkQueue(args.queue) as queue:
+            status = queue.status(job_id)
+        console.print(f"[green]✅ Submitted job {job_id} with {status['total']} shard(s)[/green]")
+
+    elif args.command == "plan":
+        from src.planner import plan_run
+
+        focus_areas = [a.strip() for a in args.areas.split(",")] if args.areas else None
+        # Shards cover the whole catalog; routing only applies to focused crew runs
+        job_plan = plan_run(
+            focus_areas=focus_areas,
+            report_type=args.report,
+            routing=False,
+            deduplicate=args.deduplicate or DISTRIBUTED_NEAR_DUPLICATE_DETECTION,
+            workers=args.workers,
+            shard_size=args.shard_size,
+        )
+        print(json.dumps(job_plan, indent=2))
+
+    elif args.command == "worker":
+        completed = run_worker(args.job, args.queue)
+        console.print(f"[green]✅ Worker finished after completing {completed} shard(s)[/green]")
+
+    elif args.command == "status":
+        with WorkQueue(args.queue) as queue:
+            job_id = args.job or queue.latest_job()
+            if job_id is None:
+                console.print("[yellow]No jobs submitted.[/yellow]")
+                return
+            console.print(f"Job {job_id}: {queue.status(job_id)}")
+
+    elif args.command in ("merge", "local"):
+        if args.command == "local":
+            status = run_local(args.job, args.workers, args.queue)
+            console.print(f"Shards: {status}")
+        report = merge_job(args.job, args.queue)
+        console.print(Panel(Markdown(report), title="📋 Compliance Analysis Report", border_style="green"))
+        console.print(f"\n[green]✅ Report saved to {OUTPUT_DIR}/compliance_report.md[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,7 @@
 """CrewAI Agents for policy document processing."""
-from .policy_agents import create_ingestion_agent, create_analysis_agent, create_report_agent
+from .policy_agents import (
+    create_ingestion_agent,
+    create_extraction_agent,
+    create_analysis_agent,
+    create_report_agent,
+)
@@ -9,29 +9,58 @@ from src.config.settings import (
     ANTHROPIC_API_KEY,
     OPENAI_MODEL,
     ANTHROPIC_MODEL,
+    OPENAI_FAST_MODEL,
+    ANTHROPIC_FAST_MODEL,
 )
 from src.tools.document_tools import DocumentReaderTool, DocumentSearchTool
 
 
-def get_llm():
-    """Get the configured LLM based on settings."""
-    if DEFAULT_LLM_PROVIDER == "anthropic" and ANTHROPIC_API_KEY:
+def _use_anthropic() -> bool:
+    """Whether the Anthropic provider is selected (falls back to OpenAI without a key)."""
+    if DEFAULT_LLM_PROVIDER != "anthropic":
+        return False
+    return bool(ANTHROPIC_API_KEY) or not OPENAI_API_KEY
+
+
+def get_model_name(tier: str = "default") -> str:
+    """
+    Get the provider-qualified model name get_llm() would use.
+    
+    Args:
+        tier: "default" for the main model, or "fast" for the cheaper model
+            used first in the ingestion cascade
+    """
+    fast = tier == "fast"
+    if _use_anthropic():
+        return f"anthropic/{ANTHROPIC_FAST_MODEL if fast else ANTHROPIC_MODEL}"
+    return f"openai/{OPENAI_FAST_MODEL if fast else OPENAI_MODEL}"
+
+
+def get_llm(tier: str = "default"):
+    """
+    Get the configured LLM based on settings.
+    
+    Args:
+        tier: "default" for the main model, or "fast" for the cheaper model
+            used first in the ingestion cascade
+    """
+    if _use_anthropic() and ANTHROPIC_API_KEY:
         os.environ["ANTHROPIC_API_KEY"] = ANTHROPIC_API_KEY
         return LLM(
-            model=f"anthropic/{ANTHROPIC_MODEL}",
+            model=get_model_name(tier),
             temperature=0.1,
         )
     elif OPENAI_API_KEY:
         os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
         return LLM(
-            model=f"openai/{OPENAI_MODEL}",
+            model=get_model_name(tier),
             temperature=0.1,
         )
     else:
         raise ValueError("No valid LLM API key configured. Set OPENAI_API_KEY or ANTHROPIC_API_KEY.")
 
 
-def create_ingestion_agent() -> Agent:
+def create_ingestion_agent(documents: list = None) -> Agent:
     """
     Create the Document Ingestion Agent.
     
@@ -40,6 +69,9 @@ def create_ingestion_agent() -> Agent:
     - Extracting key information from documents
     - Identifying document structure and sections
     - Preparing content for analysis
+    
+    Args:
+        documents: Optional subset of document paths the agent's tools are limited to
     """
     return Agent(
         role="Policy Document Ingestion Specialist",
@@ -51,14 +83,39 @@ def create_ingestion_agent() -> Agent:
         and can quickly identify important policy requirements, controls, and obligations.
         You understand regulatory frameworks like GDPR, SOX, Basel III, and industry 
         standards for data governance and risk management.""",
-        tools=[DocumentReaderTool(), DocumentSearchTool()],
+        tools=[DocumentReaderTool(documents=documents), DocumentSearchTool(documents=documents)],
         llm=get_llm(),
         verbose=True,
         allow_delegation=False,
     )
 
 
-def create_analysis_agent() -> Agent:
+def create_extraction_agent(tier: str = "default") -> Agent:
+    """
+    Create a Document Extraction Agent for a single document.
+    
+    Used by the ingestion cascade: the document text is supplied in the
+    task, so the agent needs no tools.
+    
+    Args:
+        tier: LLM tier to use ("fast" or "default")
+    """
+    return Agent(
+        role="Policy Document Extraction Specialist",
+        goal="""Extract the structure, requirements, controls and obligations of a 
+        single policy document completely and accurately, and report how confident 
+        you are in the extraction.""",
+        backstory="""You are an expert document analyst with years of experience in 
+        financial services and regulatory compliance. You extract policy requirements 
+        precisely, never invent content that is not in the document, and say clearly 
+        when a document is ambiguous or hard to read.""",
+        llm=get_llm(tier),
+        verbose=True,
+        allow_delegation=False,
+    )
+
+
+def create_analysis_agent(documents: list = None) -> Agent:
     """
     Create the Policy Analysis Agent.
     
@@ -67,6 +124,9 @@ def create_analysis_agent() -> Agent:
     - Identifying gaps and inconsistencies
     - Mapping policies to regulatory requirements
     - Assessing compliance posture
+    
+    Args:
+        documents: Optional subset of document paths the agent's tools are limited to
     """
     return Agent(
         role="Policy Compliance Analyst",
@@ -79,7 +139,7 @@ def create_analysis_agent() -> Agent:
         and implement effective compliance programs. You understand both the letter 
         and spirit of regulations and can identify potential risks before they 
         become issues.""",
-        tools=[DocumentSearchTool()],
+        tools=[DocumentSearchTool(documents=documents)],
         llm=get_llm(),
         verbose=True,
         allow_delegation=True,
@@ -0,0 +1,399 @@
+"""Confidence-based model cascade for per-document ingestion."""
+
+import re
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from crewai import Crew, Process
+from pydantic import ValidationError
+
+from src.config.settings import (
+    CASCADE_MIN_CONFIDENCE,
+    CASCADE_MIN_SECTION_COVERAGE,
+    MAX_CHUNK_SIZE,
+)
+from src.agents.policy_agents import create_extraction_agent, get_model_name
+from src.tasks.policy_tasks import create_document_extraction_task
+from src.tasks.schemas import DocumentExtraction
+from src.utils.document_index import HEADING_RE, split_into_sections
+from src.utils.tokens import count_tokens, truncate_to_tokens
+
+
+# Regulations whose mention in the text must show up in the extraction
+REGULATION_PATTERNS = {
+    "GDPR": re.compile(r"\bGDPR\b|general data protection regulation", re.IGNORECASE),
+    "CCPA": re.compile(r"\bCCPA\b|california consumer privacy", re.IGNORECASE),
+    "SOX": re.compile(r"\bSOX\b|sarbanes[- ]oxley", re.IGNORECASE),
+    "Basel": re.compile(r"\bbasel\b", re.IGNORECASE),
+    "HIPAA": re.compile(r"\bHIPAA\b"),
+    "PCI DSS": re.compile(r"\bPCI(\s*DSS)?\b"),
+    "AML": re.compile(r"\bAML\b|anti[- ]money laundering", re.IGNORECASE),
+}
+
+MIN_HEADINGS_FOR_COVERAGE = 3
+
+# DocumentExtraction list fields combined across a document's chunks
+LIST_FIELDS = (
+    "sections", "requirements", "controls", "roles", "regulations",
+    "cross_references", "unclear_areas",
+)
+
+
+def cascade_enabled(requested: bool = True) -> bool:
+    """
+    Whether the model cascade can run.
+
+    The cascade only saves time and cost when the fast tier is a different
+    (cheaper) model than the default tier; otherwise it is turned off with
+    a warning.
+    """
+    if not requested:
+        return False
+    fast, default = get_model_name("fast"), get_model_name()
+    if fast == default:
+        warnings.warn(
+            f"Model cascade disabled: the fast model is the same as the main model ({default}). "
+            "Set OPENAI_FAST_MODEL / ANTHROPIC_FAST_MODEL to a cheaper model to use it.",
+            stacklevel=2,
+        )
+        return False
+    return True
+
+
+def _sections(text: str) -> List[str]:
+    """Split text into sections at heading lines, keeping the lines as written."""
+    sections, lines = [], []
+    for line in text.splitlines():
+        if HEADING_RE.match(line.strip()) and lines:
+            sections.append("\n".join(lines))
+            lines = []
+        lines.append(line)
+    if lines:
+        sections.append("\n".join(lines))
+    return sections
+
+
+def split_into_chunks(text: str, chunk_size: int = MAX_CHUNK_SIZE) -> List[str]:
+    """
+    Split document text into chunks of at most chunk_size tokens.
+
+    Chunks break at section headings; a section longer than chunk_size is
+    split between lines. Nothing is summarized or dropped, except the tail
+    of a single line longer than chunk_size.
+    """
+    if count_tokens(text) <= chunk_size:
+        return [text]
+
+    units = []
+    for section in _sections(text):
+        if count_tokens(section) <= chunk_size:
+            units.append(section)
+        else:
+            units.extend(truncate_to_tokens(line, chunk_size) for line in section.splitlines())
+
+    chunks, current, size = [], [], 0
+    for unit in units:
+        tokens = count_tokens(unit) + 1  # joining newline
+        if current and size + tokens > chunk_size:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def merge_extractions(parts: List[DocumentExtraction]) -> DocumentExtraction:
+    """
+    Combine the extractions of a document's chunks into one.
+
+    Scalar fields come from the first chunk that states them, list fields
+    are concatenated without repeats, and confidence is the lowest of the
+    chunks.
+    """
+    merged = parts[0].model_dump()
+    for part in parts[1:]:
+        for name in ("title", "purpose", "version", "effective_date", "review_requirements"):
+            merged[name] = merged[name] or getattr(part, name)
+        for name in LIST_FIELDS:
+            merged[name] += [item for item in getattr(part, name) if item not in merged[name]]
+    merged["confidence"] = min(part.confidence for part in parts)
+    return DocumentExtraction(**merged)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def section_coverage(extraction: DocumentExtraction, text: str) -> Optional[float]:
+    """
+    Fraction of the document's headings that appear in the extraction.
+
+    Returns:
+        Coverage between 0 and 1, or None if the document has too few
+        headings for the check to be meaningful
+    """
+    headings = {_normalize(h) for h, _ in split_into_sections(text) if h}
+    headings.discard("")
+    if len(headings) < MIN_HEADINGS_FOR_COVERAGE:
+        return None
+    extracted = [_normalize(s) for s in extraction.sections]
+    found = sum(
+        1 for heading in headings
+        if any(heading in s or (s and s in heading) for s in extracted)
+    )
+    return found / len(headings)
+
+
+def validate_extraction(
+    extraction: Optional[DocumentExtraction],
+    text: str,
+    min_confidence: float = CASCADE_MIN_CONFIDENCE,
+    min_section_coverage: float = CASCADE_MIN_SECTION_COVERAGE,
+    first_part: bool = True,
+) -> List[str]:
+    """
+    Check an extraction for schema, confidence and completeness problems.
+
+    Args:
+        text: The text the extraction was made from, as given to the model
+        first_part: False for later chunks of a document, which need not
+            state its title and purpose
+
+    Returns:
+        Reasons to escalate; empty if the extraction can be accepted
+    """
+    if extraction is None:
+        return ["output did not match the DocumentExtraction schema"]
+
+    reasons = []
+    if extraction.confidence < min_confidence:
+        reasons.append(f"low confidence ({extraction.confidence:.2f})")
+    if first_part and (not extraction.title.strip() or not extraction.purpose.strip()):
+        reasons.append("missing title or purpose")
+    if not extraction.requirements and not extraction.controls and count_tokens(text) > 200:
+        reasons.append("no requirements or controls extracted")
+
+    coverage = section_coverage(extraction, text)
+    if coverage is not None and coverage < min_section_coverage:
+        reasons.append(f"low section coverage ({coverage:.0%})")
+
+    extracted = " ".join(extraction.regulations)
+    missed = [
+        name for name, pattern in REGULATION_PATTERNS.items()
+        if pattern.search(text) and not pattern.search(extracted)
+    ]
+    if missed:
+        reasons.append(f"missed referenced regulations: {', '.join(missed)}")
+    return reasons
+
+
+def _extraction_from_output(crew_output) -> Optional[DocumentExtraction]:
+    """Get the DocumentExtraction from a single-task crew's output."""
+    for task_output in getattr(crew_output, "tasks_output", []):
+        if isinstance(task_output.pydantic, DocumentExtraction):
+            return task_output.pydantic
+        try:
+            return DocumentExtraction.model_validate_json(task_output.raw)
+        except (ValidationError, ValueError, TypeError):
+            continue
+    return None
+
+
+def run_extraction_crew(
+    tier: str,
+    document: str,
+    text: str,
+    document_focus: str = None,
+    part: Optional[tuple] = None,
+):
+    """Extract one document (or one (number, total) part of it) with a single-agent crew."""
+    agent = create_extraction_agent(tier)
+    task = create_document_extraction_task(agent, document, text, document_focus, part)
+    crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=True)
+    return _extraction_from_output(crew.kickoff())
+
+
+@dataclass
+class CascadeRecord:
+    """What the cascade did for one document."""
+    document: str
+    tokens: int
+    chunks: int = 1
+    calls: int = 0
+    tokens_sent: int = 0
+    default_tokens: int = 0
+    tier: Optional[str] = None
+    escalated: bool = False
+    reasons: List[str] = field(default_factory=list)
+    fast_seconds: float = 0.0
+    default_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class ModelCascade:
+    """
+    Ingests documents one at a time, fast model first.
+
+    Documents longer than MAX_CHUNK_SIZE tokens are extracted in chunks
+    split at section headings, so validation always sees exactly the text
+    the model was given. Each extraction from the fast model is validated
+    against the DocumentExtraction schema, its self-reported confidence,
+    section coverage and referenced regulations; chunks that fail are
+    extracted again with the default (stronger) model. Per-document tiers,
+    reasons and latencies are kept for the run's metrics.
+    """
+
+    def __init__(
+        self,
+        min_confidence: float = CASCADE_MIN_CONFIDENCE,
+        min_section_coverage: float = CASCADE_MIN_SECTION_COVERAGE,
+        runner: Callable[..., Optional[DocumentExtraction]] = run_extraction_crew,
+    ):
+        self.min_confidence = min_confidence
+        self.min_section_coverage = min_section_coverage
+        self.runner = runner
+        self.records: List[CascadeRecord] = []
+
+    def _attempt(
+        self,
+        record: CascadeRecord,
+        tier: str,
+        document: str,
+        text: str,
+        document_focus: str,
+        part: Optional[tuple],
+    ) -> tuple:
+        tokens = count_tokens(text)
+        record.calls += 1
+        record.tokens_sent += tokens
+        if tier == "default":
+            record.default_tokens += tokens
+        started = time.monotonic()
+        try:
+            extraction = self.runner(tier, document, text, document_focus, part)
+            error = None
+        except Exception as e:
+            extraction, error = None, f"{type(e).__name__}: {e}"
+        return extraction, error, time.monotonic() - started
+
+    def _extract_chunk(
+        self,
+        record: CascadeRecord,
+        document: str,
+        text: str,
+        document_focus: str,
+        part: Optional[tuple],
+    ) -> tuple:
+        """Extract one chunk; returns (extraction, tier), escalating if needed."""
+        extraction, error, seconds = self._attempt(record, "fast", document, text, document_focus, part)
+        record.fast_seconds += seconds
+        reasons = [f"fast model failed: {error}"] if error else validate_extraction(
+            extraction, text, self.min_confidence, self.min_section_coverage,
+            first_part=part is None or part[0] == 1,
+        )
+        if not reasons:
+            return extraction, "fast"
+
+        record.escalated = True
+        record.reasons += [r for r in reasons if r not in record.reasons]
+        strong, error, seconds = self._attempt(record, "default", document, text, document_focus, part)
+        record.default_seconds += seconds
+        if strong is not None:
+            return strong, "default"
+        # Fall back to a schema-valid fast result rather than losing the chunk
+        record.error = error or "output did not match the DocumentExtraction schema"
+        return extraction, "fast" if extraction is not None else None
+
+    def extract(self, document: str, text: str, document_focus: str = None) -> Optional[DocumentExtraction]:
+        """
+        Extract one document, escalating chunks to the default model if needed.
+
+        Returns:
+            The accepted extraction (merged across chunks), or None if no
+            chunk could be extracted
+        """
+        chunks = split_into_chunks(text, MAX_CHUNK_SIZE)
+        record = CascadeRecord(
+            document=document, tokens=sum(count_tokens(c) for c in chunks), chunks=len(chunks)
+        )
+        self.records.append(record)
+
+        parts, tiers = [], set()
+        for number, chunk in enumerate(chunks, 1):
+            part = (number, len(chunks)) if len(chunks) > 1 else None
+            extraction, tier = self._extract_chunk(record, document, chunk, document_focus, part)
+            if extraction is not None:
+                parts.append(extraction)
+                tiers.add(tier)
+        if not parts:
+            return None
+        record.tier = "default" if "default" in tiers else "fast"
+        return merge_extractions(parts)
+
+    def run(self, documents: Dict[str, str], document_focus: str = None) -> List[DocumentExtraction]:
+        """
+        Extract several documents.
+
+        Args:
+            documents: Document name -> extracted text
+
+        Returns:
+            The accepted extractions, in input order
+        """
+        extractions = []
+        for document, text in documents.items():
+            extraction = self.extract(document, text, document_focus)
+            if extraction is not None:
+                extractions.append(extraction)
+        return extractions
+
+    def summary(self, baseline_seconds_per_1k_tokens: float = None) -> dict:
+        """
+        Escalation rate and latency metrics for the run.
+
+        Latency savings are estimated against running every document on the
+        default model only, at the default model's seconds per 1k input
+        tokens measured on this run's escalations (or the given baseline
+        when nothing was escalated).
+        """
+        escalated = [r for r in self.records if r.escalated]
+        default_tokens = sum(r.default_tokens for r in escalated if r.default_seconds)
+        rate = (
+            sum(r.default_seconds for r in escalated) / default_tokens * 1000
+            if default_tokens else baseline_seconds_per_1k_tokens
+        )
+        actual = sum(r.fast_seconds + r.default_seconds for r in self.records)
+        estimated_default_only = (
+            sum(r.tokens for r in self.records) / 1000 * rate if rate is not None else None
+        )
+
+        reasons = {}
+        for record in escalated:
+            for reason in record.reasons:
+                key = reason.split(" (")[0].split(":")[0]
+                reasons[key] = reasons.get(key, 0) + 1
+
+        return {
+            "documents": len(self.records),
+            "accepted_fast": sum(1 for r in self.records if r.tier == "fast" and not r.escalated),
+            "escalated": len(escalated),
+            "escalation_rate": round(len(escalated) / len(self.records), 3) if self.records else 0.0,
+            "failed": sum(1 for r in self.records if r.tier is None),
+            "escalation_reasons": reasons,
+            "fast_seconds": round(sum(r.fast_seconds for r in self.records), 2),
+            "default_seconds": round(sum(r.default_seconds for r in self.records), 2),
+            "total_seconds": round(actual, 2),
+            "default_seconds_per_1k_tokens": round(rate, 3) if rate is not None else None,
+            "estimated_default_only_seconds": (
+                round(estimated_default_only, 2) if estimated_default_only is not None else None
+            ),
+            "estimated_savings_seconds": (
+                round(estimated_default_only - actual, 2) if estimated_default_only is not None else None
+            ),
+            "per_document": [asdict(r) for r in self.records],
+        }
+
@@ -11,6 +11,10 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 POLICY_DOCS_DIR = Path(os.getenv("POLICY_DOCS_DIR", BASE_DIR / "policy_documents"))
 OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", BASE_DIR / "output"))
+# Additional document roots (e.g. network shares), separated by os.pathsep
+POLICY_DOCS_DIRS = [POLICY_DOCS_DIR] + [
+    Path(p) for p in os.getenv("POLICY_DOCS_DIRS", "").split(os.pathsep) if p
+]
 
 # Ensure directories exist
 POLICY_DOCS_DIR.mkdir(exist_ok=True)
@@ -23,10 +27,87 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
 
+# Model cascade: per-document ingestion on a fast model, escalated to the
+# main model above when the result fails validation or has low confidence.
+# The fast models default to the main ones, which leaves the cascade off;
+# set them to a cheaper model than OPENAI_MODEL / ANTHROPIC_MODEL to use it.
+MODEL_CASCADE = os.getenv("MODEL_CASCADE", "false").lower() == "true"
+OPENAI_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", OPENAI_MODEL)
+ANTHROPIC_FAST_MODEL = os.getenv("ANTHROPIC_FAST_MODEL", ANTHROPIC_MODEL)
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", 0.7))
+CASCADE_MIN_SECTION_COVERAGE = float(os.getenv("CASCADE_MIN_SECTION_COVERAGE", 0.6))
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 # Document processing settings
-SUPPORTED_EXTENSIONS = [".pdf", ".docx", ".doc", ".txt", ".md"]
-MAX_CHUNK_SIZE = 4000  # tokens
+MAX_CHUNK_SIZE = int(os.getenv("MAX_CHUNK_SIZE", 4000))  # tokens
 CHUNK_OVERLAP = 200  # tokens
+
+# Report versioning
+REPORTS_DIR = OUTPUT_DIR / "reports"
+INCREMENTAL_REPORTS = os.getenv("INCREMENTAL_REPORTS", "true").lower() == "true"
+FINGERPRINT_CACHE = Path(os.getenv("FINGERPRINT_CACHE", OUTPUT_DIR / "document_fingerprints.json"))
+
+# Findings warehouse (cross-run analytics)
+FINDINGS_DB = Path(os.getenv("FINDINGS_DB", OUTPUT_DIR / "findings.db"))
+
+# Text extraction (isolated worker processes)
+EXTRACTION_ISOLATION = os.getenv("EXTRACTION_ISOLATION", "true").lower() == "true"
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", min(4, os.cpu_count() or 1)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", 120))  # seconds per file
+EXTRACTION_MEMORY_LIMIT_MB = int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", 2048))  # per worker
+# Modules that register extra extractors (see register_extractor), comma-separated
+EXTRACTOR_PLUGINS = [m.strip() for m in os.getenv("EXTRACTOR_PLUGINS", "").split(",") if m.strip()]
+OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() == "true"
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+
+# Memory-mapped store of extracted text (shared by all processes)
+TEXT_STORE_ENABLED = os.getenv("TEXT_STORE_ENABLED", "true").lower() == "true"
+TEXT_STORE_DIR = Path(os.getenv("TEXT_STORE_DIR", OUTPUT_DIR / "text_store"))
+TEXT_STORE_MAX_SEGMENTS = int(os.getenv("TEXT_STORE_MAX_SEGMENTS", 16))  # compacted beyond this
+
+# Near-duplicate detection (MinHash/LSH over extracted text)
+NEAR_DUPLICATE_DETECTION = os.getenv("NEAR_DUPLICATE_DETECTION", "true").lower() == "true"
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.85))  # estimated Jaccard
+MINHASH_CACHE = Path(os.getenv("MINHASH_CACHE", OUTPUT_DIR / "minhash_signatures.json"))
+# Off for distributed jobs: the coordinator would extract the whole catalog itself
+DISTRIBUTED_NEAR_DUPLICATE_DETECTION = (
+    os.getenv("DISTRIBUTED_NEAR_DUPLICATE_DETECTION", "false").lower() == "true"
+)
+
+# Index-driven document routing for --focus / --areas
+DOCUMENT_ROUTING = os.getenv("DOCUMENT_ROUTING", "true").lower() == "true"
+DOCUMENT_INDEX_DB = Path(os.getenv("DOCUMENT_INDEX_DB", OUTPUT_DIR / "document_index.db"))
+ROUTING_MAX_DOCUMENTS = int(os.getenv("ROUTING_MAX_DOCUMENTS", 50))
+
+# Tool result memoization (shared by all agents)
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", 256))  # entries
+
+# Sharded (multi-process / multi-node) processing
+WORK_QUEUE_DB = Path(os.getenv("WORK_QUEUE_DB", OUTPUT_DIR / "work_queue.db"))
+SHARD_SIZE = int(os.getenv("SHARD_SIZE", 10))  # documents per shard
+SHARD_LEASE_SECONDS = float(os.getenv("SHARD_LEASE_SECONDS", 300))
+SHARD_MAX_ATTEMPTS = int(os.getenv("SHARD_MAX_ATTEMPTS", 3))
+# Set when workers on several nodes share WORK_QUEUE_DB over a network
+# filesystem: WAL needs shared memory and only works on one host
+WORK_QUEUE_SHARED = os.getenv("WORK_QUEUE_SHARED", "false").lower() == "true"
+
+# Context compaction between sequential tasks
+CONTEXT_COMPACTION = os.getenv("CONTEXT_COMPACTION", "true").lower() == "true"
+INGESTION_CONTEXT_BUDGET = int(os.getenv("INGESTION_CONTEXT_BUDGET", MAX_CHUNK_SIZE))  # tokens
+ANALYSIS_CONTEXT_BUDGET = int(os.getenv("ANALYSIS_CONTEXT_BUDGET", MAX_CHUNK_SIZE))  # tokens
+
+# Deadline-aware scheduling (--time-budget / --token-budget); unset means no limit
+RUN_TIME_BUDGET = float(os.getenv("RUN_TIME_BUDGET")) if os.getenv("RUN_TIME_BUDGET") else None  # seconds
+RUN_TOKEN_BUDGET = int(os.getenv("RUN_TOKEN_BUDGET")) if os.getenv("RUN_TOKEN_BUDGET") else None
+REDUCED_DEPTH_CHUNK_SIZE = int(os.getenv("REDUCED_DEPTH_CHUNK_SIZE", MAX_CHUNK_SIZE // 4))  # tokens
+
+# Dry-run planner (--plan) estimates
+PLAN_PROMPT_TOKENS_PER_SECOND = float(os.getenv("PLAN_PROMPT_TOKENS_PER_SECOND", 2000))
+PLAN_COMPLETION_TOKENS_PER_SECOND = float(os.getenv("PLAN_COMPLETION_TOKENS_PER_SECOND", 50))
+PLAN_CALL_LATENCY_SECONDS = float(os.getenv("PLAN_CALL_LATENCY_SECONDS", 1.0))
+# USD per million tokens; overrides the built-in price list for the configured model
+LLM_INPUT_COST_PER_MTOK = os.getenv("LLM_INPUT_COST_PER_MTOK")
+LLM_OUTPUT_COST_PER_MTOK = os.getenv("LLM_OUTPUT_COST_PER_MTOK")
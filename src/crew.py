@@ -1,7 +1,22 @@
 """Main Crew definition for Policy Document Analysis."""
 
+import json
+from pathlib import Path
+
 from crewai import Crew, Process
 
+from src.config.settings import (
+    OUTPUT_DIR,
+    INCREMENTAL_REPORTS,
+    CONTEXT_COMPACTION,
+    DOCUMENT_ROUTING,
+    MODEL_CASCADE,
+    NEAR_DUPLICATE_DETECTION,
+    RUN_TIME_BUDGET,
+    RUN_TOKEN_BUDGET,
+    INGESTION_CONTEXT_BUDGET,
+    ANALYSIS_CONTEXT_BUDGET,
+)
 from src.agents.policy_agents import (
     create_ingestion_agent,
     create_analysis_agent,
@@ -11,13 +26,44 @@ from src.tasks.policy_tasks import (
     create_ingestion_task,
     create_analysis_task,
     create_report_task,
+    create_incremental_report_task,
+)
+from src.tasks.schemas import AnalysisResult
+from src.cascade import ModelCascade, cascade_enabled
+from src.scheduler import COVERAGE_SECTION_KEY, DeadlineScheduler, document_priority
+from src.tools.tool_cache import get_tool_cache
+from src.utils.catalog import build_catalog, cached_documents, document_key, load_document_texts
+from src.utils.compaction import ContextCompactor
+from src.utils.document_index import DocumentIndex, routing_summary
+from src.utils.near_duplicates import duplicate_paths, duplicates_summary, find_near_duplicates
+from src.utils.findings import (
+    build_report_json,
+    diff_findings,
+    extract_analysis_result,
+    finding_record,
+    write_findings_jsonl,
 )
+from src.utils.report_store import (
+    ReportStore,
+    build_report_diff,
+    fingerprint_documents,
+    join_sections,
+    sections_to_regenerate,
+    split_sections,
+)
+from src.utils.warehouse import FindingsWarehouse
 
 
 def create_policy_analysis_crew(
     document_focus: str = None,
     focus_areas: list = None,
     report_type: str = "full",
+    compactor: ContextCompactor = None,
+    routed_documents: list = None,
+    extractions: list = None,
+    duplicate_clusters: list = None,
+    coverage_note: str = None,
+    previous_findings: list = None,
 ) -> Crew:
     """
     Create the Policy Analysis Crew with all agents and tasks.
@@ -26,24 +72,37 @@ def create_policy_analysis_crew(
         document_focus: Optional specific document or topic to focus on
         focus_areas: Optional list of regulatory areas to focus on
         report_type: Type of report to generate ("executive", "detailed", "full")
+        compactor: Optional compactor applied to task outputs before hand-off
+        routed_documents: Optional index-selected documents to limit the run to
+        extractions: Optional per-document extractions from the model cascade,
+            which replace the ingestion agent and task
+        duplicate_clusters: Optional near-duplicate clusters; only their
+            canonical documents are read
+        coverage_note: Optional description of coverage skipped or reduced to
+            meet the run's budget, for the report to state
+        previous_findings: Optional findings of the previous run, which the
+            analysis reuses verbatim while they are still open
     
     Returns:
         Configured Crew ready to execute
     """
-    # Create agents
-    ingestion_agent = create_ingestion_agent()
-    analysis_agent = create_analysis_agent()
-    report_agent = create_report_agent()
-    
-    # Create tasks
-    ingestion_task = create_ingestion_task(ingestion_agent, document_focus)
-    analysis_task = create_analysis_task(analysis_agent, ingestion_task, focus_areas)
-    report_task = create_report_task(report_agent, analysis_task, report_type)
+    agents, tasks = _build_tasks(
+        lambda agent, analysis_task: create_report_task(
+            agent, analysis_task, report_type, coverage_note
+        ),
+        document_focus=document_focus,
+        focus_areas=focus_areas,
+        compactor=compactor,
+        routed_documents=routed_documents,
+        extractions=extractions,
+        duplicate_clusters=duplicate_clusters,
+        previous_findings=previous_findings,
+    )
     
     # Create and return the crew
     crew = Crew(
-        agents=[ingestion_agent, analysis_agent, report_agent],
-        tasks=[ingestion_task, analysis_task, report_task],
+        agents=agents,
+        tasks=tasks,
         process=Process.sequential,  # Tasks run in order
         verbose=True,
     )
@@ -51,27 +110,420 @@ def create_policy_analysis_crew(
     return crew
 
 
+def _build_tasks(
+    create_report,
+    document_focus: str = None,
+    focus_areas: list = None,
+    compactor: ContextCompactor = None,
+    routed_documents: list = None,
+    extractions: list = None,
+    duplicate_clusters: list = None,
+    previous_findings: list = None,
+) -> tuple:
+    """
+    Create the agents and tasks shared by full and incremental runs.
+    
+    Args:
+        create_report: Callable (report agent, analysis task) -> report task
+        (other arguments as for create_policy_analysis_crew)
+    
+    Returns:
+        Tuple of (agents, tasks) for a sequential crew
+    """
+    documents = _scoped_documents(routed_documents, duplicate_clusters)
+    
+    # Create agents
+    analysis_agent = create_analysis_agent(documents)
+    report_agent = create_report_agent()
+    
+    # Create tasks
+    if extractions is None:
+        ingestion_agent = create_ingestion_agent(documents)
+        ingestion_task = create_ingestion_task(
+            ingestion_agent, document_focus, routed_documents, duplicate_clusters
+        )
+        analysis_task = create_analysis_task(
+            analysis_agent, ingestion_task, focus_areas, previous_findings=previous_findings
+        )
+    else:
+        ingestion_agent = ingestion_task = None
+        if compactor is not None:
+            # Extractions stand in for the ingestion output, so get its budget
+            extractions = compactor.compact_extractions(extractions, INGESTION_CONTEXT_BUDGET)
+        analysis_task = create_analysis_task(
+            analysis_agent,
+            focus_areas=focus_areas,
+            extractions=extractions,
+            duplicate_clusters=duplicate_clusters,
+            previous_findings=previous_findings,
+        )
+    report_task = create_report(report_agent, analysis_task)
+    
+    if compactor is not None:
+        _attach_compaction(compactor, ingestion_task, analysis_task)
+    
+    agents = [a for a in (ingestion_agent, analysis_agent, report_agent) if a is not None]
+    tasks = [t for t in (ingestion_task, analysis_task, report_task) if t is not None]
+    return agents, tasks
+
+
+def _attach_compaction(compactor: ContextCompactor, ingestion_task, analysis_task) -> None:
+    """Compact ingestion and analysis outputs before the next task reads them."""
+    if ingestion_task is not None:
+        ingestion_task.callback = compactor.callback_for("ingestion", INGESTION_CONTEXT_BUDGET)
+    analysis_task.callback = compactor.callback_for("analysis", ANALYSIS_CONTEXT_BUDGET)
+
+
+def _scoped_documents(routed_documents: list = None, duplicate_clusters: list = None):
+    """Paths the document tools are limited to, or None for the whole library."""
+    skipped = duplicate_paths(duplicate_clusters or [])
+    if routed_documents:
+        return [d.path for d in routed_documents if d.path not in skipped]
+    if skipped:
+        return [str(p) for p in build_catalog() if str(p) not in skipped]
+    return None
+
+
+def _run_cascade(
+    cascade: ModelCascade,
+    document_focus: str = None,
+    routed_documents: list = None,
+    duplicate_clusters: list = None,
+) -> list:
+    """Ingest the run's documents one by one through the model cascade."""
+    paths = _scoped_documents(routed_documents, duplicate_clusters) or build_catalog()
+    texts, _ = load_document_texts(paths)
+    return cascade.run(
+        {document_key(path): text for path, text in texts.items()},
+        document_focus,
+    )
+
+
+def _ingest_documents(
+    model_cascade: ModelCascade = None,
+    scheduler: DeadlineScheduler = None,
+    document_focus: str = None,
+    routed_documents: list = None,
+    duplicate_clusters: list = None,
+    previous_analysis: AnalysisResult = None,
+    changed_documents: list = None,
+):
+    """
+    Ingest documents outside the crew when a budget or the cascade applies.
+
+    Returns:
+        Per-document extractions, or None to use the crew's ingestion task
+    """
+    if scheduler is not None:
+        paths = _scoped_documents(routed_documents, duplicate_clusters) or build_catalog()
+        scores = {d.path: d.score for d in routed_documents or []}
+
+        def priority(path: str, text: str) -> float:
+            return document_priority(path, text, previous_analysis, changed_documents, scores.get(path))
+
+        # Text is extracted in priority batches while the budget allows
+        return scheduler.run(paths, priority, document_focus)
+    if model_cascade is not None:
+        return _run_cascade(model_cascade, document_focus, routed_documents, duplicate_clusters)
+    return None
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Write a JSON artifact to the output directory."""
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def _run_incremental_report(
+    previous: dict,
+    changed_documents: list,
+    document_focus: str = None,
+    focus_areas: list = None,
+    report_type: str = "full",
+    compactor: ContextCompactor = None,
+    routed_documents: list = None,
+    extractions: list = None,
+    duplicate_clusters: list = None,
+    coverage_note: str = None,
+    previous_findings: list = None,
+) -> tuple:
+    """
+    Re-run ingestion and analysis, then regenerate only the affected report sections.
+
+    Returns:
+        Tuple of (merged section map, regenerated section keys, analysis result)
+    """
+    prev_sections = previous["sections"]
+    to_update = sections_to_regenerate(prev_sections, changed_documents)
+
+    agents, tasks = _build_tasks(
+        lambda agent, analysis_task: create_incremental_report_task(
+            agent,
+            analysis_task,
+            previous_sections=prev_sections,
+            sections_to_update=to_update,
+            changed_documents=changed_documents,
+            report_type=report_type,
+            coverage_note=coverage_note,
+        ),
+        document_focus=document_focus,
+        focus_areas=focus_areas,
+        compactor=compactor,
+        routed_documents=routed_documents,
+        extractions=extractions,
+        duplicate_clusters=duplicate_clusters,
+        previous_findings=previous_findings,
+    )
+    crew = Crew(agents=agents, tasks=tasks, process=Process.sequential, verbose=True)
+    result = crew.kickoff()
+
+    # Splice rewritten sections over the previous version, keeping its order
+    rewritten = split_sections(str(result))
+    rewritten.pop("preamble", None)
+    sections = {
+        key: rewritten.get(key, text)
+        for key, text in prev_sections.items()
+    }
+    for key, text in rewritten.items():
+        sections.setdefault(key, text)
+
+    return sections, list(rewritten), extract_analysis_result(result)
+
+
 def run_policy_analysis(
     document_focus: str = None,
     focus_areas: list = None,
     report_type: str = "full",
+    incremental: bool = INCREMENTAL_REPORTS,
+    compaction: bool = CONTEXT_COMPACTION,
+    routing: bool = DOCUMENT_ROUTING,
+    cascade: bool = MODEL_CASCADE,
+    deduplicate: bool = NEAR_DUPLICATE_DETECTION,
+    time_budget: float = RUN_TIME_BUDGET,
+    token_budget: int = RUN_TOKEN_BUDGET,
 ) -> str:
     """
     Run the complete policy analysis workflow.
     
+    Each report is stored as a versioned set of sections under
+    output/reports/. The structured analysis findings are written to
+    output/findings.jsonl and output/compliance_report.json, and recorded
+    in the findings warehouse (output/findings.db). When incremental is
+    enabled and a previous report with the same scope exists, only the
+    sections that reference changed documents are regenerated, and an
+    unchanged corpus reuses the previous report. A machine-readable diff
+    against the previous run is written to output/report_diff.json.
+    
+    With compaction enabled, ingestion and analysis outputs are deduplicated
+    and summarized to their per-stage token budgets before being passed on,
+    and compression metrics are written to output/compaction_metrics.json.
+    Tool result cache hit rates for the run go to output/tool_cache_stats.json.
+    
+    With routing enabled, focused runs (document_focus or focus_areas) first
+    query the local document index and hand only the matching documents
+    and sections to the crew; the selection is written to output/routing.json.
+    
+    With cascade enabled, each document is ingested separately on the fast
+    model and escalated to the default model when its extraction fails
+    validation or reports low confidence. Escalation rates and latencies are
+    written to output/cascade_metrics.json.
+    
+    With deduplicate enabled, near-identical documents (MinHash/LSH over the
+    extracted text) are clustered during discovery and only the newest copy
+    in each cluster is read; the other copies are described to the crew by
+    their section-level differences. Clusters are written to
+    output/duplicates.json.
+    
+    With a time_budget and/or token_budget, documents are ingested one by
+    one in order of compliance risk, and the analysis and report tasks get
+    an estimated reserve. As the budget runs low, documents are ingested at
+    reduced depth and finally skipped. The report ends with a "Coverage
+    Limitations" section listing them, and the schedule is written to
+    output/schedule.json. Routing and near-duplicate detection then only
+    consider documents whose text is already cached, so that nothing is
+    extracted outside the budget.
+    
     Args:
         document_focus: Optional specific document or topic to focus on
         focus_areas: Optional list of regulatory areas to focus on
         report_type: Type of report to generate
+        incremental: Reuse unchanged sections of the previous report
+        compaction: Compact task outputs before passing them to the next task
+        routing: Pre-select documents for focused runs from the document index
+        cascade: Ingest documents through the fast/default model cascade
+        deduplicate: Analyze only one copy of near-duplicate documents
+        time_budget: Seconds the whole run may take, report included
+        token_budget: LLM tokens the whole run may use
     
     Returns:
         The generated compliance report
     """
-    crew = create_policy_analysis_crew(
-        document_focus=document_focus,
-        focus_areas=focus_areas,
-        report_type=report_type,
+    store = ReportStore()
+    run_id = store.new_run_id()
+    scope = {
+        "report_type": report_type,
+        "document_focus": document_focus,
+        "focus_areas": focus_areas,
+    }
+    documents = fingerprint_documents()
+    compactor = ContextCompactor() if compaction else None
+    tool_cache = get_tool_cache()
+    tool_cache.reset_stats()
+    model_cascade = ModelCascade() if cascade_enabled(cascade) else None
+    scheduler = (
+        DeadlineScheduler(time_budget, token_budget, report_type, compaction, cascade=model_cascade)
+        if time_budget is not None or token_budget is not None else None
     )
-    
-    result = crew.kickoff()
-    return result
+
+    # Under a budget only the scheduler extracts, while the budget allows:
+    # routing and near-duplicate detection only use cached text
+    cached_only = scheduler is not None
+    routed_documents = None
+    if routing and (document_focus or focus_areas):
+        with DocumentIndex() as index:
+            refresh = index.refresh(cached_only=cached_only)
+            routed_documents = index.route(document_focus, focus_areas) or None
+        catalog_size = sum(refresh[k] for k in ("indexed", "unchanged", "failed", "deferred"))
+        _write_json(
+            OUTPUT_DIR / "routing.json",
+            routing_summary(routed_documents or [], catalog_size),
+        )
+
+    duplicate_clusters = []
+    if deduplicate:
+        candidates = [d.path for d in routed_documents] if routed_documents else build_catalog()
+        if cached_only:
+            candidates = sorted(cached_documents(candidates))
+        duplicate_clusters = find_near_duplicates(candidates)
+        _write_json(
+            OUTPUT_DIR / "duplicates.json",
+            duplicates_summary(duplicate_clusters, len(candidates)),
+        )
+        if routed_documents:
+            skipped = duplicate_paths(duplicate_clusters)
+            routed_documents = [d for d in routed_documents if d.path not in skipped]
+
+    previous = store.latest(scope) if incremental else None
+    # Open findings are shown to the analysis so persisting ones keep their key
+    with FindingsWarehouse() as warehouse:
+        previous_findings = warehouse.open_findings(scope)
+    previous_analysis = (
+        AnalysisResult.model_validate(previous["analysis"])
+        if previous and previous["analysis"] else None
+    )
+
+    changed = None
+    if previous is not None:
+        prev_docs = previous["manifest"]["documents"]
+        changed = sorted(
+            doc for doc in set(prev_docs) | set(documents)
+            if prev_docs.get(doc) != documents.get(doc)
+        )
+    # A budget-limited previous report is regenerated in full, never patched or reused
+    full_run = previous is None or COVERAGE_SECTION_KEY in previous["sections"]
+
+    coverage_note = None
+    if full_run or changed:
+        extractions = _ingest_documents(
+            model_cascade,
+            scheduler,
+            document_focus,
+            routed_documents,
+            duplicate_clusters,
+            previous_analysis,
+            changed,
+        )
+        if scheduler is not None and scheduler.limited:
+            coverage_note = scheduler.coverage_section()
+
+    if full_run:
+        crew = create_policy_analysis_crew(
+            document_focus=document_focus,
+            focus_areas=focus_areas,
+            report_type=report_type,
+            compactor=compactor,
+            routed_documents=routed_documents,
+            duplicate_clusters=duplicate_clusters,
+            extractions=extractions,
+            coverage_note=coverage_note,
+            previous_findings=previous_findings,
+        )
+        result = crew.kickoff()
+        sections = split_sections(str(result))
+        regenerated = list(sections)
+        analysis = extract_analysis_result(result)
+    elif changed:
+        sections, regenerated, analysis = _run_incremental_report(
+            previous,
+            changed,
+            document_focus=document_focus,
+            focus_areas=focus_areas,
+            report_type=report_type,
+            compactor=compactor,
+            routed_documents=routed_documents,
+            duplicate_clusters=duplicate_clusters,
+            extractions=extractions,
+            coverage_note=coverage_note,
+            previous_findings=previous_findings,
+        )
+    else:
+        sections, regenerated = dict(previous["sections"]), []
+        analysis = previous_analysis
+
+    if coverage_note:
+        sections.pop(COVERAGE_SECTION_KEY, None)
+        sections[COVERAGE_SECTION_KEY] = coverage_note
+        if COVERAGE_SECTION_KEY not in regenerated:
+            regenerated.append(COVERAGE_SECTION_KEY)
+
+    # Budget-limited runs and runs without a structured analysis did not
+    # look at every document, so absent findings are not resolutions
+    complete = analysis is not None and not coverage_note
+
+    report = join_sections(sections)
+    (OUTPUT_DIR / "compliance_report.md").write_text(report, encoding="utf-8")
+
+    store.save(
+        run_id,
+        sections,
+        documents,
+        scope,
+        parent=previous["manifest"]["run_id"] if previous else None,
+        regenerated=regenerated,
+        analysis=analysis.model_dump() if analysis else None,
+        complete=complete,
+    )
+
+    report_diff = build_report_diff(previous, run_id, documents, sections, regenerated)
+    report_diff["findings"] = diff_findings(previous_analysis, analysis)
+    _write_json(OUTPUT_DIR / "report_diff.json", report_diff)
+
+    _write_json(
+        OUTPUT_DIR / "compliance_report.json",
+        build_report_json(run_id, scope, sections, analysis),
+    )
+    write_findings_jsonl(
+        OUTPUT_DIR / "findings.jsonl",
+        analysis.findings if analysis else [],
+        run_id,
+    )
+    if compactor is not None and compactor.stats:
+        _write_json(OUTPUT_DIR / "compaction_metrics.json", compactor.summary())
+    _write_json(OUTPUT_DIR / "tool_cache_stats.json", tool_cache.stats())
+    if scheduler is not None and scheduler.documents:
+        _write_json(OUTPUT_DIR / "schedule.json", scheduler.summary())
+    if model_cascade is not None and model_cascade.records:
+        metrics_path = OUTPUT_DIR / "cascade_metrics.json"
+        baseline = (
+            json.loads(metrics_path.read_text(encoding="utf-8")).get("default_seconds_per_1k_tokens")
+            if metrics_path.exists() else None
+        )
+        _write_json(metrics_path, model_cascade.summary(baseline))
+    with FindingsWarehouse() as warehouse:
+        warehouse.record_run(
+            run_id,
+            scope,
+            [finding_record(f, run_id) for f in analysis.findings] if analysis else [],
+            complete=complete,
+        )
+
+    return report
@@ -0,0 +1,326 @@
+"""Sharded policy analysis across multiple worker processes or nodes."""
+
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from crewai import Crew, Process
+
+from src.config.settings import (
+    DISTRIBUTED_NEAR_DUPLICATE_DETECTION,
+    MAX_CHUNK_SIZE,
+    OUTPUT_DIR,
+    SHARD_SIZE,
+    WORK_QUEUE_DB,
+)
+from src.agents.policy_agents import create_analysis_agent, create_report_agent
+from src.tasks.policy_tasks import create_merged_report_task, create_shard_analysis_task
+from src.tasks.schemas import AnalysisResult
+from src.utils.catalog import build_catalog, document_key, load_document_texts
+from src.utils.compaction import compact_text
+from src.utils.near_duplicates import describe_clusters, duplicate_paths, find_near_duplicates
+from src.utils.findings import (
+    build_report_json,
+    extract_analysis_result,
+    finding_record,
+    merge_analyses,
+    write_findings_jsonl,
+)
+from src.utils.report_store import split_sections
+from src.utils.warehouse import FindingsWarehouse
+from src.utils.work_queue import WorkQueue
+
+
+def plan_shards(documents: List[Path], shard_size: int = SHARD_SIZE) -> List[List[str]]:
+    """
+    Split a document catalog into shards of roughly equal total size.
+
+    The number of shards is ceil(len(documents) / shard_size); documents are
+    assigned largest first to the currently smallest shard.
+
+    Returns:
+        List of shards, each a sorted list of document paths
+    """
+    if not documents:
+        return []
+    count = -(-len(documents) // max(1, shard_size))
+    shards = [[] for _ in range(count)]
+    sizes = [0] * count
+
+    for path in sorted(documents, key=lambda p: Path(p).stat().st_size, reverse=True):
+        target = sizes.index(min(sizes))
+        shards[target].append(str(path))
+        sizes[target] += Path(path).stat().st_size
+
+    return [sorted(shard) for shard in shards if shard]
+
+
+def _findings_for(findings: List[dict], documents: List[str], limit: int = 200) -> List[dict]:
+    """The findings (most severe first) that concern the given documents."""
+    names = {document_key(path) for path in documents} | {Path(path).name for path in documents}
+    return [f for f in findings if f["document"] in names][:limit]
+
+
+def submit_job(
+    roots: List[Path] = None,
+    shard_size: int = SHARD_SIZE,
+    focus_areas: list = None,
+    report_type: str = "full",
+    queue_path: Path = WORK_QUEUE_DB,
+    deduplicate: bool = DISTRIBUTED_NEAR_DUPLICATE_DETECTION,
+) -> str:
+    """
+    Catalog the document roots, split the catalog into shards and enqueue them.
+
+    With deduplicate enabled, only the canonical copy of each cluster of
+    near-duplicate documents is sharded; the clusters are kept with the job
+    and described in the merged report. Detection needs the text of every
+    document, which the coordinator then extracts itself before any shard
+    is queued, so it is off by default (DISTRIBUTED_NEAR_DUPLICATE_DETECTION).
+
+    Returns:
+        The new job ID
+    """
+    catalog = build_catalog(roots)
+    duplicates = ""
+    if deduplicate:
+        clusters = find_near_duplicates(catalog)
+        skipped = duplicate_paths(clusters)
+        catalog = [path for path in catalog if str(path) not in skipped]
+        duplicates = describe_clusters(clusters)
+    shards = plan_shards(catalog, shard_size)
+    # Each shard sees the previous run's findings for its own documents
+    scope = {"report_type": report_type, "document_focus": None, "focus_areas": focus_areas}
+    with FindingsWarehouse() as warehouse:
+        previous_findings = warehouse.open_findings(scope, limit=None)
+    with WorkQueue(queue_path) as queue:
+        return queue.submit(
+            [
+                {"documents": shard, "previous_findings": _findings_for(previous_findings, shard)}
+                for shard in shards
+            ],
+            params={"focus_areas": focus_areas, "report_type": report_type, "duplicates": duplicates},
+        )
+
+
+def process_shard(payload: dict, params: dict) -> dict:
+    """
+    Extract and analyze the documents of one shard.
+
+    Each document is compacted to MAX_CHUNK_SIZE tokens before analysis.
+
+    Returns:
+        JSON-serializable shard result with the structured analysis and any
+        per-document extraction errors
+    """
+    texts, extraction_errors = load_document_texts(payload["documents"])
+    # Same-named files on different roots must not overwrite each other
+    documents = {
+        document_key(path): compact_text(text, MAX_CHUNK_SIZE)[0] for path, text in texts.items()
+    }
+    errors = {document_key(path): error for path, error in extraction_errors.items()}
+
+    if not documents:
+        return {"analysis": AnalysisResult(summary="").model_dump(), "extraction_errors": errors}
+
+    agent = create_analysis_agent()
+    task = create_shard_analysis_task(
+        agent, documents, params.get("focus_areas"), payload.get("previous_findings")
+    )
+    crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=True)
+    analysis = extract_analysis_result(crew.kickoff())
+    if analysis is None:
+        raise RuntimeError("shard analysis did not return a structured result")
+
+    return {"analysis": analysis.model_dump(), "extraction_errors": errors}
+
+
+class _LeaseKeeper(threading.Thread):
+    """Renews a shard lease in the background while the shard is processed."""
+
+    def __init__(self, queue_path: Path, shard_id: str, worker_id: str, interval: float):
+        super().__init__(daemon=True)
+        self.queue_path = queue_path
+        self.shard_id = shard_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        # SQLite connections cannot be shared across threads, so use our own
+        with WorkQueue(self.queue_path) as queue:
+            while not self.stopped.wait(self.interval):
+                if not queue.heartbeat(self.shard_id, self.worker_id):
+                    return
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_worker(
+    job_id: str = None,
+    queue_path: Path = WORK_QUEUE_DB,
+    worker_id: str = None,
+    processor: Callable[[dict, dict], dict] = process_shard,
+    poll_interval: float = 5.0,
+) -> int:
+    """
+    Claim and process shards until the job has no work left.
+
+    Safe to run in any number of processes or on any number of nodes that
+    share the queue file.
+
+    Args:
+        job_id: Job to work on (default: the most recently submitted job)
+        queue_path: Shared work queue database
+        worker_id: Name of this worker (default: hostname-pid)
+        processor: Function turning (shard payload, job params) into a result
+        poll_interval: Seconds to wait when all remaining shards are claimed
+
+    Returns:
+        Number of shards this worker completed
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    completed = 0
+
+    with WorkQueue(queue_path) as queue:
+        job_id = job_id or queue.latest_job()
+        if job_id is None:
+            return 0
+        params = queue.job_params(job_id)
+
+        while True:
+            shard = queue.claim(worker_id, job_id)
+            if shard is None:
+                if queue.is_finished(job_id):
+                    return completed
+                time.sleep(poll_interval)
+                continue
+
+            keeper = _LeaseKeeper(queue_path, shard["shard_id"], worker_id, queue.lease_seconds / 3)
+            keeper.start()
+            try:
+                result = processor(shard["payload"], params)
+            except Exception as e:
+                keeper.stop()
+                queue.fail(shard["shard_id"], worker_id, f"{type(e).__name__}: {e}")
+                continue
+            keeper.stop()
+            if queue.complete(shard["shard_id"], worker_id, result):
+                completed += 1
+
+
+def merge_job(job_id: str = None, queue_path: Path = WORK_QUEUE_DB) -> str:
+    """
+    Merge the shard results of a finished job and generate the final report.
+
+    Writes output/compliance_report.md, output/compliance_report.json and
+    output/findings.jsonl, and records the findings in the warehouse.
+    Documents from failed shards or failed extractions are listed in a
+    coverage section at the end of the report, followed by any near-duplicate
+    documents that were not analyzed separately.
+
+    Returns:
+        The generated compliance report
+    """
+    with WorkQueue(queue_path) as queue:
+        job_id = job_id or queue.latest_job()
+        if job_id is None:
+            raise ValueError("No distributed job has been submitted")
+        if not queue.is_finished(job_id):
+            raise RuntimeError(f"Job {job_id} still has unfinished shards: {queue.status(job_id)}")
+        params = queue.job_params(job_id)
+        shards = queue.shards(job_id)
+
+    analyses = []
+    not_covered = []
+    for shard in shards:
+        if shard["status"] == "done":
+            analyses.append(AnalysisResult.model_validate(shard["result"]["analysis"]))
+            not_covered.extend(
+                f"{name}: {error}"
+                for name, error in shard["result"].get("extraction_errors", {}).items()
+            )
+        else:
+            not_covered.extend(
+                f"{document_key(doc)}: shard failed ({shard['error']})"
+                for doc in shard["payload"]["documents"]
+            )
+
+    analysis = merge_analyses(analyses)
+    report_type = params.get("report_type", "full")
+
+    agent = create_report_agent()
+    task = create_merged_report_task(agent, analysis, report_type)
+    crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=True)
+    report = str(crew.kickoff()).rstrip() + "\n"
+
+    if not_covered:
+        report += "\n## Coverage Gaps\n\nThe following documents could not be analyzed:\n\n"
+        report += "\n".join(f"- {line}" for line in not_covered) + "\n"
+    if params.get("duplicates"):
+        report += (
+            "\n## Near-Duplicate Documents\n\n"
+            "Only the newest version in each group was analyzed:\n\n"
+            + params["duplicates"] + "\n"
+        )
+
+    run_id = f"job-{job_id}"
+    scope = {"report_type": report_type, "document_focus": None, "focus_areas": params.get("focus_areas")}
+    (OUTPUT_DIR / "compliance_report.md").write_text(report, encoding="utf-8")
+    (OUTPUT_DIR / "compliance_report.json").write_text(
+        json.dumps(build_report_json(run_id, scope, split_sections(report), analysis), indent=2),
+        encoding="utf-8",
+    )
+    write_findings_jsonl(OUTPUT_DIR / "findings.jsonl", analysis.findings, run_id)
+    with FindingsWarehouse() as warehouse:
+        warehouse.record_run(
+            run_id,
+            scope,
+            [finding_record(f, run_id) for f in analysis.findings],
+            complete=not not_covered,
+        )
+
+    return report
+
+
+def run_local(
+    job_id: str = None,
+    workers: int = 2,
+    queue_path: Path = WORK_QUEUE_DB,
+    processor: Callable[[dict, dict], dict] = process_shard,
+    poll_interval: float = 1.0,
+) -> dict:
+    """
+    Process a job with several worker processes on this machine.
+
+    Workers are regular (non-daemon) processes so that they can start
+    their own extraction workers.
+
+    Returns:
+        Final shard counts by status
+    """
+    with WorkQueue(queue_path) as queue:
+        job_id = job_id or queue.latest_job()
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(
+            target=run_worker,
+            args=(job_id, queue_path, f"{socket.gethostname()}-local{i}", processor, poll_interval),
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with WorkQueue(queue_path) as queue:
+        return queue.status(job_id)
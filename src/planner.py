@@ -0,0 +1,407 @@
+"""Dry-run planning: token, cost and runtime estimates before kickoff."""
+
+import json
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config.settings import (
+    ANALYSIS_CONTEXT_BUDGET,
+    CONTEXT_COMPACTION,
+    DOCUMENT_ROUTING,
+    INGESTION_CONTEXT_BUDGET,
+    LLM_INPUT_COST_PER_MTOK,
+    LLM_OUTPUT_COST_PER_MTOK,
+    MAX_CHUNK_SIZE,
+    MODEL_CASCADE,
+    NEAR_DUPLICATE_DETECTION,
+    OUTPUT_DIR,
+    PLAN_CALL_LATENCY_SECONDS,
+    PLAN_COMPLETION_TOKENS_PER_SECOND,
+    PLAN_PROMPT_TOKENS_PER_SECOND,
+    SHARD_SIZE,
+    TEXT_STORE_ENABLED,
+)
+from src.agents.policy_agents import get_model_name
+from src.cascade import cascade_enabled
+from src.utils.catalog import build_catalog, cached_documents, load_document_texts
+from src.utils.document_index import DocumentIndex
+from src.utils.near_duplicates import duplicate_paths, find_near_duplicates
+from src.utils.tokens import count_tokens
+
+
+# USD per million (input, output) tokens and context window, by model prefix
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60, 128000),
+    "gpt-4o": (2.50, 10.00, 128000),
+    "gpt-4-turbo": (10.00, 30.00, 128000),
+    "gpt-4.1-mini": (0.40, 1.60, 1000000),
+    "gpt-4.1": (2.00, 8.00, 1000000),
+    "gpt-3.5-turbo": (0.50, 1.50, 16385),
+    "claude-3-haiku": (0.25, 1.25, 200000),
+    "claude-3-5-haiku": (0.80, 4.00, 200000),
+    "claude-3-5-sonnet": (3.00, 15.00, 200000),
+    "claude-3-opus": (15.00, 75.00, 200000),
+}
+
+# Prompt overheads and typical completion sizes (tokens) used for estimates
+AGENT_PROMPT_TOKENS = 700       # role, goal, backstory, tool schemas, ReAct format
+TASK_PROMPT_TOKENS = 450        # task description and expected output
+TOOL_STEP_TOKENS = 120          # the agent's thought and action for one tool call
+LISTING_TOKENS_PER_DOCUMENT = 15
+INGESTION_OUTPUT_TOKENS = 3000
+EXTRACTION_OUTPUT_TOKENS = 800
+ANALYSIS_SEARCH_CALLS = 3
+SEARCH_RESULT_TOKENS = 600
+ANALYSIS_OUTPUT_TOKENS = 2500
+REPORT_OUTPUT_TOKENS = {"executive": 1500, "detailed": 4000, "full": 5000}
+DEFAULT_ESCALATION_RATE = 0.25
+
+# Rough file bytes per text token, to size documents before they are extracted
+BYTES_PER_TOKEN = {".md": 4, ".txt": 4, ".doc": 8, ".docx": 12, ".pdf": 12}
+
+
+def model_pricing(model: str) -> dict:
+    """
+    Price and context window for a provider-qualified model name.
+
+    Returns:
+        Dict with input/output USD per million tokens (None if unknown) and
+        context_window
+    """
+    name = model.split("/", 1)[-1]
+    prefix = max((p for p in MODEL_PRICING if name.startswith(p)), key=len, default=None)
+    input_cost, output_cost, window = MODEL_PRICING.get(prefix, (None, None, None))
+    if LLM_INPUT_COST_PER_MTOK:
+        input_cost = float(LLM_INPUT_COST_PER_MTOK)
+    if LLM_OUTPUT_COST_PER_MTOK:
+        output_cost = float(LLM_OUTPUT_COST_PER_MTOK)
+    return {"input_per_mtok": input_cost, "output_per_mtok": output_cost, "context_window": window}
+
+
+def estimate_file_tokens(path: str) -> int:
+    """Rough token count of a document from its file size, before extraction."""
+    try:
+        size = Path(path).stat().st_size
+    except OSError:
+        return 0
+    return max(1, size // BYTES_PER_TOKEN.get(Path(path).suffix.lower(), 4))
+
+
+def call_seconds(prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated duration of one LLM call."""
+    return (
+        PLAN_CALL_LATENCY_SECONDS
+        + prompt_tokens / PLAN_PROMPT_TOKENS_PER_SECOND
+        + completion_tokens / PLAN_COMPLETION_TOKENS_PER_SECOND
+    )
+
+
+class _TaskEstimate:
+    """Accumulates the LLM calls of one task."""
+
+    def __init__(self, task: str, model: str):
+        self.task = task
+        self.model = model
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.max_prompt_tokens = 0
+        self.seconds = 0.0
+
+    def call(self, prompt_tokens: int, completion_tokens: int, count: float = 1) -> None:
+        self.calls += count
+        self.prompt_tokens += prompt_tokens * count
+        self.completion_tokens += completion_tokens * count
+        self.max_prompt_tokens = max(self.max_prompt_tokens, prompt_tokens)
+        self.seconds += call_seconds(prompt_tokens, completion_tokens) * count
+
+    def to_dict(self) -> dict:
+        pricing = model_pricing(self.model)
+        cost = None
+        if pricing["input_per_mtok"] is not None and pricing["output_per_mtok"] is not None:
+            cost = (
+                self.prompt_tokens * pricing["input_per_mtok"]
+                + self.completion_tokens * pricing["output_per_mtok"]
+            ) / 1_000_000
+        window = pricing["context_window"]
+        return {
+            "task": self.task,
+            "model": self.model,
+            "llm_calls": round(self.calls, 1),
+            "prompt_tokens": int(self.prompt_tokens),
+            "completion_tokens": int(self.completion_tokens),
+            "max_prompt_tokens": int(self.max_prompt_tokens),
+            "exceeds_context_window": window is not None and self.max_prompt_tokens > window,
+            "cost_usd": round(cost, 4) if cost is not None else None,
+            "seconds": round(self.seconds, 1),
+        }
+
+
+def _previous_escalation_rate() -> float:
+    path = OUTPUT_DIR / "cascade_metrics.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["escalation_rate"]
+    except (OSError, ValueError, KeyError):
+        return DEFAULT_ESCALATION_RATE
+
+
+def _estimate_sequential(
+    doc_tokens: List[int],
+    report_type: str,
+    compaction: bool,
+    cascade: bool,
+) -> List[_TaskEstimate]:
+    """Per-task estimates for the sequential ingestion -> analysis -> report crew."""
+    model = get_model_name()
+    base = AGENT_PROMPT_TOKENS + TASK_PROMPT_TOKENS
+    tasks = []
+
+    if cascade:
+        fast = _TaskEstimate("ingestion (fast model)", get_model_name("fast"))
+        escalated = _TaskEstimate("ingestion (escalated)", model)
+        rate = _previous_escalation_rate()
+        for tokens in doc_tokens:
+            # Documents over MAX_CHUNK_SIZE are extracted in chunks
+            chunks = max(1, math.ceil(tokens / MAX_CHUNK_SIZE))
+            prompt = base + tokens // chunks
+            fast.call(prompt, EXTRACTION_OUTPUT_TOKENS, count=chunks)
+            escalated.call(prompt, EXTRACTION_OUTPUT_TOKENS, count=rate * chunks)
+        tasks += [fast, escalated]
+        analysis_context = EXTRACTION_OUTPUT_TOKENS * len(doc_tokens)
+    else:
+        # ReAct loop: list the documents, read each one, then answer. Every
+        # step re-sends the conversation so far, including earlier documents.
+        ingestion = _TaskEstimate("ingestion", model)
+        history = base
+        ingestion.call(history, TOOL_STEP_TOKENS)
+        history += TOOL_STEP_TOKENS + LISTING_TOKENS_PER_DOCUMENT * len(doc_tokens)
+        for tokens in doc_tokens:
+            ingestion.call(history, TOOL_STEP_TOKENS)
+            history += TOOL_STEP_TOKENS + tokens
+        ingestion.call(history, INGESTION_OUTPUT_TOKENS)
+        tasks.append(ingestion)
+        analysis_context = INGESTION_OUTPUT_TOKENS
+    if compaction:
+        analysis_context = min(analysis_context, INGESTION_CONTEXT_BUDGET)
+
+    return tasks + _estimate_analysis_and_report(analysis_context, report_type, compaction)
+
+
+def _estimate_analysis_and_report(
+    analysis_context: int,
+    report_type: str,
+    compaction: bool,
+) -> List[_TaskEstimate]:
+    """Estimates for the analysis and report tasks given the ingestion output size."""
+    model = get_model_name()
+    base = AGENT_PROMPT_TOKENS + TASK_PROMPT_TOKENS
+
+    analysis = _TaskEstimate("analysis", model)
+    history = base + analysis_context
+    for _ in range(ANALYSIS_SEARCH_CALLS):
+        analysis.call(history, TOOL_STEP_TOKENS)
+        history += TOOL_STEP_TOKENS + SEARCH_RESULT_TOKENS
+    analysis.call(history, ANALYSIS_OUTPUT_TOKENS)
+
+    report_context = ANALYSIS_OUTPUT_TOKENS
+    if compaction:
+        report_context = min(report_context, ANALYSIS_CONTEXT_BUDGET)
+    report = _TaskEstimate("report", model)
+    report.call(base + report_context, REPORT_OUTPUT_TOKENS.get(report_type, REPORT_OUTPUT_TOKENS["full"]))
+    return [analysis, report]
+
+
+def estimate_report_reserve(
+    extractions: int,
+    report_type: str = "full",
+    compaction: bool = CONTEXT_COMPACTION,
+) -> dict:
+    """
+    Time and tokens the analysis and report tasks need after per-document ingestion.
+
+    Args:
+        extractions: Number of per-document extractions the analysis will read
+
+    Returns:
+        Dict with seconds and tokens
+    """
+    context = EXTRACTION_OUTPUT_TOKENS * extractions
+    if compaction:
+        context = min(context, INGESTION_CONTEXT_BUDGET)
+    tasks = _estimate_analysis_and_report(context, report_type, compaction)
+    return {
+        "seconds": sum(t.seconds for t in tasks),
+        "tokens": sum(t.prompt_tokens + t.completion_tokens for t in tasks),
+    }
+
+
+def _estimate_distributed(
+    paths: List[str],
+    doc_tokens: Dict[str, int],
+    report_type: str,
+    workers: int,
+    shard_size: int,
+) -> dict:
+    """Shard, per-shard and merge estimates for run_distributed.py."""
+    from src.distributed import plan_shards
+
+    model = get_model_name()
+    base = AGENT_PROMPT_TOKENS + TASK_PROMPT_TOKENS
+    shards = []
+    shard_tasks = _TaskEstimate("shard analysis", model)
+    for shard in plan_shards(paths, shard_size):
+        prompt = base + sum(min(doc_tokens.get(p, 0), MAX_CHUNK_SIZE) for p in shard)
+        shard_tasks.call(prompt, ANALYSIS_OUTPUT_TOKENS)
+        shards.append({
+            "documents": len(shard),
+            "prompt_tokens": prompt,
+            "seconds": round(call_seconds(prompt, ANALYSIS_OUTPUT_TOKENS), 1),
+        })
+
+    merge = _TaskEstimate("merged report", model)
+    merge.call(
+        base + ANALYSIS_OUTPUT_TOKENS * len(shards),
+        REPORT_OUTPUT_TOKENS.get(report_type, REPORT_OUTPUT_TOKENS["full"]),
+    )
+
+    # Shards are claimed greedily by the workers; the merge runs afterwards
+    lanes = [0.0] * max(1, workers)
+    for shard in sorted(shards, key=lambda s: s["seconds"], reverse=True):
+        lanes[lanes.index(min(lanes))] += shard["seconds"]
+    tasks = [shard_tasks.to_dict(), merge.to_dict()]
+    return {
+        "workers": workers,
+        "shard_size": shard_size,
+        "shards": shards,
+        "tasks": tasks,
+        "totals": _totals(tasks, max(lanes) + merge.seconds),
+    }
+
+
+def _totals(tasks: List[dict], wall_seconds: float) -> dict:
+    costs = [t["cost_usd"] for t in tasks]
+    prompt = sum(t["prompt_tokens"] for t in tasks)
+    completion = sum(t["completion_tokens"] for t in tasks)
+    return {
+        "llm_calls": round(sum(t["llm_calls"] for t in tasks), 1),
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": prompt + completion,
+        "cost_usd": round(sum(costs), 4) if None not in costs else None,
+        "wall_seconds": round(wall_seconds, 1),
+    }
+
+
+def plan_run(
+    document_focus: str = None,
+    focus_areas: list = None,
+    report_type: str = "full",
+    compaction: bool = CONTEXT_COMPACTION,
+    routing: bool = DOCUMENT_ROUTING,
+    cascade: bool = MODEL_CASCADE,
+    deduplicate: bool = NEAR_DUPLICATE_DETECTION,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+) -> dict:
+    """
+    Estimate what run_policy_analysis would cost without calling any LLM.
+
+    Documents are selected the same way as in a real run (catalog, routing,
+    near-duplicate removal), but nothing is extracted: documents whose text
+    is in the text store are measured with tiktoken, the others are
+    estimated from their file size and marked as estimated. Routing and
+    near-duplicate removal only see the cached documents, and the MinHash
+    cache is not written. LLM calls, tokens, cost and wall time are then
+    estimated per task from the crew's structure; wall time assumes the
+    sequential crew, or `workers` parallel workers for a distributed run.
+
+    Returns:
+        JSON-serializable plan
+    """
+    started = time.monotonic()
+    cascade = cascade_enabled(cascade)
+    paths = []
+    if routing and (document_focus or focus_areas):
+        with DocumentIndex() as index:
+            index.refresh(cached_only=True)
+            paths = [d.path for d in index.route(document_focus, focus_areas)]
+    # Like a real run, use the whole library when routing selects nothing
+    if not paths:
+        paths = [str(p) for p in build_catalog()]
+
+    cached = cached_documents(paths)
+    errors = {}
+    if TEXT_STORE_ENABLED:
+        from src.utils.text_store import get_text_store
+
+        store = get_text_store()
+        for path in paths:
+            error = store.failure(Path(path))
+            if error is not None:
+                errors[path] = error
+
+    skipped = set()
+    if deduplicate and cached:
+        skipped = duplicate_paths(find_near_duplicates(sorted(cached), update_cache=False))
+
+    # Cached text is read from the store; nothing is extracted
+    texts, _ = load_document_texts([p for p in paths if p in cached])
+    doc_tokens = {path: count_tokens(text) for path, text in texts.items()}
+    for path in paths:
+        if path not in doc_tokens and path not in errors:
+            doc_tokens[path] = estimate_file_tokens(path)
+    documents = []
+    for path in paths:
+        tokens = doc_tokens.get(path)
+        documents.append({
+            "path": path,
+            "tokens": tokens,
+            "cached": path in cached,
+            "estimated": tokens is not None and path not in texts,
+            "over_max_chunk_size": tokens is not None and tokens > MAX_CHUNK_SIZE,
+            "skipped": "near-duplicate" if path in skipped else None,
+            "error": errors.get(path),
+        })
+    analyzed = [p for p in paths if p not in skipped and p in doc_tokens]
+
+    tasks = [
+        t.to_dict()
+        for t in _estimate_sequential(
+            [doc_tokens[p] for p in analyzed], report_type, compaction, cascade
+        )
+    ]
+    plan = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "scope": {"document_focus": document_focus, "focus_areas": focus_areas, "report_type": report_type},
+        "options": {
+            "compaction": compaction,
+            "routing": routing,
+            "cascade": cascade,
+            "deduplicate": deduplicate,
+        },
+        "model": get_model_name(),
+        "pricing": model_pricing(get_model_name()),
+        "documents": documents,
+        "flags": {
+            "max_chunk_size": MAX_CHUNK_SIZE,
+            "over_max_chunk_size": [d["path"] for d in documents if d["over_max_chunk_size"] and not d["skipped"]],
+            "extraction_errors": errors,
+            "estimated_tokens": [d["path"] for d in documents if d["estimated"] and not d["skipped"]],
+            "exceeds_context_window": [t["task"] for t in tasks if t["exceeds_context_window"]],
+        },
+        "tasks": tasks,
+        "totals": _totals(tasks, sum(t["seconds"] for t in tasks)),
+        "assumptions": {
+            "prompt_tokens_per_second": PLAN_PROMPT_TOKENS_PER_SECOND,
+            "completion_tokens_per_second": PLAN_COMPLETION_TOKENS_PER_SECOND,
+            "call_latency_seconds": PLAN_CALL_LATENCY_SECONDS,
+            "escalation_rate": _previous_escalation_rate() if cascade else None,
+        },
+    }
+    if workers:
+        plan["distributed"] = _estimate_distributed(analyzed, doc_tokens, report_type, workers, shard_size)
+    plan["planning_seconds"] = round(time.monotonic() - started, 2)
+    return plan
@@ -0,0 +1,358 @@
+"""Deadline- and token-budget-aware scheduling of per-document ingestion."""
+
+import math
+import re
+import time
+import warnings
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from src.config.settings import (
+    CONTEXT_COMPACTION,
+    EXTRACTION_WORKERS,
+    MAX_CHUNK_SIZE,
+    REDUCED_DEPTH_CHUNK_SIZE,
+)
+from src.cascade import REGULATION_PATTERNS, ModelCascade, run_extraction_crew
+from src.planner import (
+    AGENT_PROMPT_TOKENS,
+    EXTRACTION_OUTPUT_TOKENS,
+    TASK_PROMPT_TOKENS,
+    call_seconds,
+    estimate_file_tokens,
+    estimate_report_reserve,
+)
+from src.tasks.schemas import AnalysisResult, DocumentExtraction
+from src.utils.catalog import document_key, load_document_texts
+from src.utils.compaction import compact_text
+from src.utils.tokens import count_tokens
+
+
+COVERAGE_SECTION_KEY = "coverage-limitations"
+
+SEVERITY_WEIGHTS = {"critical": 8, "high": 4, "medium": 2, "low": 1}
+
+RISK_TERMS_RE = re.compile(
+    r"personal data|breach|sanction|penalt|fraud|money laundering|capital adequacy"
+    r"|cardholder|health information|incident|third[- ]party|retention",
+    re.IGNORECASE,
+)
+
+
+def document_priority(
+    path: str,
+    text: str,
+    previous_analysis: Optional[AnalysisResult] = None,
+    changed_documents: Optional[List[str]] = None,
+    routing_score: Optional[float] = None,
+) -> float:
+    """
+    Risk-based priority of a document (higher is analyzed first).
+
+    Severity-weighted findings from the previous run dominate, followed by
+    documents that changed since then, the routing relevance for focused
+    runs, and finally regulation and risk-term mentions in the text.
+    """
+    key = document_key(path)
+    score = 0.0
+    if previous_analysis is not None:
+        score += 10 * sum(
+            SEVERITY_WEIGHTS.get(f.severity, 1)
+            for f in previous_analysis.findings if f.document == key
+        )
+    if changed_documents and key in changed_documents:
+        score += 20
+    if routing_score is not None:
+        score += 50 if routing_score == float("inf") else routing_score
+    score += sum(1 for pattern in REGULATION_PATTERNS.values() if pattern.search(text))
+    score += min(len(RISK_TERMS_RE.findall(text)), 40) / 4
+    return round(score, 2)
+
+
+@dataclass
+class ScheduledDocument:
+    """The scheduler's decision and outcome for one document."""
+    path: str
+    priority: float
+    tokens: int  # estimated from the file size until extracted
+    depth: str = "pending"  # full, reduced or skipped
+    extracted: bool = False
+    reason: Optional[str] = None
+    seconds: float = 0.0
+    tokens_used: int = 0
+
+
+class DeadlineScheduler:
+    """
+    Ingests documents in priority order within a time and token budget.
+
+    Before each document the scheduler keeps back what the analysis and
+    report tasks are estimated to need, then picks a depth for the document:
+    full (MAX_CHUNK_SIZE tokens on the default model, or the whole document
+    in MAX_CHUNK_SIZE chunks through the model cascade)
+    if that still leaves room to ingest the remaining documents at reduced
+    depth, reduced (REDUCED_DEPTH_CHUNK_SIZE tokens on the fast model) if
+    only that fits, and skipped otherwise. Estimates are corrected as the
+    run goes by the ratio of measured to estimated call durations.
+
+    If the analysis and report alone are estimated to exceed the budget,
+    every document is skipped and the run still goes over budget; this is
+    warned about and recorded in budget_warning.
+    """
+
+    def __init__(
+        self,
+        time_budget: Optional[float] = None,
+        token_budget: Optional[int] = None,
+        report_type: str = "full",
+        compaction: bool = CONTEXT_COMPACTION,
+        cascade: Optional[ModelCascade] = None,
+        runner: Callable[..., Optional[DocumentExtraction]] = run_extraction_crew,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.time_budget = time_budget
+        self.token_budget = token_budget
+        self.report_type = report_type
+        self.compaction = compaction
+        self.cascade = cascade
+        self.runner = runner
+        self.clock = clock
+        self.started = clock()
+        self.tokens_used = 0
+        self.time_scale = 1.0
+        self.documents: List[ScheduledDocument] = []
+        self.budget_warning: Optional[str] = None
+
+    def _estimate(self, tokens: int, chunk_size: int, chunked: bool = False) -> tuple:
+        """
+        Estimated (seconds, tokens) to ingest a document at a given depth.
+
+        With chunked set, the whole document is sent in chunk_size pieces
+        (as the model cascade does) instead of being compacted to one.
+        """
+        calls = max(1, math.ceil(tokens / chunk_size)) if chunked else 1
+        prompt = AGENT_PROMPT_TOKENS + TASK_PROMPT_TOKENS + (
+            tokens // calls if chunked else min(tokens, chunk_size)
+        )
+        seconds = call_seconds(prompt, EXTRACTION_OUTPUT_TOKENS) * calls * self.time_scale
+        return seconds, (prompt + EXTRACTION_OUTPUT_TOKENS) * calls
+
+    def _remaining(self, extractions: int) -> tuple:
+        """(seconds, tokens) left for ingestion after reserving analysis and report."""
+        reserve = estimate_report_reserve(extractions, self.report_type, self.compaction)
+        seconds = tokens = float("inf")
+        if self.time_budget is not None:
+            elapsed = self.clock() - self.started
+            seconds = self.time_budget - elapsed - reserve["seconds"] * self.time_scale
+        if self.token_budget is not None:
+            tokens = self.token_budget - self.tokens_used - reserve["tokens"]
+        return seconds, tokens
+
+    def _choose_depth(self, index: int, extractions: int) -> tuple:
+        document = self.documents[index]
+        later = [d for d in self.documents[index + 1:] if d.depth != "skipped"]
+        # Reserve for the analysis over everything that could still be ingested
+        seconds_left, tokens_left = self._remaining(extractions + 1 + len(later))
+        full = self._estimate(document.tokens, MAX_CHUNK_SIZE, chunked=self.cascade is not None)
+        reduced = self._estimate(document.tokens, REDUCED_DEPTH_CHUNK_SIZE)
+        later_reduced = [self._estimate(d.tokens, REDUCED_DEPTH_CHUNK_SIZE) for d in later]
+
+        if (full[0] + sum(s for s, _ in later_reduced) <= seconds_left
+                and full[1] + sum(t for _, t in later_reduced) <= tokens_left):
+            return "full", None
+        seconds_left, tokens_left = self._remaining(extractions + 1)
+        if reduced[0] <= seconds_left and reduced[1] <= tokens_left:
+            return "reduced", "budget too tight for full depth"
+        if seconds_left < reduced[0]:
+            return "skipped", "time budget exhausted"
+        return "skipped", "token budget exhausted"
+
+    def _ingest(self, document: ScheduledDocument, name: str, text: str, document_focus: str):
+        """Returns (extraction, estimate, prompt tokens sent)."""
+        overhead = AGENT_PROMPT_TOKENS + TASK_PROMPT_TOKENS
+        if document.depth == "full" and self.cascade is not None:
+            estimate = self._estimate(document.tokens, MAX_CHUNK_SIZE, chunked=True)
+            extraction = self.cascade.extract(name, text, document_focus)
+            record = self.cascade.records[-1]
+            return extraction, estimate, record.calls * overhead + record.tokens_sent
+        if document.depth == "full":
+            estimate = self._estimate(document.tokens, MAX_CHUNK_SIZE)
+            prompt_text = compact_text(text, MAX_CHUNK_SIZE)[0]
+            extraction = self.runner("default", name, prompt_text, document_focus)
+        else:
+            estimate = self._estimate(document.tokens, REDUCED_DEPTH_CHUNK_SIZE)
+            prompt_text = compact_text(text, REDUCED_DEPTH_CHUNK_SIZE)[0]
+            extraction = self.runner("fast", name, prompt_text, document_focus)
+        return extraction, estimate, overhead + count_tokens(prompt_text)
+
+    def _check_reserve(self) -> None:
+        """Warn if the analysis and report alone are estimated to exceed the budget."""
+        reserve = estimate_report_reserve(0, self.report_type, self.compaction)
+        over = []
+        if self.time_budget is not None and reserve["seconds"] > self.time_budget:
+            over.append(f"{reserve['seconds']:.0f} seconds")
+        if self.token_budget is not None and reserve["tokens"] > self.token_budget:
+            over.append(f"{reserve['tokens']:,} tokens")
+        if over:
+            self.budget_warning = (
+                f"The analysis and report alone are estimated to need {' and '.join(over)}, "
+                "more than the run budget: no document can be ingested and the run will "
+                "exceed the budget."
+            )
+            warnings.warn(self.budget_warning, stacklevel=3)
+
+    def _extract_batch(self, index: int, priority, load_texts, batch_size: int, texts: dict) -> None:
+        """
+        Extract the text of the next batch_size not yet extracted documents.
+
+        Extracted documents get their real token count and their priority
+        including text signals, and the batch is re-ordered by it.
+        """
+        batch = [d for d in self.documents[index:] if not d.extracted][:batch_size]
+        loaded, errors = load_texts([d.path for d in batch])
+        for document in batch:
+            document.extracted = True
+            key = str(Path(document.path).resolve())
+            if key in loaded:
+                texts[document.path] = loaded[key]
+                document.tokens = count_tokens(loaded[key])
+                document.priority = priority(document.path, loaded[key])
+            else:
+                document.depth = "skipped"
+                document.reason = f"text extraction failed: {errors.get(key, 'unknown error')}"
+        end = self.documents.index(batch[-1]) + 1
+        self.documents[index:end] = sorted(
+            self.documents[index:end], key=lambda d: (-d.priority, d.path)
+        )
+
+    def run(
+        self,
+        paths: List[str],
+        priority: Callable[[str, str], float],
+        document_focus: str = None,
+        load_texts: Callable = load_document_texts,
+        batch_size: int = EXTRACTION_WORKERS,
+    ) -> List[DocumentExtraction]:
+        """
+        Extract and ingest documents, highest priority first, within the budget.
+
+        Documents are first ordered by priority(path, "") (signals that need
+        no text) and sized from their file size. Their text is extracted in
+        batches, only while the budget still has room for the next document,
+        so extraction time counts against the budget and documents that
+        cannot be afforded are never extracted.
+
+        Args:
+            paths: Document paths in scope
+            priority: Callable (path, text) -> priority (see document_priority)
+            load_texts: Callable paths -> (path -> text, path -> error)
+            batch_size: Documents extracted at a time
+
+        Returns:
+            Extractions of the documents that were ingested
+        """
+        self._check_reserve()
+        self.documents = sorted(
+            (
+                ScheduledDocument(
+                    path=str(path), priority=priority(str(path), ""), tokens=estimate_file_tokens(path)
+                )
+                for path in paths
+            ),
+            key=lambda d: (-d.priority, d.path),
+        )
+        texts = {}
+        extractions = []
+        index = 0
+        while index < len(self.documents):
+            document = self.documents[index]
+            if document.depth == "skipped":
+                index += 1
+                continue
+            document.depth, document.reason = self._choose_depth(index, len(extractions))
+            if document.depth == "skipped":
+                if not document.extracted:
+                    document.reason += "; not extracted"
+                index += 1
+                continue
+            if not document.extracted:
+                # Sizes and priorities change once the text is known; decide again
+                self._extract_batch(index, priority, load_texts, batch_size, texts)
+                continue
+            index += 1
+
+            started = self.clock()
+            name = document_key(document.path)
+            try:
+                extraction, estimate, prompt_tokens = self._ingest(
+                    document, name, texts[document.path], document_focus
+                )
+            except Exception as e:
+                extraction, estimate, prompt_tokens = None, None, AGENT_PROMPT_TOKENS + TASK_PROMPT_TOKENS
+                document.reason = f"{type(e).__name__}: {e}"
+            document.seconds = round(self.clock() - started, 2)
+            document.tokens_used = prompt_tokens + (
+                count_tokens(extraction.model_dump_json()) if extraction is not None else 0
+            )
+            self.tokens_used += document.tokens_used
+
+            if estimate and estimate[0] > 0:
+                # Exponential moving average of measured / estimated duration
+                observed = document.seconds / (estimate[0] / self.time_scale)
+                self.time_scale = 0.5 * self.time_scale + 0.5 * max(observed, 0.1)
+
+            if extraction is None:
+                document.depth = "skipped"
+                document.reason = document.reason or "extraction failed"
+            else:
+                extractions.append(extraction)
+        return extractions
+
+    @property
+    def limited(self) -> bool:
+        """True if any document was skipped or ingested at reduced depth."""
+        return any(d.depth in ("reduced", "skipped") for d in self.documents)
+
+    def coverage_section(self) -> str:
+        """Markdown report section listing reduced and skipped coverage."""
+        budget = []
+        if self.time_budget is not None:
+            budget.append(f"{self.time_budget:g} seconds")
+        if self.token_budget is not None:
+            budget.append(f"{self.token_budget:,} tokens")
+        if self.budget_warning:
+            intro = (
+                f"This report had a budget of {' and '.join(budget)}. {self.budget_warning} "
+                "The following were not covered:"
+            )
+        else:
+            intro = (
+                f"This report was produced within a budget of {' and '.join(budget)}. "
+                "Documents were analyzed in order of compliance risk; the following "
+                "were not fully covered:"
+            )
+        lines = ["## Coverage Limitations", "", intro, ""]
+        for document in self.documents:
+            if document.depth == "reduced":
+                lines.append(f"- {document_key(document.path)}: analyzed at reduced depth (summarized)")
+        for document in self.documents:
+            if document.depth == "skipped":
+                lines.append(f"- {document_key(document.path)}: NOT analyzed ({document.reason})")
+        return "\n".join(lines)
+
+    def summary(self) -> dict:
+        """JSON-serializable record of the schedule."""
+        counts = {"full": 0, "reduced": 0, "skipped": 0}
+        for document in self.documents:
+            counts[document.depth] = counts.get(document.depth, 0) + 1
+        return {
+            "time_budget_seconds": self.time_budget,
+            "token_budget": self.token_budget,
+            "ingestion_seconds": round(self.clock() - self.started, 2),
+            "ingestion_tokens": self.tokens_used,
+            "time_scale": round(self.time_scale, 3),
+            "budget_warning": self.budget_warning,
+            "depth_counts": counts,
+            "documents": [asdict(d) for d in self.documents],
+        }
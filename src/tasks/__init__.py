@@ -1,2 +1,11 @@
 """CrewAI Tasks for policy document processing."""
-from .policy_tasks import create_ingestion_task, create_analysis_task, create_report_task
+from .policy_tasks import (
+    create_ingestion_task,
+    create_document_extraction_task,
+    create_analysis_task,
+    create_report_task,
+    create_incremental_report_task,
+    create_shard_analysis_task,
+    create_merged_report_task,
+)
+from .schemas import AnalysisResult, Finding, RiskRating, Citation, DocumentExtraction
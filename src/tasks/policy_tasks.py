@@ -2,19 +2,129 @@
 
 from crewai import Task, Agent
 
+from src.tasks.schemas import AnalysisResult, DocumentExtraction
+from src.utils.near_duplicates import describe_clusters
 
-def create_ingestion_task(agent: Agent, document_focus: str = None) -> Task:
+
+REPORT_INSTRUCTIONS = {
+    "executive": """
+    Create an executive summary (1-2 pages) that includes:
+    - Overall compliance posture assessment
+    - Top 3-5 priority items requiring attention
+    - High-level recommendations
+    - Resource/timeline estimates for remediation
+    """,
+    "detailed": """
+    Create a detailed technical report that includes:
+    - Comprehensive findings with evidence
+    - Detailed gap descriptions and root causes
+    - Specific remediation steps for each finding
+    - Implementation guidance and best practices
+    """,
+    "full": """
+    Create a comprehensive compliance report with both executive and detailed sections:
+    
+    EXECUTIVE SUMMARY:
+    - Overall compliance score/rating
+    - Key findings summary
+    - Strategic recommendations
+    - Resource requirements
+    
+    DETAILED FINDINGS:
+    - Complete gap analysis with evidence
+    - Regulatory mapping details
+    - Control assessment results
+    - Prioritized remediation roadmap
+    
+    APPENDICES:
+    - Document inventory
+    - Regulatory reference guide
+    - Glossary of terms
+    """
+}
+
+
+def _duplicates_instruction(duplicate_clusters: list) -> str:
+    """Prompt text describing near-duplicate documents that are not analyzed separately."""
+    if not duplicate_clusters:
+        return ""
+    return f"""
+        
+        Near-duplicate versions of some documents were detected. Only the newest version
+        in each group is available to read; include the other versions in the document
+        inventory and take their listed differences into account:
+{describe_clusters(duplicate_clusters)}"""
+
+
+def _previous_findings_instruction(previous_findings: list) -> str:
+    """Prompt text listing the previous run's findings so persisting ones keep their titles."""
+    if not previous_findings:
+        return ""
+    findings = "\n".join(
+        f"        - [{f['document']} | {f['regulation']} | {f['finding_type']}] {f['title']}"
+        for f in previous_findings
+    )
+    return f"""
+        
+        The previous analysis recorded these findings (document | regulation | type, title):
+        
+{findings}
+        
+        For each of them that is still open, record it again with exactly the same document,
+        regulation, finding type and title, so it is tracked as the same finding across
+        runs; leave out the ones that have been resolved. Give new findings new titles."""
+
+
+def _coverage_instruction(coverage_note: str) -> str:
+    """Prompt text asking the report to state coverage lost to the run's budget."""
+    if not coverage_note:
+        return ""
+    return f"""
+        
+        This run hit its time or token budget, so some documents were analyzed at
+        reduced depth or not at all. State this plainly in the executive summary and
+        do not draw conclusions about documents that were not analyzed. The following
+        section is appended to the report automatically; do not reproduce it:
+{coverage_note}"""
+
+
+def create_ingestion_task(
+    agent: Agent,
+    document_focus: str = None,
+    routed_documents: list = None,
+    duplicate_clusters: list = None,
+) -> Task:
     """
     Create the document ingestion task.
     
     Args:
         agent: The ingestion agent to perform this task
         document_focus: Optional specific document or topic to focus on
+        routed_documents: Optional documents pre-selected by the document index
+            (RoutedDocument objects), most relevant first
+        duplicate_clusters: Optional near-duplicate clusters (DuplicateCluster
+            objects) whose non-canonical members are not read
     """
     focus_instruction = ""
     if document_focus:
         focus_instruction = f"\n\nFocus specifically on: {document_focus}"
     
+    if routed_documents:
+        lines = []
+        for doc in routed_documents:
+            line = f"           - {doc.path}"
+            if doc.sections:
+                line += f" (relevant sections: {'; '.join(doc.sections)})"
+            lines.append(line)
+        document_list = "\n".join(lines)
+        focus_instruction += f"""
+        
+        Only the following documents are relevant to this analysis (pre-selected from the
+        document index); read these and no others, starting with the listed sections:
+{document_list}"""
+    
+    focus_instruction += _duplicates_instruction(duplicate_clusters)
+    
     return Task(
         description=f"""
         Perform a comprehensive ingestion and extraction of all policy documents.
@@ -49,7 +159,82 @@ def create_ingestion_task(agent: Agent, document_focus: str = None) -> Task:
     )
 
 
-def create_analysis_task(agent: Agent, ingestion_task: Task, focus_areas: list = None) -> Task:
+def create_document_extraction_task(
+    agent: Agent,
+    document: str,
+    text: str,
+    document_focus: str = None,
+    part: tuple = None,
+) -> Task:
+    """
+    Create an ingestion task for a single document (used by the model cascade).
+    
+    The document text is embedded in the task and the result is validated
+    against the DocumentExtraction schema.
+    
+    Args:
+        agent: The extraction agent to perform this task
+        document: Name of the document (see document_key)
+        text: Extracted document text
+        document_focus: Optional specific topic to focus on
+        part: Optional (number, total) when text is one chunk of a long document
+    """
+    focus_instruction = ""
+    if document_focus:
+        focus_instruction = f"\n\nFocus specifically on: {document_focus}"
+    part_instruction = ""
+    header = document
+    if part:
+        number, total = part
+        header = f"{document} (part {number} of {total})"
+        part_instruction = f"""
+        The text below is part {number} of {total} of the document; extract only
+        what this part says. If it does not state the title or purpose, use the
+        file name as the title and describe what this part covers as the purpose.
+        """
+    
+    return Task(
+        description=f"""
+        Extract the key information from the policy document below.
+        
+        Identify and extract:
+        - Document title, version, and effective date
+        - Document purpose and scope
+        - The headings of all sections, as written in the document
+        - Key policy statements and requirements
+        - Defined roles and responsibilities
+        - Compliance obligations and controls
+        - Referenced regulations or standards
+        - Cross-references to other policies
+        - Review/update requirements
+        - Areas that are unclear or potentially incomplete
+        {focus_instruction}
+        
+        Only extract what the document actually says. Finally, rate your confidence
+        (0-1) that the extraction is complete and accurate; rate it low if the text
+        is garbled, truncated or ambiguous.
+        {part_instruction}
+        ===== {header} =====
+        {text}
+        """,
+        expected_output=f"""
+        A structured extraction of {document} with its metadata, section headings,
+        requirements, controls, roles, referenced regulations, cross-references,
+        unclear areas and a confidence score.
+        """,
+        agent=agent,
+        output_pydantic=DocumentExtraction,
+    )
+
+
+def create_analysis_task(
+    agent: Agent,
+    ingestion_task: Task = None,
+    focus_areas: list = None,
+    extractions: list = None,
+    duplicate_clusters: list = None,
+    previous_findings: list = None,
+) -> Task:
     """
     Create the policy analysis task.
     
@@ -57,12 +242,29 @@ def create_analysis_task(agent: Agent, ingestion_task: Task, focus_areas: list =
         agent: The analysis agent to perform this task
         ingestion_task: The preceding ingestion task (for context)
         focus_areas: Optional list of specific areas to analyze
+        extractions: Per-document DocumentExtraction results to analyze
+            instead of an ingestion task's output (model cascade)
+        duplicate_clusters: Near-duplicate clusters to describe alongside the
+            extractions (the ingestion task reports them otherwise)
+        previous_findings: Findings of the previous run (see
+            FindingsWarehouse.open_findings), to be reused while still open
     """
     focus_instruction = ""
     if focus_areas:
         areas = ", ".join(focus_areas)
         focus_instruction = f"\n\nPay special attention to these focus areas: {areas}"
     
+    ingestion_results = ""
+    if extractions is not None:
+        records = "\n".join(e.model_dump_json() for e in extractions) or (
+            "        (none: no documents could be ingested within this run's budget)"
+        )
+        ingestion_results = f"""
+        
+        Ingestion results (one JSON object per document):
+        
+{records}""" + _duplicates_instruction(duplicate_clusters)
+    
     return Task(
         description=f"""
         Analyze the extracted policy content to assess compliance posture and identify gaps.
@@ -92,21 +294,31 @@ def create_analysis_task(agent: Agent, ingestion_task: Task, focus_areas: list =
         {focus_instruction}
         
         Provide evidence-based findings with specific references to document sections.
+        Record one finding per distinct gap or issue, even when several concern the same
+        document and regulation, each with a short specific title, a severity rating and
+        citations (document name as given, section, short excerpt).{_previous_findings_instruction(previous_findings)}
+        {ingestion_results}
         """,
         expected_output="""
-        A detailed analysis report containing:
-        1. Regulatory mapping matrix
-        2. Prioritized gap inventory with risk ratings
-        3. Control effectiveness assessment
-        4. Compliance risk heat map
-        5. Evidence and citations for all findings
+        A structured analysis result containing:
+        1. A short summary of the overall compliance posture
+        2. The regulations and frameworks the policies were mapped to
+        3. A prioritized inventory of gaps and other findings, each with document,
+           regulation, severity, recommendation and citations
+        4. A risk rating per regulation or policy area
         """,
         agent=agent,
-        context=[ingestion_task],
+        context=[ingestion_task] if ingestion_task is not None else [],
+        output_pydantic=AnalysisResult,
     )
 
 
-def create_report_task(agent: Agent, analysis_task: Task, report_type: str = "full") -> Task:
+def create_report_task(
+    agent: Agent,
+    analysis_task: Task,
+    report_type: str = "full",
+    coverage_note: str = None,
+) -> Task:
     """
     Create the report generation task.
     
@@ -114,49 +326,13 @@ def create_report_task(agent: Agent, analysis_task: Task, report_type: str = "fu
         agent: The report agent to perform this task
         analysis_task: The preceding analysis task (for context)
         report_type: Type of report - "executive", "detailed", or "full"
+        coverage_note: Optional "Coverage Limitations" section for a budget-limited run
     """
-    report_instructions = {
-        "executive": """
-        Create an executive summary (1-2 pages) that includes:
-        - Overall compliance posture assessment
-        - Top 3-5 priority items requiring attention
-        - High-level recommendations
-        - Resource/timeline estimates for remediation
-        """,
-        "detailed": """
-        Create a detailed technical report that includes:
-        - Comprehensive findings with evidence
-        - Detailed gap descriptions and root causes
-        - Specific remediation steps for each finding
-        - Implementation guidance and best practices
-        """,
-        "full": """
-        Create a comprehensive compliance report with both executive and detailed sections:
-        
-        EXECUTIVE SUMMARY:
-        - Overall compliance score/rating
-        - Key findings summary
-        - Strategic recommendations
-        - Resource requirements
-        
-        DETAILED FINDINGS:
-        - Complete gap analysis with evidence
-        - Regulatory mapping details
-        - Control assessment results
-        - Prioritized remediation roadmap
-        
-        APPENDICES:
-        - Document inventory
-        - Regulatory reference guide
-        - Glossary of terms
-        """
-    }
-    
     return Task(
         description=f"""
         Generate a professional compliance report based on the policy analysis.
         
-        {report_instructions.get(report_type, report_instructions["full"])}
+        {REPORT_INSTRUCTIONS.get(report_type, REPORT_INSTRUCTIONS["full"])}{_coverage_instruction(coverage_note)}
         
         Ensure the report:
         - Uses clear, professional language
@@ -176,3 +352,161 @@ def create_report_task(agent: Agent, analysis_task: Task, report_type: str = "fu
         context=[analysis_task],
         output_file="output/compliance_report.md",
     )
+
+
+def create_incremental_report_task(
+    agent: Agent,
+    analysis_task: Task,
+    previous_sections: dict,
+    sections_to_update: list,
+    changed_documents: list,
+    report_type: str = "full",
+    coverage_note: str = None,
+) -> Task:
+    """
+    Create a report task that only regenerates sections affected by changed documents.
+
+    Unchanged sections are spliced back in from the previous report version,
+    so the agent only writes the parts of the report that need to change.
+
+    Args:
+        agent: The report agent to perform this task
+        analysis_task: The preceding analysis task (for context)
+        previous_sections: Section key -> markdown from the previous report
+        sections_to_update: Keys of previous sections that must be rewritten
+        changed_documents: Documents added, modified, or removed since the previous run
+        report_type: Type of report - "executive", "detailed", or "full"
+        coverage_note: Optional "Coverage Limitations" section for a budget-limited run
+    """
+    outline = "\n".join(
+        f"        - {text.splitlines()[0]}"
+        + ("  <-- REWRITE" if key in sections_to_update else "")
+        for key, text in previous_sections.items()
+    )
+    stale = "\n\n".join(previous_sections[key] for key in sections_to_update)
+    documents = "\n".join(f"        - {doc}" for doc in changed_documents)
+
+    return Task(
+        description=f"""
+        Update an existing {report_type} compliance report based on the latest policy analysis.
+        
+        The following documents changed since the previous report:
+{documents}
+        
+        Previous report outline (sections marked REWRITE are out of date):
+{outline}
+        
+        Current text of the sections to rewrite:
+        
+        {stale}
+        
+        Rewrite ONLY the sections marked REWRITE, using the new analysis results.
+        Summary and score sections must reflect the whole updated analysis, and findings
+        for documents the previous report did not cover yet must be included.
+        Start each section with exactly the same heading line as in the outline.
+        If the changes call for a new top-level section, add it with a new "## " heading.
+        Do not reproduce sections that are not marked REWRITE.{_coverage_instruction(coverage_note)}
+        """,
+        expected_output="""
+        Markdown containing only the rewritten (and any new) report sections,
+        each starting with its "## " heading.
+        """,
+        agent=agent,
+        context=[analysis_task],
+    )
+
+
+def create_shard_analysis_task(
+    agent: Agent,
+    documents: dict,
+    focus_areas: list = None,
+    previous_findings: list = None,
+) -> Task:
+    """
+    Create an analysis task for one shard of a distributed run.
+    
+    The shard's extracted document text is embedded directly in the task,
+    so no separate ingestion step is needed.
+    
+    Args:
+        agent: The analysis agent to perform this task
+        documents: Document name -> extracted text for this shard
+        focus_areas: Optional list of specific areas to analyze
+        previous_findings: The previous run's findings for this shard's documents
+    """
+    focus_instruction = ""
+    if focus_areas:
+        areas = ", ".join(focus_areas)
+        focus_instruction = f"\n\nPay special attention to these focus areas: {areas}"
+    
+    corpus = "\n\n".join(
+        f"===== {name} =====\n{text}" for name, text in documents.items()
+    )
+    
+    return Task(
+        description=f"""
+        Analyze the following policy documents (one shard of a larger policy library)
+        to assess compliance posture and identify gaps.
+        
+        For each document, map it to relevant regulatory frameworks (GDPR, SOX, Basel, etc.),
+        identify gaps, inconsistencies, outdated or ambiguous policy language and weak
+        controls, and rate the compliance risk of each finding.
+        {focus_instruction}
+        
+        Record one finding per distinct gap or issue, even when several concern the same
+        document and regulation, each with a short specific title, a severity rating and
+        citations (document name as given, section, short excerpt).{_previous_findings_instruction(previous_findings)}
+        
+        Documents:
+        
+        {corpus}
+        """,
+        expected_output="""
+        A structured analysis result for the documents in this shard containing:
+        1. A short summary of the overall compliance posture
+        2. The regulations and frameworks the policies were mapped to
+        3. A prioritized inventory of gaps and other findings, each with document,
+           regulation, severity, recommendation and citations
+        4. A risk rating per regulation or policy area
+        """,
+        agent=agent,
+        output_pydantic=AnalysisResult,
+    )
+
+
+def create_merged_report_task(agent: Agent, analysis: AnalysisResult, report_type: str = "full") -> Task:
+    """
+    Create the report task for a distributed run from merged shard results.
+    
+    Args:
+        agent: The report agent to perform this task
+        analysis: Analysis results of all shards, merged
+        report_type: Type of report - "executive", "detailed", or "full"
+    """
+    return Task(
+        description=f"""
+        Generate a professional compliance report based on the policy analysis below,
+        which was produced shard by shard across the whole policy library.
+        
+        {REPORT_INSTRUCTIONS.get(report_type, REPORT_INSTRUCTIONS["full"])}
+        
+        Ensure the report:
+        - Uses clear, professional language
+        - Provides actionable recommendations
+        - Includes specific citations and evidence
+        - Is appropriate for both technical and non-technical audiences
+        - Follows compliance reporting best practices
+        
+        Analysis results (JSON):
+        
+        {analysis.model_dump_json()}
+        """,
+        expected_output="""
+        A professional, well-structured compliance report in markdown format that:
+        1. Can be shared with executive leadership
+        2. Provides clear next steps for compliance teams
+        3. Documents the current state with evidence
+        4. Offers a path to improved compliance posture
+        """,
+        agent=agent,
+    )
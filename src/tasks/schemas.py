@@ -0,0 +1,88 @@
+"""Structured output schemas for policy analysis tasks."""
+
+import hashlib
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+Severity = Literal["critical", "high", "medium", "low"]
+
+FindingType = Literal["gap", "inconsistency", "control_weakness", "outdated", "ambiguity", "observation"]
+
+
+class Citation(BaseModel):
+    """A reference to the policy text supporting a finding."""
+    document: str = Field(description="Name of the cited policy document, as given")
+    section: Optional[str] = Field(
+        default=None,
+        description="Section number or heading within the document, e.g. '4.2 Purpose Limitation'"
+    )
+    excerpt: Optional[str] = Field(default=None, description="Short verbatim quote from the document")
+
+
+class Finding(BaseModel):
+    """A single compliance finding for one document and regulation."""
+    document: str = Field(description="Name of the policy document the finding relates to, as given")
+    regulation: str = Field(description="Regulation or framework, e.g. 'GDPR', 'SOX', 'Basel III'")
+    finding_type: FindingType = Field(description="Kind of finding")
+    title: str = Field(description="One-line summary of the finding")
+    description: str = Field(description="Evidence-based description of the finding")
+    severity: Severity = Field(description="Compliance risk of the finding")
+    recommendation: Optional[str] = Field(default=None, description="Suggested remediation")
+    citations: List[Citation] = Field(default_factory=list, description="Supporting references")
+
+    @property
+    def key(self) -> str:
+        """Stable identifier used to track a finding across runs."""
+        parts = [self.document, self.regulation, self.finding_type, self.title]
+        normalized = "|".join(" ".join(p.lower().split()) for p in parts)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class RiskRating(BaseModel):
+    """Overall compliance risk rating for a regulation or policy area."""
+    area: str = Field(description="Regulation or policy area being rated")
+    rating: Severity = Field(description="Overall risk rating for the area")
+    rationale: str = Field(description="Why this rating was given")
+
+
+class AnalysisResult(BaseModel):
+    """Structured output of the policy analysis task."""
+    summary: str = Field(description="Short narrative summary of the overall compliance posture")
+    regulations: List[str] = Field(
+        default_factory=list,
+        description="Regulations and frameworks the policies were mapped to"
+    )
+    findings: List[Finding] = Field(default_factory=list, description="All gaps and other findings")
+    risk_ratings: List[RiskRating] = Field(default_factory=list, description="Risk rating per area")
+
+
+class DocumentExtraction(BaseModel):
+    """Structured output of ingesting a single policy document."""
+    document: str = Field(description="Name of the policy document, as given")
+    title: str = Field(description="Document title")
+    version: Optional[str] = Field(default=None, description="Document version, if stated")
+    effective_date: Optional[str] = Field(default=None, description="Effective date, if stated")
+    purpose: str = Field(description="Purpose and scope of the document")
+    sections: List[str] = Field(
+        default_factory=list,
+        description="Headings of the document's sections, in order, as written in the document"
+    )
+    requirements: List[str] = Field(default_factory=list, description="Key policy statements and requirements")
+    controls: List[str] = Field(default_factory=list, description="Compliance obligations and controls")
+    roles: List[str] = Field(default_factory=list, description="Defined roles and their responsibilities")
+    regulations: List[str] = Field(
+        default_factory=list,
+        description="Regulations or standards the document references, e.g. 'GDPR', 'SOX'"
+    )
+    cross_references: List[str] = Field(default_factory=list, description="References to other policies")
+    review_requirements: Optional[str] = Field(default=None, description="Review/update requirements")
+    unclear_areas: List[str] = Field(
+        default_factory=list,
+        description="Areas that are unclear, contradictory or potentially incomplete"
+    )
+    confidence: float = Field(
+        ge=0.0,
+        le=1.0,
+        description="Confidence (0-1) that this extraction is complete and accurate"
+    )
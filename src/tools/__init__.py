@@ -1,2 +1,3 @@
 """Custom tools for document processing."""
 from .document_tools import DocumentReaderTool, DocumentSearchTool
+from .tool_cache import ToolResultCache, get_tool_cache
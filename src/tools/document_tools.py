@@ -6,7 +6,15 @@ from typing import List, Optional, Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from src.config.settings import POLICY_DOCS_DIR, SUPPORTED_EXTENSIONS
+from src.config.settings import (
+    EXTRACTION_ISOLATION,
+    POLICY_DOCS_DIR,
+    TEXT_STORE_ENABLED,
+)
+from src.tools.extractors import extract_text, get_extraction_pool, supported_extensions
+from src.tools.tool_cache import memoize_tool_call
+from src.utils.catalog import build_catalog, document_key
+from src.utils.text_store import get_text_store
 
 
 class DocumentReaderInput(BaseModel):
@@ -23,12 +31,17 @@ class DocumentReaderTool(BaseTool):
     name: str = "document_reader"
     description: str = """
     Reads and extracts text content from policy documents.
-    Supports PDF, DOCX, TXT, and MD files.
+    Supports PDF (including scanned pages via OCR), DOCX, DOC, HTML, TXT, and MD files.
     If no file_path is provided, returns a list of all available documents.
     Use this tool to ingest and understand policy document contents.
     """
     args_schema: type[BaseModel] = DocumentReaderInput
+    documents: Optional[List[str]] = Field(
+        default=None,
+        description="Restrict the tool to these documents (e.g. pre-routed for a focused run)",
+    )
     
+    @memoize_tool_call
     def _run(self, file_path: Optional[str] = None) -> str:
         """Execute the document reading."""
         if file_path is None:
@@ -37,69 +50,92 @@ class DocumentReaderTool(BaseTool):
     
     def _list_documents(self) -> str:
         """List all available policy documents."""
-        documents = []
-        for ext in SUPPORTED_EXTENSIONS:
-            documents.extend(POLICY_DOCS_DIR.glob(f"*{ext}"))
-            documents.extend(POLICY_DOCS_DIR.glob(f"**/*{ext}"))
+        if self.documents is not None:
+            doc_list = "\n".join(f"- {doc}" for doc in self.documents)
+            return f"Available policy documents (selected for this analysis):\n{doc_list}"
+        
+        documents = build_catalog()
         
         if not documents:
             return f"No documents found in {POLICY_DOCS_DIR}. Please add policy documents to analyze."
         
-        doc_list = "\n".join([f"- {doc.relative_to(POLICY_DOCS_DIR)}" for doc in documents])
+        doc_list = "\n".join([f"- {document_key(doc)}" for doc in documents])
         return f"Available policy documents:\n{doc_list}"
     
+    def _resolve(self, file_path: str) -> Path:
+        """Resolve a document path relative to the policy documents directory."""
+        if self.documents is not None:
+            # Selected documents may also be referred to by file name
+            for doc in self.documents:
+                if file_path in (doc, Path(doc).name, document_key(doc)):
+                    return Path(doc)
+        if not os.path.isabs(file_path):
+            return POLICY_DOCS_DIR / file_path
+        return Path(file_path)
+    
+    def _allowed(self, full_path: Path) -> bool:
+        """True unless the tool is restricted and the document is not selected."""
+        if self.documents is None:
+            return True
+        return str(full_path.resolve()) in {str(Path(doc).resolve()) for doc in self.documents}
+    
     def _read_document(self, file_path: str) -> str:
         """Read and extract text from a specific document."""
-        # Handle relative paths
-        if not os.path.isabs(file_path):
-            full_path = POLICY_DOCS_DIR / file_path
-        else:
-            full_path = Path(file_path)
-        
-        if not full_path.exists():
-            return f"Error: Document not found at {full_path}"
+        return self._read_documents([file_path])[file_path]
+    
+    def _read_documents(self, file_paths: List[str]) -> dict:
+        """
+        Read and extract text from several documents.
         
-        ext = full_path.suffix.lower()
+        With TEXT_STORE_ENABLED, text is served from the shared memory-mapped
+        text store (extracting only new or modified files). With
+        EXTRACTION_ISOLATION enabled, files are parsed concurrently in
+        isolated worker processes with per-file timeouts and memory limits.
         
-        try:
-            if ext == ".pdf":
-                return self._read_pdf(full_path)
-            elif ext in [".docx", ".doc"]:
-                return self._read_docx(full_path)
-            elif ext in [".txt", ".md"]:
-                return self._read_text(full_path)
+        Returns:
+            Mapping of each requested path to its content (or an error message)
+        """
+        contents = {}
+        to_extract = {}
+        for file_path in file_paths:
+            full_path = self._resolve(file_path)
+            if not self._allowed(full_path):
+                contents[file_path] = (
+                    f"Error: {file_path} is not one of the documents selected for this analysis"
+                )
+            elif not full_path.exists():
+                contents[file_path] = f"Error: Document not found at {full_path}"
+            elif full_path.suffix.lower() not in supported_extensions():
+                contents[file_path] = f"Error: Unsupported file format {full_path.suffix.lower()}"
             else:
-                return f"Error: Unsupported file format {ext}"
-        except Exception as e:
-            return f"Error reading document: {str(e)}"
-    
-    def _read_pdf(self, path: Path) -> str:
-        """Extract text from PDF."""
-        try:
-            from pypdf import PdfReader
-            reader = PdfReader(path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return f"[Content from {path.name}]\n\n{text}"
-        except ImportError:
-            return "Error: pypdf not installed. Run: pip install pypdf"
-    
-    def _read_docx(self, path: Path) -> str:
-        """Extract text from DOCX."""
-        try:
-            from docx import Document
-            doc = Document(path)
-            text = "\n".join([para.text for para in doc.paragraphs])
-            return f"[Content from {path.name}]\n\n{text}"
-        except ImportError:
-            return "Error: python-docx not installed. Run: pip install python-docx"
-    
-    def _read_text(self, path: Path) -> str:
-        """Read plain text file."""
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-        return f"[Content from {path.name}]\n\n{text}"
+                to_extract[file_path] = full_path
+        
+        if TEXT_STORE_ENABLED:
+            store = get_text_store()
+            errors = store.ensure(p.resolve() for p in to_extract.values())
+            for file_path, full_path in to_extract.items():
+                error = errors.get(str(full_path.resolve()))
+                contents[file_path] = (
+                    f"Error reading document: {error}" if error
+                    else f"[Content from {full_path.name}]\n\n{store.text(full_path.resolve())}"
+                )
+        elif EXTRACTION_ISOLATION:
+            results = get_extraction_pool().extract_many(to_extract.values())
+            for file_path, full_path in to_extract.items():
+                result = results[str(full_path)]
+                contents[file_path] = (
+                    f"[Content from {full_path.name}]\n\n{result.text}" if result.ok
+                    else f"Error reading document: {result.error}"
+                )
+        else:
+            for file_path, full_path in to_extract.items():
+                try:
+                    text = extract_text(full_path)
+                    contents[file_path] = f"[Content from {full_path.name}]\n\n{text}"
+                except Exception as e:
+                    contents[file_path] = f"Error reading document: {str(e)}"
+        
+        return contents
 
 
 class DocumentSearchInput(BaseModel):
@@ -121,21 +157,34 @@ class DocumentSearchTool(BaseTool):
     Useful for finding specific policies, rules, or requirements.
     """
     args_schema: type[BaseModel] = DocumentSearchInput
+    documents: Optional[List[str]] = Field(
+        default=None,
+        description="Restrict the tool to these documents (e.g. pre-routed for a focused run)",
+    )
     
+    @memoize_tool_call
     def _run(self, query: str, file_path: Optional[str] = None) -> str:
         """Search documents for the query."""
-        reader = DocumentReaderTool()
+        reader = DocumentReaderTool(documents=self.documents)
         
         if file_path:
-            content = reader._read_document(file_path)
-            return self._search_content(query, content, file_path)
+            full_path = reader._resolve(file_path)
+            if not full_path.exists() or not reader._allowed(full_path):
+                return reader._read_document(file_path)
+            targets = {file_path: full_path}
+        elif self.documents is not None:
+            targets = {document_key(doc): reader._resolve(doc) for doc in self.documents}
+        else:
+            # Search all documents
+            targets = {document_key(doc_path): doc_path for doc_path in build_catalog()}
         
-        # Search all documents
-        results = []
-        for ext in SUPPORTED_EXTENSIONS:
-            for doc_path in POLICY_DOCS_DIR.glob(f"*{ext}"):
-                content = reader._read_document(str(doc_path))
-                result = self._search_content(query, content, doc_path.name)
+        if TEXT_STORE_ENABLED:
+            results = self._search_store(query, targets)
+        else:
+            contents = reader._read_documents([str(p) for p in targets.values()])
+            results = []
+            for source, doc_path in targets.items():
+                result = self._search_content(query, contents[str(doc_path)], source)
                 if result:
                     results.append(result)
         
@@ -144,6 +193,21 @@ class DocumentSearchTool(BaseTool):
         
         return "\n\n---\n\n".join(results)
     
+    def _search_store(self, query: str, targets: dict) -> List[str]:
+        """Search documents in the shared text store without copying their text."""
+        store = get_text_store()
+        paths = {source: path.resolve() for source, path in targets.items() if path.exists()}
+        errors = store.ensure(paths.values())
+        
+        results = []
+        for source, path in paths.items():
+            if str(path) in errors:
+                continue
+            matching_sections = store.search(path, query, context_lines=2, max_matches=5)
+            if matching_sections:
+                results.append(f"[Matches in {source}]\n\n" + "\n...\n".join(matching_sections))
+        return results
+    
     def _search_content(self, query: str, content: str, source: str) -> Optional[str]:
         """Simple search within content."""
         query_lower = query.lower()
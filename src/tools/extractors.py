@@ -0,0 +1,409 @@
+"""Pluggable text extraction backends, run in isolated worker processes."""
+
+import importlib
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.config.settings import (
+    EXTRACTION_MEMORY_LIMIT_MB,
+    EXTRACTION_TIMEOUT,
+    EXTRACTION_WORKERS,
+    EXTRACTOR_PLUGINS,
+    OCR_ENABLED,
+    OCR_LANGUAGE,
+)
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be converted to text."""
+
+
+# Extension -> extraction function
+EXTRACTORS: Dict[str, Callable[[Path], str]] = {}
+
+# Modules outside this one that registered extractors; worker processes
+# import them so their registrations exist there too
+EXTRACTOR_MODULES: List[str] = []
+
+
+def register_extractor(*extensions: str):
+    """
+    Register a function as the text extractor for one or more extensions.
+
+    The function must be defined at module level in an importable module
+    (or listed in EXTRACTOR_PLUGINS), because extraction runs in worker
+    processes that import that module to get the registration.
+
+    Example:
+        @register_extractor(".rtf")
+        def extract_rtf(path: Path) -> str:
+            ...
+    """
+    def decorator(func: Callable[[Path], str]):
+        for ext in extensions:
+            EXTRACTORS[ext.lower()] = func
+        module = func.__module__
+        # The main script is re-run in workers by multiprocessing itself
+        if module not in (__name__, "__main__", "__mp_main__") and module not in EXTRACTOR_MODULES:
+            EXTRACTOR_MODULES.append(module)
+        return func
+    return decorator
+
+
+def supported_extensions() -> List[str]:
+    """File extensions with a registered extractor."""
+    return sorted(EXTRACTORS)
+
+
+def extract_text(path: Path) -> str:
+    """Extract text from a document in the current process."""
+    path = Path(path)
+    extractor = EXTRACTORS.get(path.suffix.lower())
+    if extractor is None:
+        raise ExtractionError(f"Unsupported file format {path.suffix.lower()}")
+    return extractor(path)
+
+
+@register_extractor(".txt", ".md")
+def extract_plain_text(path: Path) -> str:
+    """Read a plain text or markdown file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _ocr_pdf_page(path: Path, page_number: int) -> str:
+    """OCR a single (1-based) PDF page with local tesseract."""
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    images = convert_from_path(str(path), dpi=300, first_page=page_number, last_page=page_number)
+    return "\n".join(pytesseract.image_to_string(image, lang=OCR_LANGUAGE) for image in images)
+
+
+@register_extractor(".pdf")
+def extract_pdf(path: Path) -> str:
+    """
+    Extract text from a PDF.
+
+    Pages without a text layer (scanned pages) are OCR'd with tesseract
+    when OCR is enabled and pytesseract/pdf2image are installed.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ExtractionError("pypdf not installed. Run: pip install pypdf")
+
+    reader = PdfReader(path)
+    pages = []
+    for number, page in enumerate(reader.pages, start=1):
+        text = page.extract_text() or ""
+        if not text.strip() and OCR_ENABLED:
+            try:
+                text = _ocr_pdf_page(path, number)
+            except ImportError:
+                text = f"[Page {number}: no text layer; install pytesseract and pdf2image for OCR]"
+            except Exception as e:
+                text = f"[Page {number}: OCR failed: {e}]"
+        pages.append(text)
+    return "\n".join(pages)
+
+
+def _table_to_markdown(table) -> str:
+    """Render a python-docx table as a markdown table."""
+    rows = []
+    for i, row in enumerate(table.rows):
+        cells = [" ".join(cell.text.split()) for cell in row.cells]
+        rows.append("| " + " | ".join(cells) + " |")
+        if i == 0:
+            rows.append("|" + "---|" * len(cells))
+    return "\n".join(rows)
+
+
+@register_extractor(".docx")
+def extract_docx(path: Path) -> str:
+    """
+    Extract text from a DOCX file.
+
+    Body paragraphs and tables are read in document order; section headers
+    and footers are included once each, before and after the body.
+    """
+    try:
+        from docx import Document
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
+    except ImportError:
+        raise ExtractionError("python-docx not installed. Run: pip install python-docx")
+
+    doc = Document(path)
+
+    def unique_parts(attr: str) -> list:
+        seen, parts = set(), []
+        for section in doc.sections:
+            text = "\n".join(p.text for p in getattr(section, attr).paragraphs).strip()
+            if text and text not in seen:
+                seen.add(text)
+                parts.append(text)
+        return parts
+
+    body = []
+    for child in doc.element.body.iterchildren():
+        tag = child.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            body.append(Paragraph(child, doc).text)
+        elif tag == "tbl":
+            body.append(_table_to_markdown(Table(child, doc)))
+
+    return "\n".join(unique_parts("header") + body + unique_parts("footer"))
+
+
+@register_extractor(".doc")
+def extract_legacy_doc(path: Path) -> str:
+    """Extract text from a legacy Word .doc via antiword or LibreOffice."""
+    if shutil.which("antiword"):
+        command = ["antiword", str(path)]
+    elif shutil.which("soffice"):
+        command = ["soffice", "--headless", "--cat", str(path)]
+    else:
+        raise ExtractionError(
+            "Legacy .doc files require antiword or LibreOffice (soffice) on the PATH"
+        )
+    completed = subprocess.run(command, capture_output=True, timeout=EXTRACTION_TIMEOUT)
+    if completed.returncode != 0:
+        raise ExtractionError(completed.stderr.decode("utf-8", "replace").strip())
+    return completed.stdout.decode("utf-8", "replace")
+
+
+class _HTMLTextParser(HTMLParser):
+    """Collects visible text from HTML, one block element per line."""
+
+    BLOCK_TAGS = {
+        "p", "div", "br", "li", "tr", "table", "section", "article",
+        "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer",
+    }
+    SKIP_TAGS = {"script", "style", "head", "noscript"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+        elif tag in ("td", "th"):
+            self.parts.append(" | ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self.parts).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+@register_extractor(".html", ".htm")
+def extract_html(path: Path) -> str:
+    """Extract visible text from an HTML file."""
+    parser = _HTMLTextParser()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        parser.feed(f.read())
+    parser.close()
+    return parser.text()
+
+
+@dataclass
+class ExtractionResult:
+    """Outcome of extracting one document."""
+    path: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _apply_memory_limit(limit_mb: int) -> None:
+    """Cap the address space of the current process (POSIX only)."""
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _extraction_worker(conn, path: str, memory_limit_mb: int, modules: List[str] = ()) -> None:
+    """Worker process entry point: extract one file and send back the result."""
+    try:
+        for module in modules:
+            # Already imported when preloaded by the forkserver
+            importlib.import_module(module)
+        if hasattr(os, "setsid"):
+            # Own process group, so antiword/soffice/pdftoppm/tesseract
+            # children can be killed along with the worker
+            os.setsid()
+        if memory_limit_mb:
+            _apply_memory_limit(memory_limit_mb)
+        conn.send(("ok", extract_text(Path(path))))
+    except MemoryError:
+        conn.send(("error", f"exceeded memory limit of {memory_limit_mb} MB"))
+    except Exception as e:
+        conn.send(("error", str(e) or type(e).__name__))
+    finally:
+        conn.close()
+
+
+def _kill_process_group(process) -> None:
+    """Kill a worker and any helper processes it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # No group (yet, or not POSIX): the worker has not started any helpers
+        if process.is_alive():
+            process.kill()
+
+
+class ExtractionPool:
+    """
+    Extracts documents in isolated worker processes.
+
+    Each file is parsed in its own short-lived process (and process group)
+    with an address-space limit, and the whole group is killed if it exceeds
+    the per-file timeout or leaves helper processes behind. At most
+    `workers` files are processed at once. A crash, hang, or memory blow-up
+    in one file only produces an error result for that file.
+    """
+
+    def __init__(
+        self,
+        workers: int = EXTRACTION_WORKERS,
+        timeout: float = EXTRACTION_TIMEOUT,
+        memory_limit_mb: int = EXTRACTION_MEMORY_LIMIT_MB,
+    ):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # Workers are forked from a server that has already imported the
+            # extractors, so each file does not pay the import cost again.
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload([__name__, *EXTRACTOR_MODULES])
+        else:
+            self._context = multiprocessing.get_context("spawn")
+
+    def _start(self, path: str) -> tuple:
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_extraction_worker,
+            args=(child_conn, path, self.memory_limit_mb, list(EXTRACTOR_MODULES)),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return parent_conn, process, time.monotonic()
+
+    def extract(self, path) -> ExtractionResult:
+        """Extract a single document."""
+        return self.extract_many([path])[str(path)]
+
+    def extract_many(self, paths: Iterable) -> Dict[str, ExtractionResult]:
+        """
+        Extract several documents concurrently.
+
+        Returns:
+            Mapping of path (as given, stringified) to ExtractionResult
+        """
+        return {result.path: result for result in self.iter_extract(paths)}
+
+    def iter_extract(self, paths: Iterable) -> Iterator[ExtractionResult]:
+        """
+        Extract several documents concurrently, yielding each result as it finishes.
+
+        Callers that write results out as they arrive only hold the text of
+        the documents currently in flight, not of the whole batch.
+        """
+        pending = [str(p) for p in paths]
+        running = {}
+
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    path = pending.pop(0)
+                    conn, process, started = self._start(path)
+                    running[conn] = (path, process, started)
+
+                now = time.monotonic()
+                next_deadline = min(started + self.timeout for _, _, started in running.values())
+                for conn in wait(list(running), timeout=max(0.0, next_deadline - now)):
+                    path, process, started = running.pop(conn)
+                    try:
+                        status, payload = conn.recv()
+                    except EOFError:
+                        process.join()
+                        status, payload = "error", f"extraction worker exited with code {process.exitcode}"
+                    conn.close()
+                    process.join()
+                    _kill_process_group(process)
+                    yield ExtractionResult(
+                        path=path,
+                        text=payload if status == "ok" else None,
+                        error=payload if status != "ok" else None,
+                        elapsed=time.monotonic() - started,
+                    )
+
+                now = time.monotonic()
+                for conn, (path, process, started) in list(running.items()):
+                    if now - started >= self.timeout:
+                        _kill_process_group(process)
+                        process.join()
+                        conn.close()
+                        del running[conn]
+                        yield ExtractionResult(
+                            path=path,
+                            error=f"extraction timed out after {self.timeout:g}s",
+                            elapsed=now - started,
+                        )
+        finally:
+            # The caller stopped early: do not leave workers behind
+            for conn, (_, process, _) in running.items():
+                _kill_process_group(process)
+                process.join()
+                conn.close()
+
+
+_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Return the shared extraction pool."""
+    global _pool
+    if _pool is None:
+        _pool = ExtractionPool()
+    return _pool
+
+
+for _plugin in EXTRACTOR_PLUGINS:
+    importlib.import_module(_plugin)
@@ -0,0 +1,158 @@
+"""Memoization of document tool results shared by all agents."""
+
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from src.config.settings import TOOL_CACHE_ENABLED, TOOL_CACHE_SIZE
+from src.utils.catalog import build_catalog
+
+
+def corpus_version(roots: list = None) -> str:
+    """
+    Cheap fingerprint of the document corpus.
+
+    Based on each supported file's path, size and modification time across
+    all document roots (default: POLICY_DOCS_DIRS), so any added, removed,
+    or edited document yields a new version.
+    """
+    entries = []
+    for path in build_catalog(roots):
+        stat = path.stat()
+        entries.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()[:16]
+
+
+class ToolResultCache:
+    """
+    Thread-safe LRU cache of tool results.
+
+    Keys combine the tool name, its call arguments and the corpus version,
+    so results are never served for a corpus that has since changed. The
+    corpus version is recomputed at most every `version_ttl` seconds.
+    """
+
+    def __init__(self, max_size: int = TOOL_CACHE_SIZE, version_ttl: float = 2.0):
+        self.max_size = max_size
+        self.version_ttl = version_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked = 0.0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero the hit/miss counters (entries are kept)."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.per_tool = {}
+
+    def _corpus_version(self) -> str:
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked > self.version_ttl:
+            self._version = corpus_version()
+            self._version_checked = now
+        return self._version
+
+    def _key(self, tool_name: str, arguments: dict) -> tuple:
+        args = json.dumps(arguments, sort_keys=True, default=str)
+        return (tool_name, args, self._corpus_version())
+
+    def _count(self, tool_name: str, hit: bool) -> None:
+        stats = self.per_tool.setdefault(tool_name, {"hits": 0, "misses": 0})
+        if hit:
+            self.hits += 1
+            stats["hits"] += 1
+        else:
+            self.misses += 1
+            stats["misses"] += 1
+
+    def get_or_compute(self, tool_name: str, arguments: dict, compute: Callable[[], str]) -> str:
+        """
+        Return the cached result for a call, computing and storing it on a miss.
+
+        Error results (strings starting with "Error") are returned but not
+        stored, so a transient failure such as an extraction timeout is
+        retried on the next call.
+        """
+        key = self._key(tool_name, arguments)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._count(tool_name, hit=True)
+                return self._entries[key]
+            self._count(tool_name, hit=False)
+
+        result = compute()
+        if isinstance(result, str) and result.startswith("Error"):
+            return result
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit-rate statistics, overall and per tool."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "per_tool": self.per_tool,
+        }
+
+
+_cache: Optional[ToolResultCache] = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache."""
+    global _cache
+    if _cache is None:
+        _cache = ToolResultCache()
+    return _cache
+
+
+def memoize_tool_call(run: Callable) -> Callable:
+    """
+    Decorator for a tool's _run method that serves repeated calls from the cache.
+
+    Arguments are bound to the method signature (defaults applied), so
+    `_run("a.md")` and `_run(file_path="a.md")` share one cache entry.
+    """
+    signature = inspect.signature(run)
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        if not TOOL_CACHE_ENABLED:
+            return run(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = {k: v for k, v in bound.arguments.items() if k != "self"}
+        # Tools restricted to a document subset must not share results with
+        # unrestricted ones
+        if getattr(self, "documents", None) is not None:
+            arguments["_documents"] = self.documents
+        return get_tool_cache().get_or_compute(
+            self.name, arguments, lambda: run(self, *args, **kwargs)
+        )
+
+    return wrapper
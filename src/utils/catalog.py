@@ -0,0 +1,97 @@
+"""Discovery of policy documents across one or more document roots."""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from src.config.settings import (
+    POLICY_DOCS_DIR,
+    POLICY_DOCS_DIRS,
+    TEXT_STORE_ENABLED,
+)
+from src.tools.extractors import supported_extensions
+
+
+def build_catalog(roots: Iterable[Path] = None) -> List[Path]:
+    """
+    List every document with a registered extractor under the given roots.
+
+    Args:
+        roots: Directories to scan recursively (default: POLICY_DOCS_DIRS)
+
+    Returns:
+        Sorted, de-duplicated absolute document paths
+    """
+    extensions = set(supported_extensions())
+    documents = set()
+    for root in roots or POLICY_DOCS_DIRS:
+        root = Path(root)
+        if not root.is_dir():
+            continue
+        for path in root.rglob("*"):
+            if path.is_file() and path.suffix.lower() in extensions:
+                documents.add(path.resolve())
+    return sorted(documents)
+
+
+def document_key(path) -> str:
+    """
+    Unique, readable name of a document across all document roots.
+
+    Documents under POLICY_DOCS_DIR are named by their path relative to it;
+    documents under other roots by their absolute path, so same-named files
+    on two shares never collide.
+    """
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(POLICY_DOCS_DIR.resolve()))
+    except ValueError:
+        return str(path)
+
+
+def cached_documents(paths: Iterable[Path]) -> set:
+    """
+    Documents whose text is already in the text store and up to date.
+
+    load_document_texts reads these without extracting anything. Always
+    empty when TEXT_STORE_ENABLED is off.
+
+    Returns:
+        Set of str(path) of the cached documents
+    """
+    if not TEXT_STORE_ENABLED:
+        return set()
+    from src.utils.text_store import get_text_store
+
+    store = get_text_store()
+    return {str(p) for p in (Path(p).resolve() for p in paths) if store.is_current(p)}
+
+
+def load_document_texts(paths: Iterable[Path]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Extract the text of several documents.
+
+    Text comes from the shared text store when TEXT_STORE_ENABLED is set,
+    otherwise from the isolated extraction pool.
+
+    Returns:
+        Tuple of (path -> text, path -> error message), keyed by str(path)
+    """
+    paths = [Path(p).resolve() for p in paths]
+    texts, errors = {}, {}
+    if TEXT_STORE_ENABLED:
+        from src.utils.text_store import get_text_store
+
+        store = get_text_store()
+        errors = store.ensure(paths)
+        for path in paths:
+            if str(path) not in errors:
+                texts[str(path)] = store.text(path)
+    else:
+        from src.tools.extractors import get_extraction_pool
+
+        for path, result in get_extraction_pool().extract_many(paths).items():
+            if result.ok:
+                texts[path] = result.text
+            else:
+                errors[path] = result.error
+    return texts, errors
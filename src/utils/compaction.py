@@ -0,0 +1,471 @@
+"""Compaction of task outputs before they are passed on as context."""
+
+import json
+import re
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+from src.utils.tokens import count_tokens, truncate_to_tokens
+
+
+HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+
+# Lines that carry provenance and must survive compaction where possible
+CITATION_RE = re.compile(
+    r"(\b[\w\-]+\.(pdf|docx?|md|txt)\b"
+    r"|\bsection\s+\d"
+    r"|§\s*\d"
+    r"|\b\d+\.\d+(\.\d+)*\b"
+    r"|document id|version|effective date|\[content from)",
+    re.IGNORECASE,
+)
+
+BULLET_RE = re.compile(r"^\s*([-*+]|\d+[.)])\s+")
+
+# A task output that is a single fenced code block, e.g. ```json ... ```
+FENCED_RE = re.compile(r"^```[\w-]*\s*\n(.*)\n\s*```$", re.DOTALL)
+
+# Shorter lines (field values such as "- Version: 1.0") are never deduplicated
+MIN_DUPLICATE_WORDS = 6
+
+# Order in which findings are collapsed and then dropped to meet a budget
+SEVERITY_ORDER = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Per-document extraction lists that may be cut to meet a budget; regulations
+# are short and always kept
+EXTRACTION_LIST_FIELDS = (
+    "requirements", "controls", "roles", "cross_references", "unclear_areas", "sections",
+)
+OMISSION_NOTE_TOKENS = 15
+
+
+@dataclass
+class CompactionStats:
+    """Metrics for one compacted task output."""
+    stage: str
+    budget: int
+    tokens_before: int
+    tokens_after: int
+    duplicates_removed: int
+    lines_omitted: int
+
+    @property
+    def compression_ratio(self) -> float:
+        """Original size divided by compacted size."""
+        return round(self.tokens_before / max(1, self.tokens_after), 2)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["compression_ratio"] = self.compression_ratio
+        data["within_budget"] = self.tokens_after <= self.budget
+        return data
+
+
+def _normalize(line: str) -> str:
+    return " ".join(BULLET_RE.sub("", line).lower().split())
+
+
+def deduplicate_lines(text: str) -> Tuple[str, int]:
+    """
+    Drop repeated content lines within a section, keeping the first occurrence.
+
+    Only lines of at least MIN_DUPLICATE_WORDS words are compared, and only
+    against earlier lines under the same heading, so short field lines
+    that legitimately repeat for every document are kept. Headings and
+    blank lines are always kept.
+
+    Returns:
+        Tuple of (deduplicated text, number of lines removed)
+    """
+    seen = set()
+    kept = []
+    removed = 0
+    for line in text.splitlines():
+        if HEADING_RE.match(line):
+            seen = set()
+            kept.append(line)
+            continue
+        key = _normalize(line)
+        if len(key.split()) < MIN_DUPLICATE_WORDS:
+            kept.append(line)
+            continue
+        if key in seen:
+            removed += 1
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept), removed
+
+
+def _split_tree(text: str) -> List[dict]:
+    """Split markdown into a flat list of sections (heading + body lines)."""
+    sections = [{"heading": None, "lines": []}]
+    for line in text.splitlines():
+        if HEADING_RE.match(line):
+            sections.append({"heading": line, "lines": []})
+        elif line.strip():
+            sections[-1]["lines"].append(line)
+    return [s for s in sections if s["heading"] or s["lines"]]
+
+
+def _line_priority(line: str) -> int:
+    """Lower is more important."""
+    if CITATION_RE.search(line):
+        return 0
+    if BULLET_RE.match(line):
+        return 1
+    return 2
+
+
+def _first_sentence(line: str) -> str:
+    """Cut a line (bullet marker kept) down to its first sentence."""
+    bullet = BULLET_RE.match(line)
+    prefix = bullet.group(0) if bullet else ""
+    match = re.match(r"(.*?[A-Za-z)\]\"'][.!?])(\s|$)", line[len(prefix):].strip())
+    return prefix + match.group(1) if match else line
+
+
+def summarize_hierarchically(text: str, budget: int) -> Tuple[str, int]:
+    """
+    Shrink markdown to fit a token budget while keeping its outline.
+
+    Every heading is kept. The remaining budget is shared between sections in
+    proportion to their size; within a section, citation lines are kept
+    first, then bullets, then prose, in original order and shortened to their
+    first sentence. Omitted lines are noted inline.
+
+    Returns:
+        Tuple of (compacted text, number of lines omitted)
+    """
+    sections = _split_tree(text)
+    heading_tokens = sum(count_tokens(s["heading"]) for s in sections if s["heading"])
+    body_budget = max(0, budget - heading_tokens)
+    body_sizes = [sum(count_tokens(l) for l in s["lines"]) for s in sections]
+    total_body = max(1, sum(body_sizes))
+
+    output = []
+    omitted_total = 0
+    for section, size in zip(sections, body_sizes):
+        if section["heading"]:
+            output.append(section["heading"])
+
+        allowance = body_budget * size // total_body
+        ranked = sorted(range(len(section["lines"])), key=lambda i: _line_priority(section["lines"][i]))
+        keep = {}
+        used = 0
+        for i in ranked:
+            line = section["lines"][i]
+            cost = count_tokens(line)
+            if used + cost > allowance:
+                line = _first_sentence(line)
+                cost = count_tokens(line)
+            if used + cost > allowance:
+                continue
+            keep[i] = line
+            used += cost
+
+        output.extend(keep[i] for i in sorted(keep))
+        omitted = len(section["lines"]) - len(keep)
+        if omitted:
+            output.append(f"[... {omitted} line(s) omitted]")
+            omitted_total += omitted
+
+    return "\n".join(output), omitted_total
+
+
+def compact_text(text: str, budget: int) -> Tuple[str, int, int]:
+    """
+    Deduplicate and, if still over budget, hierarchically summarize text.
+
+    Returns:
+        Tuple of (compacted text, duplicates removed, lines omitted)
+    """
+    text, duplicates = deduplicate_lines(text)
+    if count_tokens(text) <= budget:
+        return text, duplicates, 0
+
+    # Omission markers and line breaks are not part of the per-section
+    # allowances, so tighten the target until the summary fits.
+    target = budget
+    for _ in range(3):
+        summary, omitted = summarize_hierarchically(text, target)
+        size = count_tokens(summary)
+        if size <= budget:
+            return summary, duplicates, omitted
+        target = max(1, target * budget // size - 1)
+    return truncate_to_tokens(summary, budget), duplicates, omitted
+
+
+def _collapse_finding(finding: dict) -> None:
+    """Reduce a finding to its title and first citation reference."""
+    citations = finding.get("citations") or []
+    finding["description"] = ""
+    finding["recommendation"] = None
+    finding["citations"] = [
+        {"document": c.get("document"), "section": c.get("section")} for c in citations[:1]
+    ]
+
+
+def _fit_findings(data: dict, budget: int) -> int:
+    """
+    Collapse, then drop, the lowest-severity findings until data fits the budget.
+
+    Returns:
+        Number of findings collapsed or dropped
+    """
+    findings = data.get("findings", [])
+    # Lowest severity first; among equals, the last-listed (least prioritized) first
+    order = sorted(
+        range(len(findings)),
+        key=lambda i: (SEVERITY_ORDER.get(findings[i].get("severity"), 0), -i),
+    )
+    # Track the size incrementally rather than re-counting the whole result
+    size = count_tokens(json.dumps(data, ensure_ascii=False))
+    changed = 0
+    for i in order:
+        if size <= budget:
+            return changed
+        before = count_tokens(json.dumps(findings[i], ensure_ascii=False))
+        _collapse_finding(findings[i])
+        size -= before - count_tokens(json.dumps(findings[i], ensure_ascii=False))
+        changed += 1
+
+    summary = data.get("summary", "")
+    dropped = set()
+    remaining = iter(order)
+    while size > budget and len(dropped) < len(findings):
+        # Estimate from per-finding sizes, then re-check the exact size
+        for i in remaining:
+            dropped.add(i)
+            size -= count_tokens(json.dumps(findings[i], ensure_ascii=False)) + 1
+            if size <= budget:
+                break
+        data["findings"] = [f for i, f in enumerate(findings) if i not in dropped]
+        data["summary"] = (
+            f"{summary} [{len(dropped)} lower-severity finding(s) "
+            "omitted to fit the context budget]"
+        ).strip()
+        size = count_tokens(json.dumps(data, ensure_ascii=False))
+    changed += len(dropped)
+
+    # Last resort when even the summary and ratings are over budget
+    compacted = json.dumps(data, ensure_ascii=False)
+    if count_tokens(compacted) > budget:
+        for rating in data.get("risk_ratings", []):
+            rating["rationale"] = ""
+        overflow = count_tokens(json.dumps(data, ensure_ascii=False)) - budget
+        if overflow > 0 and data.get("summary"):
+            data["summary"] = truncate_to_tokens(
+                data["summary"], max(0, count_tokens(data["summary"]) - overflow - 5)
+            )
+    return changed
+
+
+def compact_analysis_json(raw: str, budget: int) -> Tuple[str, int, int]:
+    """
+    Compact a JSON analysis result without breaking its structure.
+
+    Duplicate findings (same document, regulation and title) are merged,
+    keeping all of their citations. If the result is still over budget,
+    free-text fields are cut to their first sentence and citation excerpts
+    are dropped, keeping the document and section references. If that is
+    not enough, findings are collapsed to their title and first citation,
+    lowest severity first, and finally dropped (noted in the summary).
+
+    Returns:
+        Tuple of (compacted JSON, duplicates removed, fields shortened)
+    """
+    data = json.loads(raw)
+    findings = data.get("findings", [])
+
+    merged = {}
+    for finding in findings:
+        key = tuple(
+            " ".join(str(finding.get(f, "")).lower().split())
+            for f in ("document", "regulation", "title")
+        )
+        if key in merged:
+            merged[key].setdefault("citations", []).extend(finding.get("citations", []))
+        else:
+            merged[key] = finding
+    duplicates = len(findings) - len(merged)
+    data["findings"] = list(merged.values())
+
+    shortened = 0
+    compacted = json.dumps(data, ensure_ascii=False)
+    if count_tokens(compacted) > budget:
+        for finding in data["findings"]:
+            for field in ("description", "recommendation"):
+                if finding.get(field):
+                    finding[field] = _first_sentence(finding[field])
+                    shortened += 1
+            for citation in finding.get("citations", []):
+                if citation.pop("excerpt", None):
+                    shortened += 1
+        for rating in data.get("risk_ratings", []):
+            if rating.get("rationale"):
+                rating["rationale"] = _first_sentence(rating["rationale"])
+                shortened += 1
+        shortened += _fit_findings(data, budget)
+        compacted = json.dumps(data, ensure_ascii=False)
+
+    return compacted, duplicates, shortened
+
+
+def _json_payload(raw: str) -> Optional[str]:
+    """
+    The JSON object a task output consists of, or None if it is not JSON.
+
+    A surrounding code fence (as LLMs often add) is removed.
+    """
+    text = raw.strip()
+    fenced = FENCED_RE.match(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    if not (text.startswith("{") and text.endswith("}")):
+        return None
+    try:
+        json.loads(text)
+    except ValueError:
+        return None
+    return text
+
+
+def _tokens(data) -> int:
+    return count_tokens(json.dumps(data, ensure_ascii=False))
+
+
+def compact_extractions(records: List[dict], budget: int) -> Tuple[List[dict], int, int]:
+    """
+    Fit per-document extraction records into a token budget.
+
+    Every document stays represented. Free-text fields and list items are
+    first cut to their first sentence; then each document gets an equal
+    share of what is left of the budget (smallest documents first, so
+    their unused share goes to the larger ones) and items are dropped from
+    the end of its longest lists until it fits, noted in its purpose.
+
+    Returns:
+        Tuple of (compacted records, duplicates removed, items shortened or dropped)
+    """
+    records = [dict(r) for r in records]
+    if sum(_tokens(r) + 1 for r in records) <= budget:
+        return records, 0, 0
+
+    changed = 0
+    for record in records:
+        for field in ("purpose", "review_requirements"):
+            if record.get(field):
+                record[field] = _first_sentence(record[field])
+        for field in EXTRACTION_LIST_FIELDS:
+            items = record.get(field) or []
+            record[field] = [_first_sentence(item) for item in items]
+            changed += sum(1 for old, new in zip(items, record[field]) if old != new)
+    if sum(_tokens(r) + 1 for r in records) <= budget:
+        return records, 0, changed
+
+    remaining = budget
+    order = sorted(range(len(records)), key=lambda i: _tokens(records[i]))
+    for position, i in enumerate(order):
+        record = records[i]
+        share = remaining // (len(records) - position)
+        purpose = record.get("purpose", "")
+        size = _tokens(record)
+        omitted = 0
+        while size > share and any(record.get(f) for f in EXTRACTION_LIST_FIELDS):
+            # Estimate from per-item sizes, leaving room for the note, then re-check
+            while size + OMISSION_NOTE_TOKENS > share:
+                field = max(EXTRACTION_LIST_FIELDS, key=lambda f: len(record.get(f) or []))
+                if not record.get(field):
+                    break
+                size -= _tokens(record[field].pop()) + 1
+                omitted += 1
+            record["purpose"] = (
+                f"{purpose} [{omitted} extracted item(s) omitted to fit the context budget]"
+            ).strip()
+            size = _tokens(record)
+
+        # Last resort when even the bare record is over its share
+        overflow = size - share
+        if overflow > 0 and record.get("purpose"):
+            record["purpose"] = truncate_to_tokens(
+                record["purpose"], max(0, count_tokens(record["purpose"]) - overflow - 5)
+            )
+            size = _tokens(record)
+        changed += omitted
+        remaining -= size + 1
+    return records, 0, changed
+
+
+class ContextCompactor:
+    """
+    Compacts task outputs in place so downstream tasks get a bounded context.
+
+    Attach callback_for(stage, budget) as a CrewAI task callback. The callback
+    runs after the task finishes and before the next task reads its output,
+    replacing the raw output with a compacted version. Structured (pydantic)
+    outputs are left untouched.
+    """
+
+    def __init__(self):
+        self.stats: List[CompactionStats] = []
+
+    def compact(self, stage: str, raw: str, budget: int) -> str:
+        """Compact one task output and record its metrics."""
+        before = count_tokens(raw)
+        payload = _json_payload(raw)
+        if payload is None:
+            compacted, duplicates, omitted = compact_text(raw, budget)
+        else:
+            # Line-based compaction would break JSON, so it is never applied to it
+            try:
+                if "findings" not in json.loads(payload):
+                    raise TypeError("not an analysis result")
+                compacted, duplicates, omitted = compact_analysis_json(payload, budget)
+            except (AttributeError, TypeError):
+                # Not an analysis result: pass it on whole, only minified
+                compacted = json.dumps(json.loads(payload), ensure_ascii=False)
+                duplicates = omitted = 0
+
+        self.stats.append(CompactionStats(
+            stage=stage,
+            budget=budget,
+            tokens_before=before,
+            tokens_after=count_tokens(compacted),
+            duplicates_removed=duplicates,
+            lines_omitted=omitted,
+        ))
+        return compacted
+
+    def compact_extractions(self, extractions: list, budget: int, stage: str = "ingestion") -> list:
+        """Fit per-document extractions (pydantic models) into a budget and record its metrics."""
+        records = [e.model_dump() for e in extractions]
+        before = sum(_tokens(r) + 1 for r in records)
+        compacted, duplicates, omitted = compact_extractions(records, budget)
+
+        self.stats.append(CompactionStats(
+            stage=stage,
+            budget=budget,
+            tokens_before=before,
+            tokens_after=sum(_tokens(r) + 1 for r in compacted),
+            duplicates_removed=duplicates,
+            lines_omitted=omitted,
+        ))
+        return [type(e).model_validate(r) for e, r in zip(extractions, compacted)]
+
+    def callback_for(self, stage: str, budget: int):
+        """Build a task callback that compacts the task's raw output."""
+        def _callback(task_output):
+            task_output.raw = self.compact(stage, task_output.raw, budget)
+        return _callback
+
+    def summary(self) -> dict:
+        """Per-stage metrics and the overall compression ratio."""
+        before = sum(s.tokens_before for s in self.stats)
+        after = sum(s.tokens_after for s in self.stats)
+        return {
+            "stages": [s.to_dict() for s in self.stats],
+            "tokens_before": before,
+            "tokens_after": after,
+            "compression_ratio": round(before / max(1, after), 2),
+        }
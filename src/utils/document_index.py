@@ -0,0 +1,245 @@
+"""Local full-text index of policy document sections for pre-routing runs."""
+
+import re
+import sqlite3
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from src.config.settings import DOCUMENT_INDEX_DB, ROUTING_MAX_DOCUMENTS
+from src.utils.catalog import build_catalog, cached_documents, load_document_texts
+
+
+# Extra search terms for common focus areas, so that e.g. "GDPR" also
+# matches policies that talk about personal data without naming the law.
+AREA_TERMS = {
+    "gdpr": ["gdpr", "general data protection", "personal data", "data subject", "data protection"],
+    "ccpa": ["ccpa", "california consumer privacy", "consumer privacy", "personal information"],
+    "privacy": ["privacy", "personal data", "data subject", "consent"],
+    "sox": ["sox", "sarbanes", "oxley", "financial reporting", "internal control"],
+    "basel": ["basel", "capital adequacy", "operational risk", "liquidity"],
+    "hipaa": ["hipaa", "protected health information", "phi", "health information"],
+    "pci": ["pci", "cardholder", "payment card"],
+    "aml": ["aml", "anti money laundering", "money laundering", "kyc", "know your customer"],
+    "data governance": ["data governance", "data quality", "data steward", "data classification", "data owner"],
+    "risk management": ["risk management", "risk appetite", "risk assessment", "risk register", "key risk indicator"],
+    "retention": ["retention", "records management", "disposal", "archiving"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    indexed_at REAL NOT NULL,
+    error TEXT
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+    path UNINDEXED,
+    heading,
+    body,
+    tokenize = 'porter unicode61'
+);
+"""
+
+HEADING_RE = re.compile(r"^(#{1,6}\s+\S.*|\d+(\.\d+)*\.?\s+[A-Z][^.]{0,80})$")
+MAX_SECTION_CHARS = 4000
+
+
+def split_into_sections(text: str) -> List[tuple]:
+    """
+    Split document text into (heading, body) sections.
+
+    Markdown headings and numbered headings ("4.2 Purpose Limitation")
+    start a new section; long sections are cut into MAX_SECTION_CHARS pieces.
+    """
+    sections = []
+    heading, lines = "", []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        for start in range(0, max(1, len(body)), MAX_SECTION_CHARS):
+            piece = body[start:start + MAX_SECTION_CHARS]
+            if piece or heading:
+                sections.append((heading, piece))
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if HEADING_RE.match(stripped):
+            flush()
+            heading, lines = stripped.lstrip("#").strip(), []
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+def _area_terms(area: str) -> List[str]:
+    key = area.strip().lower()
+    for name, terms in AREA_TERMS.items():
+        if name in key or key in name:
+            return terms
+    return [key]
+
+
+def build_match_query(document_focus: Optional[str], focus_areas: Optional[List[str]]) -> str:
+    """Build an FTS5 MATCH expression (OR of phrases) from focus and areas."""
+    phrases = []
+    for area in focus_areas or []:
+        phrases.extend(_area_terms(area))
+    if document_focus:
+        phrases.extend(_area_terms(document_focus))
+    words = []
+    for phrase in dict.fromkeys(phrases):
+        tokens = re.findall(r"\w+", phrase.lower())
+        if tokens:
+            words.append('"' + " ".join(tokens) + '"')
+    return " OR ".join(words)
+
+
+@dataclass
+class RoutedDocument:
+    """A document selected for a focused run."""
+    path: str
+    score: float
+    sections: List[str] = field(default_factory=list)
+
+
+class DocumentIndex:
+    """
+    SQLite FTS5 index of document sections.
+
+    The index is refreshed incrementally: only documents whose size or
+    modification time changed since the last refresh are re-extracted.
+    """
+
+    def __init__(self, db_path: Path = DOCUMENT_INDEX_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def refresh(self, roots: Iterable[Path] = None, cached_only: bool = False) -> dict:
+        """
+        Bring the index up to date with the document catalog.
+
+        With cached_only, new or changed documents whose text is not in the
+        text store yet are left as they are (and counted as deferred)
+        instead of being extracted.
+
+        Returns:
+            Counts of indexed, unchanged, removed, failed and deferred documents
+        """
+        catalog = {str(p): p.stat() for p in build_catalog(roots)}
+        known = {
+            row[0]: (row[1], row[2])
+            for row in self.conn.execute("SELECT path, size, mtime_ns FROM documents")
+        }
+
+        stale = [
+            path for path, stat in catalog.items()
+            if known.get(path) != (stat.st_size, stat.st_mtime_ns)
+        ]
+        removed = [path for path in known if path not in catalog]
+        deferred = []
+        if cached_only:
+            cached = cached_documents(stale)
+            deferred = [path for path in stale if path not in cached]
+            stale = [path for path in stale if path in cached]
+        texts, errors = load_document_texts(stale) if stale else ({}, {})
+
+        failed = 0
+        with self.conn:
+            for path in removed + stale:
+                self.conn.execute("DELETE FROM sections WHERE path = ?", (path,))
+                self.conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+            for path in stale:
+                stat = catalog[path]
+                if path in texts:
+                    self.conn.executemany(
+                        "INSERT INTO sections (path, heading, body) VALUES (?, ?, ?)",
+                        [(path, h, b) for h, b in split_into_sections(texts[path])],
+                    )
+                else:
+                    failed += 1
+                self.conn.execute(
+                    "INSERT INTO documents VALUES (?, ?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, time.time(), errors.get(path)),
+                )
+
+        return {
+            "indexed": len(stale) - failed,
+            "unchanged": len(catalog) - len(stale) - len(deferred),
+            "removed": len(removed),
+            "failed": failed,
+            "deferred": len(deferred),
+        }
+
+    def route(
+        self,
+        document_focus: Optional[str] = None,
+        focus_areas: Optional[List[str]] = None,
+        max_documents: int = ROUTING_MAX_DOCUMENTS,
+        max_sections: int = 5,
+    ) -> List[RoutedDocument]:
+        """
+        Select the documents and sections relevant to a focus and focus areas.
+
+        Documents whose file name contains the focus text are always
+        included. Others are ranked by the summed BM25 relevance of their
+        matching sections, with headings weighted above body text.
+
+        Returns:
+            Routed documents, most relevant first
+        """
+        ranked = {}
+
+        if document_focus:
+            needle = document_focus.strip().lower().replace(" ", "_")
+            for (path,) in self.conn.execute("SELECT path FROM documents"):
+                name = Path(path).name.lower()
+                if needle in name or needle.replace("_", " ") in name.replace("_", " "):
+                    ranked[path] = RoutedDocument(path=path, score=float("inf"))
+
+        query = build_match_query(document_focus, focus_areas)
+        if query:
+            rows = self.conn.execute(
+                """
+                SELECT path, heading, -bm25(sections, 0.0, 3.0, 1.0) AS score
+                FROM sections WHERE sections MATCH ?
+                ORDER BY score DESC
+                """,
+                (query,),
+            )
+            for path, heading, score in rows:
+                doc = ranked.setdefault(path, RoutedDocument(path=path, score=0.0))
+                doc.score += score
+                if heading and heading not in doc.sections and len(doc.sections) < max_sections:
+                    doc.sections.append(heading)
+
+        documents = sorted(ranked.values(), key=lambda d: d.score, reverse=True)
+        return documents[:max_documents]
+
+
+def routing_summary(documents: List[RoutedDocument], total: int) -> dict:
+    """JSON-serializable description of a routing decision."""
+    return {
+        "selected": len(documents),
+        "catalog_size": total,
+        "documents": [
+            {**asdict(d), "score": None if d.score == float("inf") else round(d.score, 3)}
+            for d in documents
+        ],
+    }
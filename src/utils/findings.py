@@ -0,0 +1,137 @@
+"""Structured (JSON/JSONL) export of compliance findings."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import ValidationError
+
+from src.tasks.schemas import AnalysisResult, Finding
+
+
+def extract_analysis_result(crew_output) -> Optional[AnalysisResult]:
+    """
+    Find the structured analysis result in a crew's task outputs.
+
+    Falls back to parsing the raw task output as JSON when CrewAI could not
+    convert it to the pydantic model itself.
+
+    Returns:
+        The validated AnalysisResult, or None if no task produced one
+    """
+    for task_output in getattr(crew_output, "tasks_output", []):
+        if isinstance(task_output.pydantic, AnalysisResult):
+            return task_output.pydantic
+
+    for task_output in getattr(crew_output, "tasks_output", []):
+        try:
+            return AnalysisResult.model_validate_json(task_output.raw)
+        except (ValidationError, ValueError, TypeError):
+            continue
+    return None
+
+
+def finding_record(finding: Finding, run_id: str) -> dict:
+    """Flatten a finding into a JSON-serializable record tagged with its run."""
+    return {"run_id": run_id, "key": finding.key, **finding.model_dump()}
+
+
+def write_findings_jsonl(path: Path, findings: List[Finding], run_id: str) -> Path:
+    """Write one JSON record per finding."""
+    with open(path, "w", encoding="utf-8") as f:
+        for finding in findings:
+            f.write(json.dumps(finding_record(finding, run_id), ensure_ascii=False) + "\n")
+    return Path(path)
+
+
+def read_findings_jsonl(path: Path) -> List[dict]:
+    """
+    Read and validate findings written by write_findings_jsonl.
+
+    Returns:
+        Records with "run_id", "key" and the validated finding fields
+    """
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            finding = Finding.model_validate(
+                {k: v for k, v in data.items() if k not in ("run_id", "key")}
+            )
+            records.append(finding_record(finding, data.get("run_id")))
+    return records
+
+
+def diff_findings(previous: Optional[AnalysisResult], current: Optional[AnalysisResult]) -> dict:
+    """Compare findings between two runs by their stable keys."""
+    prev_keys = {f.key for f in previous.findings} if previous else set()
+    curr_keys = {f.key for f in current.findings} if current else set()
+    return {
+        "new": sorted(curr_keys - prev_keys),
+        "resolved": sorted(prev_keys - curr_keys),
+        "persisting": sorted(curr_keys & prev_keys),
+    }
+
+
+def build_report_json(run_id: str, scope: dict, sections: dict,
+                      analysis: Optional[AnalysisResult]) -> dict:
+    """
+    Build the structured companion to the markdown compliance report.
+
+    Args:
+        run_id: Identifier for this run
+        scope: Run parameters (report type, focus, areas)
+        sections: Report section key -> markdown
+        analysis: Structured analysis result, if available
+    """
+    return {
+        "run_id": run_id,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "scope": scope,
+        "sections": [{"key": key, "markdown": text} for key, text in sections.items()],
+        "analysis": analysis.model_dump() if analysis else None,
+    }
+
+
+SEVERITY_ORDER = ["low", "medium", "high", "critical"]
+
+
+def merge_analyses(results: List[AnalysisResult]) -> AnalysisResult:
+    """
+    Merge analysis results from several shards into one.
+
+    Findings are de-duplicated by key, regulations are unioned, and risk
+    ratings for the same area keep the most severe rating.
+    """
+    findings = {}
+    regulations = []
+    ratings = {}
+    summaries = []
+
+    for result in results:
+        if result.summary:
+            summaries.append(result.summary.strip())
+        for regulation in result.regulations:
+            if regulation not in regulations:
+                regulations.append(regulation)
+        for finding in result.findings:
+            findings.setdefault(finding.key, finding)
+        for rating in result.risk_ratings:
+            area = rating.area.strip().lower()
+            current = ratings.get(area)
+            if current is None:
+                ratings[area] = rating.model_copy()
+            else:
+                if SEVERITY_ORDER.index(rating.rating) > SEVERITY_ORDER.index(current.rating):
+                    current.rating = rating.rating
+                current.rationale = f"{current.rationale} {rating.rationale}".strip()
+
+    return AnalysisResult(
+        summary="\n\n".join(summaries),
+        regulations=regulations,
+        findings=list(findings.values()),
+        risk_ratings=list(ratings.values()),
+    )
@@ -0,0 +1,267 @@
+"""Near-duplicate detection of policy documents with MinHash and LSH."""
+
+import difflib
+import json
+import os
+import random
+import re
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.config.settings import MINHASH_CACHE, NEAR_DUPLICATE_THRESHOLD
+from src.utils.catalog import load_document_texts
+from src.utils.document_index import split_into_sections
+
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16  # 16 bands x 8 rows: candidate pairs from ~0.7 Jaccard similarity
+MAX_DIFF_LINES = 40
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set:
+    """
+    Hash the overlapping word n-grams of a text.
+
+    Words are lower-cased and stripped of punctuation first, so formatting
+    differences (e.g. the PDF and DOCX of one policy) do not matter.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash(shingle_set: set) -> List[int]:
+    """MinHash signature of a shingle set (NUM_PERMUTATIONS values)."""
+    if not shingle_set:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return [
+        min(((a * s + b) % _MERSENNE_PRIME) & _MAX_HASH for s in shingle_set)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def lsh_candidates(signatures: Dict[str, List[int]], bands: int = LSH_BANDS) -> set:
+    """
+    Find candidate near-duplicate pairs by banding the signatures.
+
+    Returns:
+        Set of (path, path) pairs that share at least one band bucket
+    """
+    rows = NUM_PERMUTATIONS // bands
+    candidates = set()
+    for band in range(bands):
+        buckets = {}
+        for path, signature in signatures.items():
+            key = tuple(signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(path)
+        for members in buckets.values():
+            members.sort()
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    candidates.add((first, second))
+    return candidates
+
+
+def _sections_by_heading(text: str) -> Dict[str, str]:
+    sections = {}
+    for heading, body in split_into_sections(text):
+        key = " ".join(heading.lower().split()) or "(preamble)"
+        sections[key] = (sections.get(key, "") + "\n" + body).strip()
+    return sections
+
+
+def section_diff(canonical_text: str, duplicate_text: str) -> dict:
+    """
+    Section-level differences of a duplicate relative to its canonical document.
+
+    Returns:
+        Dict with sections_added, sections_removed and sections_changed
+        (heading plus a unified diff, at most MAX_DIFF_LINES lines each)
+    """
+    canonical = _sections_by_heading(canonical_text)
+    duplicate = _sections_by_heading(duplicate_text)
+    changed = []
+    for heading, body in duplicate.items():
+        if heading in canonical and " ".join(canonical[heading].split()) != " ".join(body.split()):
+            diff = list(difflib.unified_diff(
+                canonical[heading].splitlines(), body.splitlines(), lineterm="", n=0
+            ))[2:]
+            changed.append({"heading": heading, "diff": diff[:MAX_DIFF_LINES]})
+    return {
+        "sections_added": [h for h in duplicate if h not in canonical],
+        "sections_removed": [h for h in canonical if h not in duplicate],
+        "sections_changed": changed,
+    }
+
+
+@dataclass
+class DuplicateCluster:
+    """A group of near-identical documents and the one chosen for analysis."""
+    canonical: str
+    duplicates: List[dict] = field(default_factory=list)
+
+    @property
+    def members(self) -> List[str]:
+        return [self.canonical] + [d["path"] for d in self.duplicates]
+
+
+def _load_cache(cache_path: Path) -> dict:
+    try:
+        return json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path: Path, cache: dict) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(cache), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+
+
+def _choose_canonical(members: List[str], texts: Dict[str, str]) -> str:
+    """Prefer the most recently modified member, then the longest text."""
+    return max(
+        members,
+        key=lambda p: (Path(p).stat().st_mtime_ns, len(texts.get(p, "")), p),
+    )
+
+
+def find_near_duplicates(
+    paths: Iterable[Path],
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    cache_path: Path = MINHASH_CACHE,
+    update_cache: bool = True,
+) -> List[DuplicateCluster]:
+    """
+    Cluster near-identical documents.
+
+    MinHash signatures are cached per document (by size and modification
+    time), candidate pairs come from LSH banding, and pairs whose estimated
+    similarity reaches the threshold are merged into clusters. With
+    update_cache off, new signatures are computed but not saved.
+
+    Returns:
+        Clusters with two or more members, each with its canonical document
+        and a section-level diff for every other member
+    """
+    paths = [str(Path(p).resolve()) for p in paths]
+    cache = _load_cache(cache_path)
+    signatures = {}
+    stale = []
+    for path in paths:
+        stat = Path(path).stat()
+        entry = cache.get(path)
+        if entry and entry["stamp"] == [stat.st_size, stat.st_mtime_ns]:
+            signatures[path] = entry["signature"]
+        else:
+            stale.append(path)
+
+    if stale:
+        texts, _ = load_document_texts(stale)
+        for path, text in texts.items():
+            stat = Path(path).stat()
+            signatures[path] = minhash(shingles(text))
+            cache[path] = {"stamp": [stat.st_size, stat.st_mtime_ns], "signature": signatures[path]}
+        if update_cache:
+            for path in [p for p in cache if p not in paths and not Path(p).exists()]:
+                del cache[path]
+            _save_cache(cache_path, cache)
+
+    parent = {path: path for path in signatures}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    similarities = {}
+    for first, second in lsh_candidates(signatures):
+        similarity = estimate_similarity(signatures[first], signatures[second])
+        if similarity >= threshold:
+            similarities[(first, second)] = similarities[(second, first)] = similarity
+            parent[find(first)] = find(second)
+
+    groups = {}
+    for path in signatures:
+        groups.setdefault(find(path), []).append(path)
+    groups = [sorted(members) for members in groups.values() if len(members) > 1]
+    if not groups:
+        return []
+
+    texts, _ = load_document_texts(p for members in groups for p in members)
+    clusters = []
+    for members in groups:
+        canonical = _choose_canonical(members, texts)
+        cluster = DuplicateCluster(canonical=canonical)
+        for path in members:
+            if path == canonical:
+                continue
+            similarity = similarities.get(
+                (canonical, path),
+                estimate_similarity(signatures[canonical], signatures[path]),
+            )
+            cluster.duplicates.append({
+                "path": path,
+                "similarity": round(similarity, 3),
+                **section_diff(texts.get(canonical, ""), texts.get(path, "")),
+            })
+        clusters.append(cluster)
+    return sorted(clusters, key=lambda c: c.canonical)
+
+
+def duplicate_paths(clusters: List[DuplicateCluster]) -> set:
+    """Paths of all non-canonical cluster members."""
+    return {d["path"] for cluster in clusters for d in cluster.duplicates}
+
+
+def duplicates_summary(clusters: List[DuplicateCluster], total: int) -> dict:
+    """JSON-serializable description of near-duplicate clusters."""
+    return {
+        "catalog_size": total,
+        "clusters": len(clusters),
+        "skipped_documents": len(duplicate_paths(clusters)),
+        "threshold": NEAR_DUPLICATE_THRESHOLD,
+        "details": [asdict(cluster) for cluster in clusters],
+    }
+
+
+def describe_clusters(clusters: List[DuplicateCluster], max_changes: Optional[int] = 5) -> str:
+    """Plain-text summary of clusters and their differences for task prompts."""
+    lines = []
+    for cluster in clusters:
+        lines.append(f"- {Path(cluster.canonical).name} (analyzed) has near-duplicates:")
+        for duplicate in cluster.duplicates:
+            lines.append(
+                f"  - {Path(duplicate['path']).name} "
+                f"({duplicate['similarity']:.0%} similar, not analyzed separately)"
+            )
+            if duplicate["sections_added"]:
+                lines.append(f"    sections only in this version: {'; '.join(duplicate['sections_added'])}")
+            if duplicate["sections_removed"]:
+                lines.append(f"    sections missing from this version: {'; '.join(duplicate['sections_removed'])}")
+            for change in duplicate["sections_changed"][:max_changes]:
+                lines.append(f"    changed section '{change['heading']}':")
+                lines.extend(f"      {line}" for line in change["diff"][:10])
+    return "\n".join(lines)
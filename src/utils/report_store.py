@@ -0,0 +1,304 @@
+"""Versioned, sectioned storage for compliance reports."""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+from src.config.settings import FINGERPRINT_CACHE, REPORTS_DIR
+from src.utils.catalog import build_catalog, document_key
+
+
+PREAMBLE_KEY = "preamble"
+
+# Sections that aggregate over all documents without naming them
+SUMMARY_SECTION_RE = re.compile(r"summary|score|rating|posture|overview|conclusion")
+# Sections that list documents or findings, where added documents belong
+INVENTORY_SECTION_RE = re.compile(r"finding|gap|inventory|roadmap|remediation")
+
+
+def _hash_text(text: str) -> str:
+    """Return a stable hash for a block of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def section_key(heading: str) -> str:
+    """Turn a markdown heading into a stable section key."""
+    heading = re.sub(r"^#+\s*", "", heading.strip())
+    heading = heading.replace("*", "").replace("`", "")
+    return re.sub(r"[^a-z0-9]+", "-", heading.lower()).strip("-") or PREAMBLE_KEY
+
+
+def split_sections(markdown: str) -> dict:
+    """
+    Split a markdown report into top-level sections.
+
+    Sections start at "#" or "##" headings. Anything before the first heading
+    is kept under the "preamble" key. Deeper headings stay inside their parent.
+
+    Returns:
+        Ordered mapping of section key to section markdown (heading included)
+    """
+    sections = {}
+    key = PREAMBLE_KEY
+    lines = []
+
+    for line in markdown.splitlines():
+        if re.match(r"^#{1,2}\s+\S", line):
+            if any(l.strip() for l in lines):
+                sections[key] = "\n".join(lines).strip("\n")
+            key = section_key(line)
+            # Disambiguate repeated headings
+            base, n = key, 2
+            while key in sections:
+                key = f"{base}-{n}"
+                n += 1
+            lines = [line]
+        else:
+            lines.append(line)
+
+    if any(l.strip() for l in lines):
+        sections[key] = "\n".join(lines).strip("\n")
+
+    return sections
+
+
+def join_sections(sections: dict) -> str:
+    """Reassemble sections into a single markdown document."""
+    return "\n\n".join(sections.values()) + "\n"
+
+
+def _hash_file(path: Path) -> str:
+    """Return the SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_fingerprint_cache(cache_path: Path) -> dict:
+    try:
+        return json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def fingerprint_documents(roots: list = None, cache_path: Path = FINGERPRINT_CACHE) -> dict:
+    """
+    Hash the contents of every supported policy document.
+
+    Hashes are cached by file size and modification time, so only new or
+    modified documents are read.
+
+    Args:
+        roots: Document roots to scan (default: POLICY_DOCS_DIRS)
+        cache_path: JSON cache of hashes by path
+
+    Returns:
+        Mapping of document key (see document_key) to content hash
+    """
+    cache = _load_fingerprint_cache(cache_path)
+    entries = {}
+    fingerprints = {}
+    for path in build_catalog(roots):
+        stat = path.stat()
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        entry = cache.get(str(path))
+        if entry is None or entry["stamp"] != stamp:
+            entry = {"stamp": stamp, "sha256": _hash_file(path)}
+        entries[str(path)] = entry
+        fingerprints[document_key(path)] = entry["sha256"]
+
+    if entries != cache:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(entries), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    return fingerprints
+
+
+def diff_documents(previous: dict, current: dict) -> dict:
+    """Compare two document fingerprint maps."""
+    return {
+        "added": sorted(set(current) - set(previous)),
+        "removed": sorted(set(previous) - set(current)),
+        "modified": sorted(
+            doc for doc in set(current) & set(previous)
+            if current[doc] != previous[doc]
+        ),
+    }
+
+
+def diff_sections(previous: dict, current: dict) -> dict:
+    """Compare two section maps (key -> markdown) by content hash."""
+    prev_hashes = {k: _hash_text(v) for k, v in previous.items()}
+    curr_hashes = {k: _hash_text(v) for k, v in current.items()}
+    shared = set(prev_hashes) & set(curr_hashes)
+    return {
+        "added": [k for k in current if k not in prev_hashes],
+        "removed": [k for k in previous if k not in curr_hashes],
+        "changed": [k for k in current if k in shared and prev_hashes[k] != curr_hashes[k]],
+        "unchanged": [k for k in current if k in shared and prev_hashes[k] == curr_hashes[k]],
+    }
+
+
+def affected_sections(sections: dict, documents: list) -> list:
+    """
+    Find report sections that reference any of the given documents.
+
+    A section is affected when it mentions a document's file name or its
+    stem in human-readable form (e.g. "sample privacy policy").
+    """
+    needles = set()
+    for doc in documents:
+        path = Path(doc)
+        needles.add(path.name.lower())
+        needles.add(path.stem.lower())
+        needles.add(path.stem.replace("_", " ").replace("-", " ").lower())
+
+    affected = []
+    for key, text in sections.items():
+        text_lower = text.lower()
+        if any(needle in text_lower for needle in needles):
+            affected.append(key)
+    return affected
+
+
+def sections_to_regenerate(sections: dict, documents: list) -> list:
+    """
+    Choose the report sections to rewrite after the given documents changed.
+
+    Besides the sections that reference a changed document, summary and
+    score sections are always rewritten, since they aggregate over every
+    document without naming it. If a document is referenced nowhere (e.g.
+    it was just added), the finding and inventory sections are rewritten
+    so its findings get into the report. With no section matched at all,
+    every section is rewritten.
+    """
+    keys = [key for key in sections if key != PREAMBLE_KEY]
+    to_update = set(affected_sections(sections, documents))
+    to_update.update(key for key in keys if SUMMARY_SECTION_RE.search(key))
+    if any(not affected_sections(sections, [doc]) for doc in documents):
+        to_update.update(key for key in keys if INVENTORY_SECTION_RE.search(key))
+    return [key for key in sections if key in to_update] or keys
+
+
+class ReportStore:
+    """
+    Stores each run's report as a versioned set of sections.
+
+    Layout:
+        reports/<run_id>/manifest.json   run metadata, document and section hashes
+        reports/<run_id>/sections.json   section key -> markdown
+        reports/<run_id>/report.md       assembled report
+        reports/<run_id>/analysis.json   structured analysis result, if any
+    """
+
+    def __init__(self, root: Path = REPORTS_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def new_run_id() -> str:
+        """Generate a sortable run identifier."""
+        return datetime.now().strftime("%Y%m%dT%H%M%S%f")
+
+    def _runs(self) -> list:
+        return sorted(
+            p for p in self.root.iterdir()
+            if p.is_dir() and (p / "manifest.json").exists()
+        )
+
+    def latest(self, scope: dict = None) -> dict:
+        """
+        Load the most recent stored report, optionally matching a run scope.
+
+        Args:
+            scope: Run parameters (report type, focus, areas) that must match
+
+        Returns:
+            Dict with "manifest", "sections" and "analysis" (raw dict or None),
+            or None if no run matches
+        """
+        for run_dir in reversed(self._runs()):
+            manifest = json.loads((run_dir / "manifest.json").read_text(encoding="utf-8"))
+            if scope is not None and manifest.get("scope") != scope:
+                continue
+            sections = json.loads((run_dir / "sections.json").read_text(encoding="utf-8"))
+            analysis_path = run_dir / "analysis.json"
+            analysis = (
+                json.loads(analysis_path.read_text(encoding="utf-8"))
+                if analysis_path.exists() else None
+            )
+            return {"manifest": manifest, "sections": sections, "analysis": analysis}
+        return None
+
+    def save(self, run_id: str, sections: dict, documents: dict, scope: dict,
+             parent: str = None, regenerated: list = None, analysis: dict = None,
+             complete: bool = True) -> Path:
+        """
+        Persist a report version.
+
+        Args:
+            run_id: Identifier for this run
+            sections: Section key -> markdown
+            documents: Document fingerprints the report was built from
+            scope: Run parameters (report type, focus, areas)
+            parent: Run ID this version was derived from, if incremental
+            regenerated: Section keys produced by the report agent in this run
+            analysis: Structured analysis result as a JSON-serializable dict
+            complete: False if the run did not cover every document in its scope
+
+        Returns:
+            Path to the run directory
+        """
+        run_dir = self.root / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest = {
+            "run_id": run_id,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "parent": parent,
+            "scope": scope,
+            "documents": documents,
+            "sections": {k: _hash_text(v) for k, v in sections.items()},
+            "regenerated": regenerated if regenerated is not None else list(sections),
+            "complete": complete,
+        }
+
+        (run_dir / "sections.json").write_text(
+            json.dumps(sections, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+        (run_dir / "report.md").write_text(join_sections(sections), encoding="utf-8")
+        if analysis is not None:
+            (run_dir / "analysis.json").write_text(
+                json.dumps(analysis, indent=2, ensure_ascii=False), encoding="utf-8"
+            )
+        (run_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        return run_dir
+
+
+def build_report_diff(previous: dict, run_id: str, documents: dict, sections: dict,
+                      regenerated: list) -> dict:
+    """
+    Build a machine-readable diff between a previous stored run and this one.
+
+    Args:
+        previous: Result of ReportStore.latest(), or None for a first run
+        run_id: Identifier for this run
+        documents: Current document fingerprints
+        sections: Current section key -> markdown
+        regenerated: Section keys produced by the report agent in this run
+    """
+    prev_manifest = previous["manifest"] if previous else {}
+    prev_sections = previous["sections"] if previous else {}
+    return {
+        "run_id": run_id,
+        "previous_run_id": prev_manifest.get("run_id"),
+        "documents": diff_documents(prev_manifest.get("documents", {}), documents),
+        "sections": diff_sections(prev_sections, sections),
+        "regenerated": regenerated,
+    }
@@ -0,0 +1,433 @@
+"""Memory-mapped store of extracted document text shared across processes."""
+
+import json
+import mmap
+import os
+import re
+import uuid
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import TEXT_STORE_DIR, TEXT_STORE_MAX_SEGMENTS
+
+
+HEADING_RE = re.compile(rb"^\s*(#{1,6}\s+\S.*|\d+(\.\d+)*\.?\s+[A-Z][^.\n]{0,80})\s*$")
+
+
+@contextmanager
+def _exclusive_lock(path: Path):
+    """Hold an exclusive advisory lock on a file (no-op where unsupported)."""
+    with open(path, "a+b") as handle:
+        try:
+            import fcntl
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        yield
+
+
+class _Segment:
+    """One memory-mapped text file plus its line start offsets."""
+
+    def __init__(self, text_path: Path, lines_path: Path):
+        self._text_file = open(text_path, "rb")
+        size = os.fstat(self._text_file.fileno()).st_size
+        self.text = mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._lines_file = open(lines_path, "rb")
+        lines_size = os.fstat(self._lines_file.fileno()).st_size
+        self._lines_map = (
+            mmap.mmap(self._lines_file.fileno(), 0, access=mmap.ACCESS_READ) if lines_size else None
+        )
+        self.lines = memoryview(self._lines_map).cast("Q") if self._lines_map else memoryview(array("Q"))
+
+    def close(self):
+        self.lines.release()
+        if self._lines_map:
+            self._lines_map.close()
+        if isinstance(self.text, mmap.mmap):
+            self.text.close()
+        self._text_file.close()
+        self._lines_file.close()
+
+
+class _SegmentWriter:
+    """Writes documents to a segment file one at a time."""
+
+    def __init__(self, text_path: Path, lines_path: Path):
+        self.text_path = text_path
+        self.lines_path = lines_path
+        self._out = open(text_path, "wb")
+        self._offsets = array("Q")
+        self._position = 0
+        self.entries: Dict[str, dict] = {}
+
+    def add(self, path: str, data: bytes, stamp: list) -> None:
+        """Append a document's UTF-8 text and record its index entry (minus the segment)."""
+        first_line = len(self._offsets)
+        sections = []
+        line_start = 0
+        while True:
+            self._offsets.append(self._position + line_start)
+            line_end = data.find(b"\n", line_start)
+            line = data[line_start:] if line_end == -1 else data[line_start:line_end]
+            if HEADING_RE.match(line):
+                heading = line.decode("utf-8", "replace").strip().lstrip("#").strip()
+                sections.append([heading, len(self._offsets) - 1 - first_line])
+            if line_end == -1:
+                break
+            line_start = line_end + 1
+        self._out.write(data)
+        self._out.flush()
+        self.entries[path] = {
+            "start": self._position,
+            "end": self._position + len(data),
+            "first_line": first_line,
+            "line_count": len(self._offsets) - first_line,
+            "sections": sections,
+            "stamp": stamp,
+        }
+        self._position += len(data)
+
+    def finish(self) -> None:
+        """Close the text file and write the line offset table."""
+        self._out.close()
+        with open(self.lines_path, "wb") as out:
+            self._offsets.tofile(out)
+
+    def discard(self) -> None:
+        """Close and delete the partly written files."""
+        self._out.close()
+        for path in (self.text_path, self.lines_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class TextStore:
+    """
+    Append-only, memory-mapped store of extracted document text.
+
+    Text is kept as UTF-8 in segment files, each with a table of line start
+    offsets; an index maps every document to its segment, byte range, line
+    range and section headings. Readers mmap the segments, so every process
+    using the same store shares one physical copy of the corpus through the
+    page cache, and search and snippet extraction work on slices of the map
+    instead of per-process string copies.
+
+    Documents that fail to extract are recorded in the index with the error
+    and the file's size and mtime, and are not retried until the file
+    changes.
+
+    Changed documents are appended to a new segment; their old bytes stay
+    in place until the store is compacted. Once there are more than
+    max_segments segments, the live documents are rewritten into a single
+    new segment and the old segment files are deleted. Segment names are
+    never reused, so processes still mapping an old segment keep reading
+    valid bytes, and a reader whose segment file is gone reloads the index.
+
+    Layout:
+        <store>/index.json          document -> segment, offsets, sections;
+                                    failed document -> stamp, error
+        <store>/seg-NNNNN.txt       concatenated UTF-8 text
+        <store>/seg-NNNNN.lines     uint64 line start offsets into the segment
+    """
+
+    def __init__(self, store_dir: Path = TEXT_STORE_DIR, max_segments: int = TEXT_STORE_MAX_SEGMENTS):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segments = max_segments
+        self._segments: Dict[str, _Segment] = {}
+        self._index = {"segments": [], "documents": {}, "failures": {}}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        index_path = self.store_dir / "index.json"
+        if index_path.exists():
+            self._index = json.loads(index_path.read_text(encoding="utf-8"))
+            self._index.setdefault("failures", {})
+
+    def close(self) -> None:
+        """Unmap all segments."""
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _segment(self, name: str) -> _Segment:
+        if name not in self._segments:
+            self._segments[name] = _Segment(
+                self.store_dir / f"{name}.txt", self.store_dir / f"{name}.lines"
+            )
+        return self._segments[name]
+
+    @staticmethod
+    def _stamp(path: Path) -> list:
+        stat = path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_current(self, path: Path) -> bool:
+        """True if the document is stored and unchanged since extraction."""
+        entry = self._index["documents"].get(str(path))
+        return entry is not None and entry["stamp"] == self._stamp(path)
+
+    def failure(self, path: Path) -> Optional[str]:
+        """Recorded extraction error of a document unchanged since it failed, if any."""
+        failure = self._index["failures"].get(str(path))
+        if failure is not None and failure["stamp"] == self._stamp(path):
+            return failure["error"]
+        return None
+
+    def ensure(self, paths: Iterable[Path]) -> Dict[str, str]:
+        """
+        Make sure the given documents are in the store and up to date.
+
+        Missing or modified documents are extracted (in the isolated
+        extraction pool) and each one is written to a new segment file as
+        soon as its extraction finishes, so only the documents in flight are
+        held in memory. Extraction runs without holding the store lock,
+        which is only taken to publish the finished segment, so other
+        processes are never blocked by a slow (e.g. OCR) extraction. Two
+        processes may occasionally extract the same document; only the
+        first one to publish it is kept.
+
+        Documents that failed to extract before and have not changed since
+        are not extracted again; their recorded error is returned.
+
+        Returns:
+            Mapping of path to error message for documents that failed to extract
+        """
+        paths = [Path(p) for p in paths]
+        if all(self.is_current(p) for p in paths):
+            return {}
+
+        # Another process may have added them since the index was loaded
+        self._load_index()
+        errors = {}
+        stale = []
+        for p in paths:
+            if self.is_current(p):
+                continue
+            error = self.failure(p)
+            if error is not None:
+                errors[str(p)] = error
+            else:
+                stale.append(p)
+        if not stale:
+            return errors
+
+        from src.tools.extractors import get_extraction_pool
+
+        # Stamp before extracting, so a file modified meanwhile is seen as stale next time
+        stamps = {str(p): self._stamp(p) for p in stale}
+        pending = f"pending-{os.getpid()}-{uuid.uuid4().hex}"
+        writer = _SegmentWriter(
+            self.store_dir / f"{pending}.txt", self.store_dir / f"{pending}.lines"
+        )
+        try:
+            for result in get_extraction_pool().iter_extract(stale):
+                if result.ok:
+                    writer.add(result.path, result.text.encode("utf-8"), stamps[result.path])
+                else:
+                    errors[result.path] = result.error
+            writer.finish()
+        except BaseException:
+            writer.discard()
+            raise
+
+        with _exclusive_lock(self.store_dir / ".lock"):
+            self._load_index()
+            entries = {
+                path: entry for path, entry in writer.entries.items()
+                if not self.is_current(Path(path))
+            }
+            if entries:
+                name = self._next_segment_name()
+                os.replace(writer.text_path, self.store_dir / f"{name}.txt")
+                os.replace(writer.lines_path, self.store_dir / f"{name}.lines")
+                for entry in entries.values():
+                    entry["segment"] = name
+                self._index["segments"].append(name)
+                self._index["documents"].update(entries)
+            else:
+                writer.discard()
+            for path in writer.entries:
+                self._index["failures"].pop(path, None)
+            for path, error in errors.items():
+                if path in stamps:
+                    self._index["failures"][path] = {"stamp": stamps[path], "error": error}
+            self._save_index()
+            if len(self._index["segments"]) > self.max_segments:
+                self._compact()
+        return errors
+
+    def _next_segment_name(self) -> str:
+        # Caller holds the store lock
+        number = self._index.get("next_segment", len(self._index["segments"]))
+        self._index["next_segment"] = number + 1
+        return f"seg-{number:05d}"
+
+    def _write_segment(self, documents: Iterable[Tuple[str, bytes, list]]) -> Tuple[str, dict]:
+        """
+        Write documents to a new segment file and its line offset table.
+
+        Args:
+            documents: (path, UTF-8 text, stamp) tuples, consumed one at a time
+
+        Returns:
+            Tuple of (segment name, path -> index entry)
+        """
+        name = self._next_segment_name()
+        writer = _SegmentWriter(self.store_dir / f"{name}.txt", self.store_dir / f"{name}.lines")
+        for path, data, stamp in documents:
+            writer.add(path, data, stamp)
+        writer.finish()
+        for entry in writer.entries.values():
+            entry["segment"] = name
+        return name, writer.entries
+
+    def _save_index(self) -> None:
+        tmp_path = self.store_dir / "index.json.tmp"
+        tmp_path.write_text(json.dumps(self._index), encoding="utf-8")
+        os.replace(tmp_path, self.store_dir / "index.json")
+
+    def compact(self) -> None:
+        """Rewrite the live documents into one segment and delete the old segments."""
+        with _exclusive_lock(self.store_dir / ".lock"):
+            self._load_index()
+            self._compact()
+
+    def _compact(self) -> None:
+        # Caller holds the store lock and has just reloaded the index
+        old_segments = list(self._index["segments"])
+        live = {
+            path: entry for path, entry in self._index["documents"].items()
+            if Path(path).exists()
+        }
+
+        def documents():
+            for path, entry in live.items():
+                segment = self._segment(entry["segment"])
+                yield path, bytes(segment.text[entry["start"]:entry["end"]]), entry["stamp"]
+
+        name, entries = self._write_segment(documents())
+        self._index["segments"] = [name]
+        self._index["documents"] = entries
+        self._index["failures"] = {
+            path: failure for path, failure in self._index["failures"].items()
+            if Path(path).exists()
+        }
+        self._save_index()
+
+        for old in old_segments:
+            segment = self._segments.pop(old, None)
+            if segment is not None:
+                try:
+                    segment.close()
+                except BufferError:
+                    # A view is still exported; the map is released with it
+                    pass
+            for suffix in (".txt", ".lines"):
+                try:
+                    os.remove(self.store_dir / f"{old}{suffix}")
+                except OSError:
+                    # Still mapped on platforms that forbid deleting open files
+                    pass
+
+    def _entry(self, path) -> dict:
+        entry = self._index["documents"].get(str(path))
+        if entry is None:
+            self._load_index()
+            entry = self._index["documents"].get(str(path))
+        if entry is None:
+            raise KeyError(f"{path} is not in the text store")
+        return entry
+
+    def __contains__(self, path) -> bool:
+        return str(path) in self._index["documents"]
+
+    def _locate(self, path) -> tuple:
+        """Index entry and mapped segment of a document."""
+        entry = self._entry(path)
+        try:
+            return entry, self._segment(entry["segment"])
+        except FileNotFoundError:
+            # The segment was compacted away by another process
+            self._load_index()
+            entry = self._entry(path)
+            return entry, self._segment(entry["segment"])
+
+    def view(self, path) -> memoryview:
+        """Zero-copy view of a document's UTF-8 bytes."""
+        entry, segment = self._locate(path)
+        return memoryview(segment.text)[entry["start"]:entry["end"]]
+
+    def text(self, path) -> str:
+        """Decoded text of a document."""
+        with self.view(path) as data:
+            return str(data, "utf-8")
+
+    def sections(self, path) -> List[tuple]:
+        """(heading, line number) pairs for a document."""
+        return [tuple(s) for s in self._entry(path)["sections"]]
+
+    def snippet(self, path, first_line: int, last_line: int) -> str:
+        """Decode lines [first_line, last_line) of a document."""
+        entry, segment = self._locate(path)
+        first_line = max(0, first_line)
+        last_line = min(entry["line_count"], last_line)
+        start = segment.lines[entry["first_line"] + first_line]
+        end = (
+            segment.lines[entry["first_line"] + last_line]
+            if last_line < entry["line_count"] else entry["end"]
+        )
+        return segment.text[start:end].decode("utf-8", "replace").rstrip("\n")
+
+    def search(self, path, query: str, context_lines: int = 2, max_matches: int = 5) -> List[str]:
+        """
+        Find lines containing query (case-insensitive) and return snippets.
+
+        The pattern is matched directly against the memory-mapped bytes of
+        the document; only the returned snippets are decoded. Case folding
+        applies to ASCII characters.
+
+        Returns:
+            Up to max_matches snippets with context_lines of context each side
+        """
+        entry, segment = self._locate(path)
+        if entry["start"] == entry["end"]:
+            return []
+        pattern = re.compile(re.escape(query.encode("utf-8")), re.IGNORECASE)
+        lo = entry["first_line"]
+        hi = lo + entry["line_count"]
+
+        snippets = []
+        last_line = -1
+        for match in pattern.finditer(segment.text, entry["start"], entry["end"]):
+            line = bisect_right(segment.lines, match.start(), lo, hi) - 1 - lo
+            if line == last_line:
+                continue
+            last_line = line
+            snippets.append(self.snippet(path, line - context_lines, line + context_lines + 1))
+            if len(snippets) >= max_matches:
+                break
+        return snippets
+
+
+_store: Optional[TextStore] = None
+
+
+def get_text_store() -> TextStore:
+    """Return the process-wide text store."""
+    global _store
+    if _store is None:
+        _store = TextStore()
+    return _store
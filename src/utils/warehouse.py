@@ -0,0 +1,344 @@
+"""SQLite findings warehouse for cross-run compliance analytics."""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from src.config.settings import FINDINGS_DB, REPORTS_DIR
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    run_date TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    report_type TEXT,
+    document_focus TEXT,
+    focus_areas TEXT,
+    scope_key TEXT,
+    complete INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS findings (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    run_date TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    key TEXT NOT NULL,
+    document TEXT NOT NULL,
+    regulation TEXT NOT NULL,
+    finding_type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    recommendation TEXT,
+    citations TEXT,
+    PRIMARY KEY (run_id, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_findings_run_date ON findings(run_date);
+CREATE INDEX IF NOT EXISTS idx_findings_document ON findings(document, run_date);
+CREATE INDEX IF NOT EXISTS idx_findings_regulation ON findings(regulation, run_date);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity, run_date);
+CREATE INDEX IF NOT EXISTS idx_findings_key ON findings(key, created_at);
+"""
+
+
+def scope_key(scope: Optional[dict]) -> str:
+    """Stable identifier of a run scope (report type, focus, areas)."""
+    scope = scope or {}
+    normalized = json.dumps([
+        scope.get("report_type"),
+        scope.get("document_focus"),
+        sorted(scope.get("focus_areas") or []),
+    ])
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class FindingsWarehouse:
+    """
+    Local SQLite store of findings from every analysis run.
+
+    One row per (run, finding) in the findings table, denormalized with the
+    run date so that trend queries need no joins. Findings are matched across
+    runs by their stable key (see Finding.key).
+
+    Queries only compare runs with the same scope (report type, focus and
+    areas), since a narrower run simply does not look for the other
+    findings. Runs marked incomplete (budget-limited, failed shards or
+    documents, or no structured analysis) count as evidence that a finding
+    exists, but never as evidence that it was resolved.
+    """
+
+    def __init__(self, db_path: Path = FINDINGS_DB, read_only: bool = False):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        if read_only:
+            # Enforced by SQLite for every statement, including CTEs and PRAGMAs
+            self.conn.execute("PRAGMA query_only = ON")
+
+    def _migrate(self) -> None:
+        """Add the scope and completeness columns to older databases."""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        with self.conn:
+            if "scope_key" not in columns:
+                self.conn.execute("ALTER TABLE runs ADD COLUMN scope_key TEXT")
+                for row in self.conn.execute("SELECT * FROM runs").fetchall():
+                    scope = {
+                        "report_type": row["report_type"],
+                        "document_focus": row["document_focus"],
+                        "focus_areas": json.loads(row["focus_areas"] or "null"),
+                    }
+                    self.conn.execute(
+                        "UPDATE runs SET scope_key = ? WHERE run_id = ?",
+                        (scope_key(scope), row["run_id"]),
+                    )
+            if "complete" not in columns:
+                self.conn.execute("ALTER TABLE runs ADD COLUMN complete INTEGER NOT NULL DEFAULT 1")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_runs_scope ON runs(scope_key, complete, created_at)"
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, run_id: str, scope: dict, findings: List[dict],
+                   created_at: datetime = None, complete: bool = True) -> int:
+        """
+        Store (or replace) a run and its findings.
+
+        Args:
+            run_id: Identifier for the run
+            scope: Run parameters (report type, focus, areas)
+            findings: Records as produced by src.utils.findings.finding_record
+            created_at: When the run happened (default: now)
+            complete: False if the run did not cover every document in its scope
+
+        Returns:
+            Number of findings stored
+        """
+        created_at = created_at or datetime.now()
+        created = created_at.isoformat(timespec="seconds")
+        run_date = created_at.date().isoformat()
+        scope = scope or {}
+
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    run_date,
+                    created,
+                    scope.get("report_type"),
+                    scope.get("document_focus"),
+                    json.dumps(scope.get("focus_areas")),
+                    scope_key(scope),
+                    int(complete),
+                ),
+            )
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO findings VALUES
+                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        run_id,
+                        run_date,
+                        created,
+                        f["key"],
+                        f["document"],
+                        f["regulation"],
+                        f["finding_type"],
+                        f["severity"],
+                        f["title"],
+                        f.get("description"),
+                        f.get("recommendation"),
+                        json.dumps(f.get("citations", [])),
+                    )
+                    for f in findings
+                ],
+            )
+        return len(findings)
+
+    def backfill(self, reports_dir: Path = REPORTS_DIR) -> int:
+        """
+        Import runs stored by ReportStore that are not yet in the warehouse.
+
+        Returns:
+            Number of runs imported
+        """
+        from src.tasks.schemas import AnalysisResult
+        from src.utils.findings import finding_record
+
+        known = {row["run_id"] for row in self.conn.execute("SELECT run_id FROM runs")}
+        imported = 0
+        for run_dir in sorted(Path(reports_dir).glob("*/manifest.json")):
+            manifest = json.loads(run_dir.read_text(encoding="utf-8"))
+            analysis_path = run_dir.parent / "analysis.json"
+            if manifest["run_id"] in known or not analysis_path.exists():
+                continue
+            analysis = AnalysisResult.model_validate_json(analysis_path.read_text(encoding="utf-8"))
+            self.record_run(
+                manifest["run_id"],
+                manifest.get("scope"),
+                [finding_record(f, manifest["run_id"]) for f in analysis.findings],
+                created_at=datetime.fromisoformat(manifest["created_at"]),
+                complete=manifest.get("complete", True),
+            )
+            imported += 1
+        return imported
+
+    def query(self, sql: str, params: tuple = ()) -> List[dict]:
+        """Run an arbitrary read query and return rows as dicts."""
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _scope(self, scope: Optional[dict]) -> Optional[str]:
+        """Scope key to query: the given scope's, or that of the latest complete run."""
+        if scope is not None:
+            return scope_key(scope)
+        latest = self.query(
+            "SELECT scope_key FROM runs WHERE complete = 1 ORDER BY created_at DESC LIMIT 1"
+        )
+        return latest[0]["scope_key"] if latest else None
+
+    def _latest_run(self, scope: Optional[dict]) -> Optional[str]:
+        """ID of the latest complete run in a scope."""
+        latest = self.query(
+            """
+            SELECT run_id FROM runs WHERE scope_key = ? AND complete = 1
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (self._scope(scope),),
+        )
+        return latest[0]["run_id"] if latest else None
+
+    def open_findings(self, scope: Optional[dict] = None, limit: Optional[int] = 200) -> List[dict]:
+        """
+        Findings of the latest complete run in scope, most severe first.
+
+        Used to show the next analysis what is still open, so it can record
+        persisting findings under the same key. A limit of None returns all.
+        """
+        run_id = self._latest_run(scope)
+        if run_id is None:
+            return []
+        return self.query(
+            """
+            SELECT key, document, regulation, finding_type, severity, title
+            FROM findings WHERE run_id = ?
+            ORDER BY CASE severity WHEN 'critical' THEN 0 WHEN 'high' THEN 1
+                                   WHEN 'medium' THEN 2 ELSE 3 END, document, title
+            LIMIT ?
+            """,
+            (run_id, -1 if limit is None else limit),
+        )
+
+    def gap_trend(self, regulation: Optional[str] = None, finding_type: str = "gap",
+                  scope: Optional[dict] = None) -> List[dict]:
+        """
+        Count findings of a type per regulation per run date.
+
+        Only complete runs in the scope (default: that of the latest
+        complete run) are counted.
+        """
+        sql = """
+            SELECT run_date, regulation, COUNT(*) AS count
+            FROM findings
+            WHERE finding_type = ?
+              AND run_id IN (SELECT run_id FROM runs WHERE scope_key = ? AND complete = 1)
+        """
+        params = [finding_type, self._scope(scope)]
+        if regulation:
+            sql += " AND regulation = ?"
+            params.append(regulation)
+        sql += " GROUP BY run_date, regulation ORDER BY run_date, regulation"
+        return self.query(sql, tuple(params))
+
+    def severity_counts(self, run_id: Optional[str] = None, scope: Optional[dict] = None) -> List[dict]:
+        """Count findings per severity for one run (default: the latest complete run in scope)."""
+        run_id = run_id or self._latest_run(scope)
+        if run_id is None:
+            return []
+        return self.query(
+            """
+            SELECT severity, COUNT(*) AS count
+            FROM findings WHERE run_id = ?
+            GROUP BY severity ORDER BY count DESC
+            """,
+            (run_id,),
+        )
+
+    def document_counts(self, severity: Optional[str] = None, scope: Optional[dict] = None) -> List[dict]:
+        """Count open findings per document in the latest complete run in scope."""
+        run_id = self._latest_run(scope)
+        if run_id is None:
+            return []
+        sql = """
+            SELECT document, COUNT(*) AS count
+            FROM findings
+            WHERE run_id = ?
+        """
+        params = [run_id]
+        if severity:
+            sql += " AND severity = ?"
+            params.append(severity)
+        sql += " GROUP BY document ORDER BY count DESC"
+        return self.query(sql, tuple(params))
+
+    def remediation_times(self, regulation: Optional[str] = None,
+                          scope: Optional[dict] = None) -> List[dict]:
+        """
+        Time from first detection to resolution for each resolved finding.
+
+        A finding counts as resolved at the first complete run in the same
+        scope after its last appearance. Findings that are still present are
+        not included.
+        """
+        sql = """
+            WITH scoped AS (
+                SELECT run_id, created_at, complete FROM runs WHERE scope_key = ?
+            ),
+            spans AS (
+                SELECT key, document, regulation, severity, title,
+                       MIN(created_at) AS first_seen, MAX(created_at) AS last_seen
+                FROM findings
+                WHERE run_id IN (SELECT run_id FROM scoped)
+                {where}
+                GROUP BY key
+            )
+            SELECT spans.*,
+                   (SELECT MIN(created_at) FROM scoped
+                    WHERE complete = 1 AND created_at > spans.last_seen) AS resolved_at
+            FROM spans
+        """
+        params = [self._scope(scope)]
+        where = ""
+        if regulation:
+            where = "AND regulation = ?"
+            params.append(regulation)
+        rows = []
+        for row in self.query(sql.format(where=where), tuple(params)):
+            if row["resolved_at"] is None:
+                continue
+            first = datetime.fromisoformat(row["first_seen"])
+            resolved = datetime.fromisoformat(row["resolved_at"])
+            row["days_to_remediate"] = round((resolved - first).total_seconds() / 86400, 2)
+            rows.append(row)
+        return sorted(rows, key=lambda r: r["resolved_at"])
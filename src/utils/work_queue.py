@@ -0,0 +1,287 @@
+"""SQLite-backed work queue with leases for sharded corpus processing."""
+
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from src.config.settings import (
+    SHARD_LEASE_SECONDS,
+    SHARD_MAX_ATTEMPTS,
+    WORK_QUEUE_DB,
+    WORK_QUEUE_SHARED,
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    params TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS shards (
+    shard_id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    position INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_shards_claim ON shards(job_id, status, lease_expires);
+"""
+
+
+class WorkQueue:
+    """
+    A work queue stored in a single SQLite file shared by all workers.
+
+    Shards move through pending -> claimed -> done, or failed once they have
+    been attempted max_attempts times. A claimed shard holds a lease; the
+    owning worker must renew it (heartbeat) while it works. If the worker
+    dies, the lease expires and another worker can claim the shard again.
+
+    All state changes run in IMMEDIATE transactions, so any number of
+    processes can share the file safely. On a single host the file uses WAL
+    mode. WAL relies on shared memory between the processes and breaks when
+    the file is shared between hosts, so with shared=True (WORK_QUEUE_SHARED)
+    the rollback journal is used instead; every process opening the file
+    must then use shared=True. Multiple nodes additionally need a network
+    filesystem with working POSIX byte-range locks (e.g. NFSv4 with locking
+    enabled); SQLite locking is unreliable on mounts without them.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = WORK_QUEUE_DB,
+        lease_seconds: float = SHARD_LEASE_SECONDS,
+        max_attempts: int = SHARD_MAX_ATTEMPTS,
+        shared: bool = WORK_QUEUE_SHARED,
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        # The journal mode is stored in the file, so this also converts a
+        # queue created in the other mode
+        self.conn.execute(f"PRAGMA journal_mode = {'DELETE' if shared else 'WAL'}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def submit(self, shards: List[dict], params: dict = None) -> str:
+        """
+        Create a job from a list of shard payloads.
+
+        Args:
+            shards: JSON-serializable payload for each shard
+            params: Job-level parameters (e.g. focus areas, report type)
+
+        Returns:
+            The new job ID
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        conn = self._transaction()
+        try:
+            conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?)",
+                (job_id, now, json.dumps(params or {})),
+            )
+            conn.executemany(
+                """
+                INSERT INTO shards (shard_id, job_id, position, payload, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (f"{job_id}-{i:05d}", job_id, i, json.dumps(payload), now)
+                    for i, payload in enumerate(shards)
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def job_params(self, job_id: str) -> dict:
+        """Return the parameters a job was submitted with."""
+        row = self.conn.execute("SELECT params FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown job {job_id}")
+        return json.loads(row["params"])
+
+    def latest_job(self) -> Optional[str]:
+        """Return the most recently submitted job ID."""
+        row = self.conn.execute(
+            "SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT 1"
+        ).fetchone()
+        return row["job_id"] if row else None
+
+    def claim(self, worker_id: str, job_id: str = None) -> Optional[dict]:
+        """
+        Claim the next available shard.
+
+        A shard is available if it is pending, or claimed with an expired
+        lease and attempts remaining.
+
+        Returns:
+            Dict with shard_id, job_id, attempts and payload, or None
+        """
+        now = time.time()
+        conn = self._transaction()
+        try:
+            sql = """
+                SELECT shard_id, job_id, attempts, payload FROM shards
+                WHERE (status = 'pending'
+                       OR (status = 'claimed' AND lease_expires < ?))
+                  AND attempts < ?
+            """
+            params = [now, self.max_attempts]
+            if job_id:
+                sql += " AND job_id = ?"
+                params.append(job_id)
+            sql += " ORDER BY job_id, position LIMIT 1"
+            row = conn.execute(sql, params).fetchone()
+            if row is None:
+                # Expired shards with no attempts left are failed for good
+                conn.execute(
+                    """
+                    UPDATE shards SET status = 'failed', worker = NULL,
+                        error = COALESCE(error, 'lease expired'), updated_at = ?
+                    WHERE status = 'claimed' AND lease_expires < ? AND attempts >= ?
+                    """,
+                    (now, now, self.max_attempts),
+                )
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                """
+                UPDATE shards SET status = 'claimed', worker = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE shard_id = ?
+                """,
+                (worker_id, now + self.lease_seconds, now, row["shard_id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return {
+            "shard_id": row["shard_id"],
+            "job_id": row["job_id"],
+            "attempts": row["attempts"] + 1,
+            "payload": json.loads(row["payload"]),
+        }
+
+    def _update_owned(self, sql: str, params: tuple) -> bool:
+        conn = self._transaction()
+        try:
+            updated = conn.execute(sql, params).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return updated == 1
+
+    def heartbeat(self, shard_id: str, worker_id: str) -> bool:
+        """
+        Renew the lease on a claimed shard.
+
+        Returns:
+            False if the worker no longer owns the shard
+        """
+        now = time.time()
+        return self._update_owned(
+            """
+            UPDATE shards SET lease_expires = ?, updated_at = ?
+            WHERE shard_id = ? AND worker = ? AND status = 'claimed'
+            """,
+            (now + self.lease_seconds, now, shard_id, worker_id),
+        )
+
+    def complete(self, shard_id: str, worker_id: str, result: dict) -> bool:
+        """
+        Mark a shard as done and store its result.
+
+        Returns:
+            False if the worker lost its lease (the result is discarded)
+        """
+        return self._update_owned(
+            """
+            UPDATE shards SET status = 'done', result = ?, error = NULL,
+                lease_expires = NULL, updated_at = ?
+            WHERE shard_id = ? AND worker = ? AND status = 'claimed'
+            """,
+            (json.dumps(result), time.time(), shard_id, worker_id),
+        )
+
+    def fail(self, shard_id: str, worker_id: str, error: str) -> bool:
+        """
+        Release a shard after an error so it can be retried.
+
+        The shard is failed for good once it has used all its attempts.
+        """
+        return self._update_owned(
+            """
+            UPDATE shards SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                worker = NULL, lease_expires = NULL, error = ?, updated_at = ?
+            WHERE shard_id = ? AND worker = ? AND status = 'claimed'
+            """,
+            (self.max_attempts, error, time.time(), shard_id, worker_id),
+        )
+
+    def status(self, job_id: str) -> dict:
+        """Count shards by status for a job."""
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0}
+        for row in self.conn.execute(
+            "SELECT status, COUNT(*) AS n FROM shards WHERE job_id = ? GROUP BY status",
+            (job_id,),
+        ):
+            counts[row["status"]] = row["n"]
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def is_finished(self, job_id: str) -> bool:
+        """True when every shard of the job is done or failed."""
+        counts = self.status(job_id)
+        return counts["pending"] == 0 and counts["claimed"] == 0
+
+    def shards(self, job_id: str) -> List[dict]:
+        """Return all shards of a job with their payloads, results and errors."""
+        rows = self.conn.execute(
+            "SELECT * FROM shards WHERE job_id = ? ORDER BY position", (job_id,)
+        )
+        return [
+            {
+                **dict(row),
+                "payload": json.loads(row["payload"]),
+                "result": json.loads(row["result"]) if row["result"] else None,
+            }
+            for row in rows
+        ]
@@ -0,0 +1,6 @@
+"""Make the src package importable when running pytest from the repository root."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,92 @@
+"""Tests of task output compaction."""
+
+import json
+
+from src.utils.compaction import ContextCompactor, compact_analysis_json, deduplicate_lines
+from src.utils.tokens import count_tokens
+
+
+def _analysis(count: int) -> dict:
+    return {
+        "summary": "Overall posture is weak in several areas.",
+        "regulations": ["GDPR", "SOX"],
+        "findings": [
+            {
+                "document": f"policy_{i}.md",
+                "regulation": "GDPR",
+                "finding_type": "gap",
+                "title": f"Retention period missing for record class {i}",
+                "description": "The policy does not state how long records are kept. "
+                               "Storage limitation requires a defined retention period.",
+                "severity": ["low", "medium", "high", "critical"][i % 4],
+                "recommendation": "Define retention periods per record class. Review yearly.",
+                "citations": [
+                    {"document": f"policy_{i}.md", "section": "4.2 Retention",
+                     "excerpt": "Records are kept as long as needed."}
+                ],
+            }
+            for i in range(count)
+        ],
+        "risk_ratings": [{"area": "GDPR", "rating": "high", "rationale": "Several gaps remain open."}],
+    }
+
+
+def test_deduplicate_keeps_repeated_fields_of_other_documents():
+    """Short field lines repeated for each document are not duplicates."""
+    text = "\n".join([
+        "## privacy_policy.md",
+        "- Version: 1.0",
+        "- Review: Annually",
+        "- Regulations: GDPR",
+        "## retention_policy.md",
+        "- Version: 1.0",
+        "- Review: Annually",
+        "- Regulations: GDPR",
+    ])
+
+    deduplicated, removed = deduplicate_lines(text)
+
+    assert removed == 0
+    assert deduplicated == text
+
+
+def test_deduplicate_removes_repeated_sentences_within_a_section():
+    sentence = "- Personal data must be deleted when it is no longer needed for its purpose."
+    text = "\n".join(["## privacy_policy.md", sentence, "- Version: 1.0", sentence])
+
+    deduplicated, removed = deduplicate_lines(text)
+
+    assert removed == 1
+    assert deduplicated.count(sentence) == 1
+
+
+def test_fenced_analysis_json_stays_valid_json():
+    """Fenced JSON is parsed as JSON, never deduplicated line by line."""
+    analysis = _analysis(30)
+    raw = "```json\n" + json.dumps(analysis, indent=2) + "\n```"
+
+    compacted = ContextCompactor().compact("analysis", raw, budget=100_000)
+
+    data = json.loads(compacted)
+    assert len(data["findings"]) == 30
+    assert all(f["regulation"] == "GDPR" and f["severity"] for f in data["findings"])
+
+
+def test_non_analysis_json_is_passed_on_whole():
+    raw = "```json\n" + json.dumps({"documents": [{"version": "1.0"}, {"version": "1.0"}]}, indent=2) + "\n```"
+
+    compacted = ContextCompactor().compact("ingestion", raw, budget=10)
+
+    assert json.loads(compacted) == {"documents": [{"version": "1.0"}, {"version": "1.0"}]}
+
+
+def test_analysis_json_is_fitted_into_the_budget():
+    """Findings are collapsed, then dropped lowest severity first, to meet the budget."""
+    compacted, _, changed = compact_analysis_json(json.dumps(_analysis(60)), budget=1000)
+
+    data = json.loads(compacted)
+    assert count_tokens(compacted) <= 1000
+    assert changed > 0
+    assert "omitted to fit the context budget" in data["summary"]
+    severities = {f["severity"] for f in data["findings"]}
+    assert "critical" in severities and "low" not in severities
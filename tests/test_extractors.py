@@ -0,0 +1,35 @@
+"""Tests of pluggable, process-isolated text extraction."""
+
+from pathlib import Path
+
+from src.tools.document_tools import DocumentReaderTool
+from src.tools.extractors import ExtractionPool, register_extractor
+from src.utils.catalog import build_catalog
+
+
+@register_extractor(".rot13")
+def extract_rot13(path: Path) -> str:
+    """Test format: ROT13-encoded text."""
+    import codecs
+
+    return codecs.decode(path.read_text(encoding="utf-8"), "rot13")
+
+
+def test_registered_extractor_runs_in_worker_processes(tmp_path):
+    """Extractors registered outside the extractors module work in the isolated workers."""
+    document = tmp_path / "policy.rot13"
+    document.write_text("Qngn zhfg or qryrgrq.", encoding="utf-8")
+
+    result = ExtractionPool(workers=1, timeout=60).extract(document)
+
+    assert result.ok, result.error
+    assert result.text == "Data must be deleted."
+
+
+def test_registered_extension_is_listed_and_readable(tmp_path):
+    document = tmp_path / "policy.rot13"
+    document.write_text("Erivrj naahnyyl.", encoding="utf-8")
+
+    assert document.resolve() in build_catalog([tmp_path])
+    content = DocumentReaderTool()._run(str(document))
+    assert "Review annually." in content
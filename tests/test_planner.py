@@ -0,0 +1,61 @@
+"""Tests of dry-run planning without extraction."""
+
+import pytest
+
+from src import planner
+from src.tools import extractors
+from src.tools.extractors import ExtractionResult
+from src.utils import catalog, text_store
+from src.utils.text_store import TextStore
+from src.utils.tokens import count_tokens
+
+
+class RecordingPool:
+    """Extraction pool that reads files directly and records what it extracted."""
+
+    def __init__(self):
+        self.extracted = []
+
+    def iter_extract(self, paths):
+        for path in paths:
+            self.extracted.append(str(path))
+            yield ExtractionResult(path=str(path), text=path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    monkeypatch.setattr(catalog, "POLICY_DOCS_DIRS", [docs])
+    monkeypatch.setattr(catalog, "TEXT_STORE_ENABLED", True)
+    monkeypatch.setattr(planner, "TEXT_STORE_ENABLED", True)
+    store = TextStore(tmp_path / "store")
+    monkeypatch.setattr(text_store, "_store", store)
+    pool = RecordingPool()
+    monkeypatch.setattr(extractors, "get_extraction_pool", lambda: pool)
+    yield docs, store, pool
+    store.close()
+
+
+def test_plan_measures_cached_documents_and_estimates_the_rest(library):
+    docs, store, pool = library
+    cached = docs / "privacy_policy.md"
+    cached.write_text("# Privacy\nPersonal data is deleted after five years.\n" * 20, encoding="utf-8")
+    uncached = docs / "retention_policy.md"
+    uncached.write_text("# Retention\nRecords are kept for seven years.\n" * 40, encoding="utf-8")
+    store.ensure([cached.resolve()])
+    pool.extracted.clear()
+
+    plan = planner.plan_run(routing=False, cascade=False, deduplicate=True)
+
+    assert pool.extracted == []
+    assert uncached.resolve() not in store
+    documents = {d["path"]: d for d in plan["documents"]}
+    measured = documents[str(cached.resolve())]
+    estimated = documents[str(uncached.resolve())]
+    assert measured["cached"] and not measured["estimated"]
+    assert measured["tokens"] == count_tokens(cached.read_text(encoding="utf-8"))
+    assert not estimated["cached"] and estimated["estimated"]
+    assert estimated["tokens"] == planner.estimate_file_tokens(str(uncached))
+    assert plan["flags"]["estimated_tokens"] == [str(uncached.resolve())]
+    assert plan["totals"]["llm_calls"] > 0
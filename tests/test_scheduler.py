@@ -0,0 +1,156 @@
+"""Tests of budget-aware ingestion scheduling, with a fake clock, runner and cascade."""
+
+import pytest
+
+from src.config.settings import MAX_CHUNK_SIZE, REDUCED_DEPTH_CHUNK_SIZE
+from src.crew import _run_cascade
+from src.planner import (
+    AGENT_PROMPT_TOKENS,
+    EXTRACTION_OUTPUT_TOKENS,
+    TASK_PROMPT_TOKENS,
+    estimate_report_reserve,
+)
+from src.scheduler import DeadlineScheduler, document_priority
+from src.tasks.schemas import AnalysisResult, DocumentExtraction, Finding
+from src.utils.catalog import document_key
+from src.utils.document_index import RoutedDocument
+
+
+class FakeClock:
+    """Clock that only moves when the fake runner does work."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRunner:
+    """Extraction runner that records its calls and takes `seconds` of fake time."""
+
+    def __init__(self, clock: FakeClock, seconds: float = 1.0):
+        self.clock = clock
+        self.seconds = seconds
+        self.calls = []
+
+    def __call__(self, tier, name, text, document_focus=None):
+        self.calls.append((tier, name))
+        self.clock.now += self.seconds
+        return DocumentExtraction(document=name, title=name, purpose="test", confidence=0.9)
+
+
+class FakeLoader:
+    """load_texts stand-in returning `words` words of text per document."""
+
+    def __init__(self, words: int):
+        self.words = words
+        self.loaded = []
+
+    def __call__(self, paths):
+        self.loaded.extend(paths)
+        return {path: "retention " * self.words for path in paths}, {}
+
+
+class StubCascade:
+    """Model cascade that returns the documents it was given."""
+
+    def run(self, documents: dict, document_focus: str = None) -> list:
+        return sorted(documents)
+
+
+def _same_named_documents(tmp_path) -> list:
+    paths = []
+    for folder in ("hr", "it"):
+        path = tmp_path / folder / "retention_policy.md"
+        path.parent.mkdir()
+        path.write_text(f"# {folder.upper()} retention\nRecords are kept for five years.\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_cascade_keeps_same_named_documents_apart(tmp_path):
+    hr, it = _same_named_documents(tmp_path)
+    routed = [RoutedDocument(path=str(hr), score=1.0), RoutedDocument(path=str(it), score=1.0)]
+
+    assert _run_cascade(StubCascade(), routed_documents=routed) == sorted(
+        [document_key(hr), document_key(it)]
+    )
+
+
+def test_previous_findings_only_raise_the_priority_of_their_own_document(tmp_path):
+    hr, it = _same_named_documents(tmp_path)
+    previous = AnalysisResult(
+        summary="",
+        findings=[
+            Finding(
+                document=document_key(hr),
+                regulation="GDPR",
+                finding_type="gap",
+                title="No retention period",
+                description="",
+                severity="critical",
+            )
+        ],
+    )
+    text = hr.read_text(encoding="utf-8")
+
+    assert document_priority(str(hr), text, previous) > document_priority(str(it), text, previous)
+    assert document_priority(str(it), text, changed_documents=[document_key(it)]) > document_priority(
+        str(hr), text, changed_documents=[document_key(it)]
+    )
+
+
+def _schedule(token_budget=None, time_budget=None, documents=2, words=50, seconds=1.0):
+    clock = FakeClock()
+    runner = FakeRunner(clock, seconds)
+    loader = FakeLoader(words)
+    scheduler = DeadlineScheduler(
+        time_budget, token_budget, compaction=True, runner=runner, clock=clock
+    )
+    paths = [f"/policies/policy_{i}.md" for i in range(documents)]
+    extractions = scheduler.run(paths, lambda path, text: 0.0, load_texts=loader)
+    return scheduler, runner, loader, extractions
+
+
+def test_ample_budget_ingests_everything_at_full_depth():
+    scheduler, runner, loader, extractions = _schedule(token_budget=10_000_000, time_budget=100_000)
+
+    assert len(extractions) == 2
+    assert [d.depth for d in scheduler.documents] == ["full", "full"]
+    assert [tier for tier, _ in runner.calls] == ["default", "default"]
+    assert not scheduler.limited and scheduler.budget_warning is None
+
+
+def test_tight_token_budget_ingests_at_reduced_depth():
+    """A document larger than the reduced chunk only fits once summarized."""
+    words = 2 * MAX_CHUNK_SIZE
+    overhead = AGENT_PROMPT_TOKENS + TASK_PROMPT_TOKENS + EXTRACTION_OUTPUT_TOKENS
+    reserve = estimate_report_reserve(1, compaction=True)["tokens"]
+    budget = reserve + overhead + REDUCED_DEPTH_CHUNK_SIZE + 10
+
+    scheduler, runner, loader, extractions = _schedule(token_budget=budget, documents=1, words=words)
+
+    assert [d.depth for d in scheduler.documents] == ["reduced"]
+    assert [tier for tier, _ in runner.calls] == ["fast"]
+    assert scheduler.limited
+
+
+def test_exhausted_time_budget_skips_documents_without_extracting_them():
+    reserve = estimate_report_reserve(2, compaction=True)["seconds"]
+
+    scheduler, runner, loader, extractions = _schedule(time_budget=reserve + 1)
+
+    assert extractions == [] and runner.calls == [] and loader.loaded == []
+    assert all(d.depth == "skipped" for d in scheduler.documents)
+    assert all(d.reason == "time budget exhausted; not extracted" for d in scheduler.documents)
+
+
+def test_budget_below_the_reserve_warns():
+    """The report still has to be written, so the run goes over a budget below the reserve."""
+    with pytest.warns(UserWarning, match="more than the run budget"):
+        scheduler, runner, loader, extractions = _schedule(token_budget=100)
+
+    assert extractions == [] and runner.calls == []
+    assert scheduler.summary()["budget_warning"] == scheduler.budget_warning
+    assert scheduler.budget_warning in scheduler.coverage_section()
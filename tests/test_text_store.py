@@ -0,0 +1,75 @@
+"""Tests of the memory-mapped text store, with a stub extraction pool."""
+
+import os
+
+import pytest
+
+from src.tools import extractors
+from src.tools.extractors import ExtractionResult
+from src.utils.text_store import TextStore
+
+
+class StubPool:
+    """Extraction pool that reads files directly and fails on files containing FAIL."""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.extracted = []
+        self.pending_sizes = []
+
+    def iter_extract(self, paths):
+        for path in paths:
+            # What has been written so far, before this result is handed over
+            self.pending_sizes.append(
+                sum(f.stat().st_size for f in self.store_dir.glob("pending-*.txt"))
+            )
+            self.extracted.append(str(path))
+            text = path.read_text(encoding="utf-8")
+            if "FAIL" in text:
+                yield ExtractionResult(path=str(path), error="unreadable")
+            else:
+                yield ExtractionResult(path=str(path), text=text)
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    stub = StubPool(tmp_path / "store")
+    monkeypatch.setattr(extractors, "get_extraction_pool", lambda: stub)
+    return stub
+
+
+def test_documents_are_written_as_they_are_extracted(tmp_path, pool):
+    documents = []
+    for i in range(3):
+        document = tmp_path / f"policy_{i}.md"
+        document.write_text(f"# Policy {i}\nRecords are kept for {i} years.\n", encoding="utf-8")
+        documents.append(document)
+
+    with TextStore(tmp_path / "store") as store:
+        assert store.ensure(documents) == {}
+
+        assert pool.pending_sizes[0] == 0
+        assert pool.pending_sizes[1] > 0 and pool.pending_sizes[2] > pool.pending_sizes[1]
+        assert not list((tmp_path / "store").glob("pending-*"))
+        assert store.search(documents[2], "2 years") == ["# Policy 2\nRecords are kept for 2 years."]
+        assert store.sections(documents[1]) == [("Policy 1", 0)]
+
+
+def test_failed_extraction_is_not_retried_until_the_file_changes(tmp_path, pool):
+    broken = tmp_path / "broken.md"
+    broken.write_text("FAIL", encoding="utf-8")
+
+    with TextStore(tmp_path / "store") as store:
+        assert store.ensure([broken]) == {str(broken): "unreadable"}
+    with TextStore(tmp_path / "store") as store:
+        assert store.ensure([broken]) == {str(broken): "unreadable"}
+    assert pool.extracted == [str(broken)]
+
+    broken.write_text("Fixed policy text.", encoding="utf-8")
+    stat = broken.stat()
+    os.utime(broken, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    with TextStore(tmp_path / "store") as store:
+        assert store.ensure([broken]) == {}
+        assert store.text(broken) == "Fixed policy text."
+        assert str(broken) not in store._index["failures"]
+    assert pool.extracted == [str(broken), str(broken)]
@@ -0,0 +1,47 @@
+"""Tests of the findings warehouse."""
+
+import sqlite3
+
+import pytest
+
+from src.utils.warehouse import FindingsWarehouse
+
+
+SCOPE = {"report_type": "full", "document_focus": None, "focus_areas": None}
+
+
+def _finding(key: str, severity: str = "high") -> dict:
+    return {
+        "run_id": "run-1",
+        "key": key,
+        "document": "privacy_policy.md",
+        "regulation": "GDPR",
+        "finding_type": "gap",
+        "severity": severity,
+        "title": f"Finding {key}",
+        "description": "",
+        "recommendation": None,
+        "citations": [],
+    }
+
+
+def test_read_only_connection_rejects_writes_hidden_in_a_cte(tmp_path):
+    """A read-only warehouse refuses writes that do not start with a write keyword."""
+    db_path = tmp_path / "findings.db"
+    with FindingsWarehouse(db_path) as warehouse:
+        warehouse.record_run("run-1", SCOPE, [_finding("a")])
+
+    with FindingsWarehouse(db_path, read_only=True) as warehouse:
+        with pytest.raises(sqlite3.OperationalError):
+            warehouse.query("WITH a AS (SELECT 1) DELETE FROM runs")
+        assert warehouse.query("SELECT COUNT(*) AS n FROM runs") == [{"n": 1}]
+
+
+def test_open_findings_lists_the_latest_complete_run_most_severe_first(tmp_path):
+    with FindingsWarehouse(tmp_path / "findings.db") as warehouse:
+        warehouse.record_run("run-1", SCOPE, [_finding("a", "low"), _finding("b", "critical")])
+        warehouse.record_run("run-2", SCOPE, [_finding("c")], complete=False)
+
+        findings = warehouse.open_findings(SCOPE)
+
+    assert [f["key"] for f in findings] == ["b", "a"]